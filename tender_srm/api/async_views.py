@@ -0,0 +1,121 @@
+from django.http import HttpResponse
+from django.views import View
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotAuthenticated, NotFound, PermissionDenied
+from rest_framework.request import Request
+from tenders.models import Organization, Proposal, Tender
+from tenders.repositories.tender_repository import TenderRepository
+from tenders.cache_tags import TENDERS_TAG, CRITERIA_TAG, tender_tag
+from .authentication import UserContextJWTAuthentication
+from .renderers import ProfiledJSONRenderer
+from .pagination import TenderKeysetPagination, ProposalKeysetPagination, OrganizationKeysetPagination
+from .serializers import (
+    TenderListSerializer, TenderDetailSerializer, ProposalSerializer, OrganizationDetailSerializer
+)
+from .simple_cache import acache_response
+
+
+class AsyncAPIView(View):
+    """
+    Основа async-представлений для ASGI. APIView из DRF async не поддерживает, поэтому здесь
+    только нужное для чтения: JWT через async ORM, проверка роли и ответ тем же JSON-рендерером.
+    Под WSGI тоже работают, но выигрыш дают только в ASGI-воркере.
+    """
+
+    authentication_class = UserContextJWTAuthentication
+    manager_only = False
+
+    async def dispatch(self, request, *args, **kwargs):
+        request = Request(request)
+        try:
+            await self.check_permissions(request)
+            return await super().dispatch(request, *args, **kwargs)
+        except APIException as exc:
+            return self.handle_exception(request, exc)
+
+    async def check_permissions(self, request):
+        result = await self.authentication_class().aauthenticate(request)
+        if result is None:
+            raise NotAuthenticated()
+        request.user, request.auth = result
+
+        if self.manager_only and request.user.role != 'Менеджер':
+            raise PermissionDenied()
+
+    def handle_exception(self, request, exc):
+        response = self.render({'detail': exc.detail}, exc.status_code)
+        if exc.status_code == status.HTTP_401_UNAUTHORIZED:
+            response['WWW-Authenticate'] = self.authentication_class().authenticate_header(request)
+        return response
+
+    @staticmethod
+    def render(data, status_code=status.HTTP_200_OK):
+        return HttpResponse(ProfiledJSONRenderer().render(data), status=status_code, content_type='application/json')
+
+
+class AsyncListView(AsyncAPIView):
+    """Keyset-страница queryset: выборка async-итерацией, сериализация без обращений к БД"""
+
+    serializer_class = None
+    pagination_class = None
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    async def list(self, request):
+        paginator = self.pagination_class()
+        items = await paginator.apaginate_queryset(self.get_queryset(), request, view=self)
+        return self.render(paginator.get_paginated_data(self.serializer_class(items, many=True).data))
+
+    async def get(self, request):
+        return await self.list(request)
+
+
+# ===== ТЕНДЕРЫ =====
+
+class AsyncTenderListView(AsyncListView):
+    serializer_class = TenderListSerializer
+    pagination_class = TenderKeysetPagination
+
+    def get_queryset(self):
+        return TenderRepository.get_open_tenders_for_list()
+
+    @acache_response(tags=[TENDERS_TAG], vary_on_user=False)
+    async def get(self, request):
+        return await self.list(request)
+
+
+class AsyncTenderDetailView(AsyncAPIView):
+    queryset = Tender.objects.select_related('organization').prefetch_related('criteria__criterion')
+
+    @acache_response(tags=lambda request, pk: [tender_tag(pk), CRITERIA_TAG], vary_on_user=False)
+    async def get(self, request, pk):
+        try:
+            tender = await self.queryset.aget(pk=pk)
+        except Tender.DoesNotExist:
+            raise NotFound()
+        return self.render(TenderDetailSerializer(tender).data)
+
+
+# ===== ОЧЕРЕДЬ МЕНЕДЖЕРА =====
+
+class AsyncPendingProposalsView(AsyncListView):
+    manager_only = True
+    serializer_class = ProposalSerializer
+    pagination_class = ProposalKeysetPagination
+
+    def get_queryset(self):
+        return Proposal.objects.filter(
+            status__in=['Подана', 'Проверяется']
+        ).select_related('supplier', 'tender')
+
+
+class AsyncPendingOrganizationsView(AsyncListView):
+    manager_only = True
+    serializer_class = OrganizationDetailSerializer
+    pagination_class = OrganizationKeysetPagination
+
+    def get_queryset(self):
+        return Organization.objects.filter(
+            verification_status='На проверке'
+        ).select_related('user').prefetch_related('verification_documents')
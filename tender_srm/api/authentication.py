@@ -0,0 +1,46 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+from tenders.services.user_context_service import UserContextService
+
+
+class UserContextJWTAuthentication(JWTAuthentication):
+    """JWT без запроса к БД на тёплом кеше: пользователь берётся из UserContextService"""
+
+    def _user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+    def _check_user(self, user, validated_token):
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
+
+    def get_user(self, validated_token):
+        user = UserContextService.get_user(self._user_id(validated_token))
+        return self._check_user(user, validated_token)
+
+    async def aauthenticate(self, request):
+        """authenticate для async-представлений: разбор токена синхронный, пользователь — через async ORM"""
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        user = await UserContextService.aget_user(self._user_id(validated_token))
+        return self._check_user(user, validated_token), validated_token
@@ -0,0 +1,120 @@
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+from tenders.models import Tender
+
+
+# Эндпоинт: (имя синхронного маршрута, имя async-маршрута, нужен ли id тендера)
+ENDPOINTS = {
+    'tenders': ('api_tender_list', 'api_async_tender_list', False),
+    'tender-detail': ('api_tender_detail', 'api_async_tender_detail', True),
+    'pending-proposals': ('api_pending_proposals', 'api_async_pending_proposals', False),
+    'pending-organizations': ('api_pending_organizations', 'api_async_pending_organizations', False),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает пропускную способность чтений API: синхронные представления под WSGI (gunicorn) "
+        "против api/async/* под ASGI. Оба сервера поднимаются заранее на одной базе, например:\n"
+        "  gunicorn tender_srm.wsgi:application -w 4 -b 127.0.0.1:8000\n"
+        "  gunicorn tender_srm.asgi:application -w 4 -k uvicorn.workers.UvicornWorker -b 127.0.0.1:8001"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--wsgi-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--asgi-url', default='http://127.0.0.1:8001')
+        parser.add_argument('--username', required=True, help='Пользователь, от имени которого идут запросы')
+        parser.add_argument('--endpoint', choices=sorted(ENDPOINTS), action='append')
+        parser.add_argument('--tender-id', type=int, help='Для tender-detail; по умолчанию последний открытый')
+        parser.add_argument('--requests', type=int, default=2000, help='Запросов на прогон')
+        parser.add_argument('--concurrency', type=int, default=50, help='Одновременных клиентов')
+        parser.add_argument('--timeout', type=float, default=30.0)
+        parser.add_argument('--json', action='store_true', help='Результаты одним JSON-документом')
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(username=options['username'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"Пользователь {options['username']} не найден")
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+
+        results = []
+        for endpoint in options['endpoint'] or sorted(ENDPOINTS):
+            sync_name, async_name, needs_tender = ENDPOINTS[endpoint]
+            kwargs = {'pk': self._tender_id(options)} if needs_tender else {}
+
+            for deployment, base_url, url_name in (
+                ('wsgi', options['wsgi_url'], sync_name),
+                ('asgi', options['asgi_url'], async_name),
+            ):
+                url = base_url.rstrip('/') + reverse(url_name, kwargs=kwargs)
+                result = self._run(url, headers, options)
+                result.update(endpoint=endpoint, deployment=deployment)
+                results.append(result)
+                if not options['json']:
+                    self._print(result)
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, ensure_ascii=False, indent=2))
+
+    @staticmethod
+    def _tender_id(options) -> int:
+        if options['tender_id']:
+            return options['tender_id']
+        tender_id = Tender.objects.filter(status='Открыт').order_by('-id').values_list('id', flat=True).first()
+        if tender_id is None:
+            raise CommandError("Нет открытых тендеров для tender-detail, укажите --tender-id")
+        return tender_id
+
+    @staticmethod
+    def _fetch(url, headers, timeout):
+        started = time.perf_counter()
+        try:
+            with urlopen(Request(url, headers=headers), timeout=timeout) as response:
+                response.read()
+                ok = response.status == 200
+        except (HTTPError, URLError, TimeoutError, ConnectionError):
+            ok = False
+        return time.perf_counter() - started, ok
+
+    def _run(self, url, headers, options) -> dict:
+        # Прогрев: соединения с БД, кеш контекста пользователя и ответов
+        self._fetch(url, headers, options['timeout'])
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            samples = list(pool.map(
+                lambda _: self._fetch(url, headers, options['timeout']), range(options['requests'])
+            ))
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency for latency, _ in samples)
+        quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+        return {
+            'url': url,
+            'requests': len(samples),
+            'errors': sum(1 for _, ok in samples if not ok),
+            'concurrency': options['concurrency'],
+            'requests_per_second': round(len(samples) / elapsed, 1),
+            'latency_ms': {
+                'p50': round(quantiles[49] * 1000, 1),
+                'p95': round(quantiles[94] * 1000, 1),
+                'max': round(latencies[-1] * 1000, 1),
+            },
+        }
+
+    def _print(self, result):
+        latency = result['latency_ms']
+        self.stdout.write(
+            f"{result['endpoint']:<22} {result['deployment']:<5} "
+            f"{result['requests_per_second']:>8} req/s  p50 {latency['p50']} ms  p95 {latency['p95']} ms  "
+            f"ошибок {result['errors']}/{result['requests']}"
+        )
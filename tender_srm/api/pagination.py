@@ -0,0 +1,87 @@
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+from tenders.pagination import KeysetPaginator
+
+
+class KeysetPagination(BasePagination):
+    """Keyset-пагинация для списков API: постоянное время ответа на любой глубине"""
+    page_size = api_settings.PAGE_SIZE or 50
+    max_page_size = 200
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    ordering = ('-id',)
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        paginator = KeysetPaginator(queryset, self.ordering, self.get_page_size(request))
+        try:
+            items, self.next_cursor = paginator.get_page(request.query_params.get(self.cursor_query_param))
+        except ValueError as e:
+            raise NotFound(str(e))
+        return items
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        paginator = KeysetPaginator(queryset, self.ordering, self.get_page_size(request))
+        try:
+            items, self.next_cursor = await paginator.aget_page(request.query_params.get(self.cursor_query_param))
+        except ValueError as e:
+            raise NotFound(str(e))
+        return items
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_data(self, data):
+        return {
+            'next': self.get_next_link(),
+            'results': data,
+        }
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class TenderKeysetPagination(KeysetPagination):
+    ordering = ('-created_at', '-id')
+
+
+class TenderSearchKeysetPagination(KeysetPagination):
+    # Сначала самые релевантные
+    ordering = ('-rank', '-id')
+
+
+class ProposalKeysetPagination(KeysetPagination):
+    # Очередь менеджера — сначала старые заявки
+    ordering = ('submitted_at', 'id')
+
+
+class LeaderboardKeysetPagination(KeysetPagination):
+    # Места по возрастанию, при равенстве — по заявке
+    ordering = ('rank', 'proposal_id')
+
+
+class OrganizationKeysetPagination(KeysetPagination):
+    ordering = ('id',)
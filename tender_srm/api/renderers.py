@@ -0,0 +1,10 @@
+from rest_framework.renderers import JSONRenderer
+from tenders.profiling import profile_section
+
+
+class ProfiledJSONRenderer(JSONRenderer):
+    """JSONRenderer с замером времени в секцию serialize (Server-Timing)"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with profile_section('serialize'):
+            return super().render(data, accepted_media_type, renderer_context)
@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from tenders.models import User, Organization, Tender, Proposal, Document, Manager, TenderCriterion, Criterion, Evaluation, Contract
+from tenders.models import User, Organization, Tender, Proposal, Document, Manager, TenderCriterion, Criterion, Evaluation, Contract, ProposalRank
+from tenders.services.document_storage_service import DocumentStorageService
+from tenders.services.organization_service import OrganizationService
 from django.db import transaction
 
 
@@ -70,7 +72,7 @@ class OrganizationRegistrationSerializer(serializers.ModelSerializer):
                 is_active=False  
             )
 
-            organization = Organization.objects.create(
+            organization = OrganizationService.register_organization(
                 user=user,
                 verification_status='На проверке',
                 **validated_data
@@ -84,13 +86,13 @@ class OrganizationRegistrationSerializer(serializers.ModelSerializer):
             
             for file, name in documents_data:
                 if file:
-                    Document.objects.create(
+                    DocumentStorageService.build_document(
+                        file,
                         organization=organization,
                         document_type='verification',
                         name=name,
-                        file=file,
                         verification_status='На проверке'
-                    )
+                    ).save()
 
         return organization
 
@@ -136,6 +138,14 @@ class ProposalVerificationSerializer(serializers.Serializer):
     notes = serializers.CharField(required=False, allow_blank=True)
 
 
+class BulkOrganizationVerificationSerializer(OrganizationVerificationSerializer):
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=1000)
+
+
+class BulkProposalVerificationSerializer(ProposalVerificationSerializer):
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=1000)
+
+
 class CriterionSerializer(serializers.ModelSerializer):
     class Meta:
         model = Criterion
@@ -204,7 +214,8 @@ class TenderCreateSerializer(serializers.ModelSerializer):
 
 class TenderListSerializer(serializers.ModelSerializer):
     organization_name = serializers.CharField(source='organization.name', read_only=True)
-    proposals_count = serializers.SerializerMethodField()
+    # Аннотируется в TenderRepository.get_open_tenders_for_list
+    proposals_count = serializers.IntegerField(read_only=True)
     
     class Meta:
         model = Tender
@@ -213,9 +224,23 @@ class TenderListSerializer(serializers.ModelSerializer):
             'start_date', 'end_date', 'budget', 'organization_name',
             'proposals_count', 'created_at'
         )
-    
-    def get_proposals_count(self, obj):
-        return obj.proposals.count()
+
+
+class TenderSearchSerializer(TenderListSerializer):
+    # Релевантность из TenderRepository.search_open_tenders
+    rank = serializers.FloatField(read_only=True)
+
+    class Meta(TenderListSerializer.Meta):
+        fields = TenderListSerializer.Meta.fields + ('rank',)
+
+
+class ProposalRankSerializer(serializers.ModelSerializer):
+    proposal_id = serializers.IntegerField(read_only=True)
+    supplier_name = serializers.CharField(source='supplier.name', read_only=True)
+
+    class Meta:
+        model = ProposalRank
+        fields = ('rank', 'proposal_id', 'supplier', 'supplier_name', 'final_score', 'gap_to_leader')
 
 
 class ProposalCreateSerializer(serializers.ModelSerializer):
@@ -248,4 +273,34 @@ class ProposalDetailSerializer(ProposalSerializer):
     documents = DocumentSerializer(many=True, read_only=True)
 
     class Meta(ProposalSerializer.Meta):
-        fields = ProposalSerializer.Meta.fields + ('evaluations', 'documents')
\ No newline at end of file
+        fields = ProposalSerializer.Meta.fields + ('evaluations', 'documents')
+
+
+class AhpMatrixSerializer(serializers.Serializer):
+    matrix = serializers.ListField(
+        child=serializers.ListField(child=serializers.FloatField(), allow_empty=False),
+        allow_empty=False
+    )
+
+
+
+class ProposalImportItemSerializer(serializers.Serializer):
+    supplier = serializers.IntegerField()
+    criteria = serializers.DictField(child=serializers.CharField(allow_blank=True), required=False)
+    description = serializers.JSONField(required=False)
+
+
+class ProposalImportSerializer(serializers.Serializer):
+    proposals = ProposalImportItemSerializer(many=True, allow_empty=False, max_length=5000)
+
+
+class ContractGenerateSerializer(serializers.Serializer):
+    # Пусто — все закрытые тендеры без договора с победителем
+    tender_ids = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, allow_empty=True)
+
+
+class SensitivityParamsSerializer(serializers.Serializer):
+    samples = serializers.IntegerField(min_value=100, max_value=20000, default=10000)
+    # Стандартное отклонение логарифма множителя веса: 0.2 — примерно ±20%
+    spread = serializers.FloatField(min_value=0.01, max_value=1.0, default=0.2)
+    seed = serializers.IntegerField(min_value=0, default=0)
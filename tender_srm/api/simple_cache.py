@@ -1,38 +1,145 @@
-from django.core.cache import cache
-from django.conf import settings
+import hashlib
 from functools import wraps
+from urllib.parse import urlencode
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags, quote_etag
+from tenders.cache_tags import aget_tag_versions, get_tag_versions, invalidate_tags, user_tag, shared_cache
+
+
+def _key_tags(request, tags, vary_on_user) -> list:
+    tags = list(tags)
+    if vary_on_user:
+        tags.append(user_tag(request.user.id))
+    return tags
+
+
+def _compose_key(request, versions, vary_on_user) -> str:
+    query = urlencode(sorted(
+        (name, value)
+        for name, values in request.query_params.lists()
+        for value in values
+    ))
+    raw = "|".join([
+        request.path,
+        query,
+        getattr(request, "accepted_media_type", None) or "",
+        str(request.user.id) if vary_on_user else "*",
+        ",".join(f"{tag}={versions[tag]}" for tag in sorted(versions)),
+    ])
+    return "response:" + hashlib.sha1(raw.encode()).hexdigest()
+
+
+def build_cache_key(request, tags, vary_on_user=True) -> str:
+    """
+    Ключ ответа: путь, нормализованные GET-параметры, формат ответа,
+    пользователь (если ответ от него зависит) и текущие версии тегов
+    """
+    versions = get_tag_versions(_key_tags(request, tags, vary_on_user))
+    return _compose_key(request, versions, vary_on_user)
+
+
+async def abuild_cache_key(request, tags, vary_on_user=True) -> str:
+    versions = await aget_tag_versions(_key_tags(request, tags, vary_on_user))
+    return _compose_key(request, versions, vary_on_user)
+
+
+def _not_modified(request, etag) -> bool:
+    if_none_match = request.headers.get("If-None-Match")
+    if not if_none_match:
+        return False
+    etags = parse_etags(if_none_match)
+    return "*" in etags or etag in etags
+
+
+def _cached_response(request, cached):
+    if _not_modified(request, cached["etag"]):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(cached["content"], content_type=cached["content_type"])
+    response["ETag"] = cached["etag"]
+    return response
+
+
+def _cache_entry(response) -> dict:
+    return {
+        "content": response.content,
+        "content_type": response["Content-Type"],
+        "etag": quote_etag(hashlib.sha1(response.content).hexdigest()),
+    }
 
-def cache_page(timeout=None):
-    """ 
-    декоратор для кеширования страниц
-    используется для данных, которые редко меняются
+
+def _with_etag(request, response, etag):
+    response["ETag"] = etag
+    if _not_modified(request, etag):
+        not_modified = HttpResponseNotModified()
+        not_modified["ETag"] = etag
+        return not_modified
+    return response
+
+
+def cache_response(timeout=None, tags=None, vary_on_user=True):
     """
-    def decorator(view_func):
-        @wraps(view_func)
-        def _wrapped_view(request, *args, **kwargs):
-
-            if request.method != 'GET':
-                return view_func(request, *args, **kwargs)
-            
-            cache_key = f"{request.path}_{request.user.id}"
-            
-            response = cache.get(cache_key)
-            if response is not None:
+    Кеширование GET-ответов методов DRF-представлений (get/list/retrieve).
+    Хранятся готовые байты и ETag; авторизация и права проверяются DRF до вызова метода.
+    tags — список тегов или функция (request, **kwargs) -> список;
+    запись устаревает, как только любой из тегов инвалидирован.
+    """
+    def decorator(view_method):
+        @wraps(view_method)
+        def _wrapped_view(view, request, *args, **kwargs):
+            renderer = getattr(request, "accepted_renderer", None)
+            if request.method != "GET" or getattr(renderer, "format", None) != "json":
+                return view_method(view, request, *args, **kwargs)
+
+            tag_list = tags(request, **kwargs) if callable(tags) else (tags or [])
+            cache_key = build_cache_key(request, tag_list, vary_on_user)
+
+            cached = shared_cache.get(cache_key)
+            if cached is not None:
+                return _cached_response(request, cached)
+
+            response = view_method(view, request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+
+            response = view.finalize_response(request, response, *args, **kwargs)
+            response.render()
+            entry = _cache_entry(response)
+            shared_cache.set(cache_key, entry, timeout or settings.CACHE_TTL)
+            return _with_etag(request, response, entry["etag"])
+        return _wrapped_view
+    return decorator
+
+
+def acache_response(timeout=None, tags=None, vary_on_user=True):
+    """cache_response для async-методов api.async_views: метод возвращает готовый JSON-ответ"""
+    def decorator(view_method):
+        @wraps(view_method)
+        async def _wrapped_view(view, request, *args, **kwargs):
+            tag_list = tags(request, **kwargs) if callable(tags) else (tags or [])
+            cache_key = await abuild_cache_key(request, tag_list, vary_on_user)
+
+            cached = await shared_cache.aget(cache_key)
+            if cached is not None:
+                return _cached_response(request, cached)
+
+            response = await view_method(view, request, *args, **kwargs)
+            if response.status_code != 200:
                 return response
-            
-            response = view_func(request, *args, **kwargs)
-            
-            if response.status_code == 200:
-                cache.set(cache_key, response, timeout or settings.CACHE_TTL)
-            
-            return response
+
+            entry = _cache_entry(response)
+            await shared_cache.aset(cache_key, entry, timeout or settings.CACHE_TTL)
+            return _with_etag(request, response, entry["etag"])
         return _wrapped_view
     return decorator
 
+
 def clear_cache_for_user(user_id, pattern=None):
     """Очистка кеша для конкретного пользователя"""
-    pass
+    invalidate_tags(user_tag(user_id))
+
 
 def clear_all_cache():
     """Очистка всего кеша"""
-    cache.clear()
\ No newline at end of file
+    shared_cache.clear()
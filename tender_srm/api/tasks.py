@@ -1,49 +1,114 @@
+import logging
 from celery import shared_task
-from django.core.mail import send_mail
 from django.conf import settings
-from tenders.models import User, Organization  
+from tenders.models import User, Organization, Tender
+from tenders.services.evaluation_service import EvaluationService
+from tenders.services.counter_service import PlatformCounterService
+from tenders.services.export_service import ExportService
+from tenders.services.contract_service import ContractService
+from tenders.services.mail_service import MailService
+from tenders.cache_tags import shared_cache
+
+logger = logging.getLogger(__name__)
+
 
 @shared_task
 def send_approval_email_to_firm(user_id, organization_id):
     """
-    Отправляет письмо фирме при одобрении регистрации менеджером
+    Письмо фирме об одобрении регистрации.
+    Оставлена для задач, уже стоящих в очереди: отправка идёт общим пакетным путём.
+    """
+    result = MailService.send_approval_batch([organization_id])
+    if result['sent']:
+        return f"Письмо отправлено организации {organization_id}"
+    return f"Письмо организации {organization_id} не требуется или не доставлено"
+
+
+@shared_task(bind=True, max_retries=settings.MAIL_MAX_RETRIES)
+def send_pending_approval_emails(self):
+    """
+    Пачка писем об одобрении через одно SMTP-соединение.
+    Временные сбои — повтор с экспоненциальной задержкой; остаток очереди — следующей пачкой.
     """
+    shared_cache.delete(MailService.FLUSH_FLAG_KEY)
     try:
-        user = User.objects.get(id=user_id)
-        organization = Organization.objects.get(id=organization_id)
-        
-        subject = f"Регистрация {organization.name} одобрена!"
-        message = f"""
-        Здравствуйте!
-
-        Ваша регистрация на платформе Tender SRM успешно одобрена менеджером!
-
-        Данные организации:
-        - Название: {organization.name}
-        - ID: {organization.id}
-        - Статус: Активна 
-
-        Теперь вы можете:
-        • Просматривать тендеры
-        • Отправлять предложения
-        • Управлять профилем
-
-        Логин: {user.username}
-        Перейдите в личный кабинет: http://127.0.0.1:8000/profile/
-
-        С уважением,
-        Команда Tender SRM
-        """
-        
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email],
-            fail_silently=False,
-        )
-        
-        return f"Письмо отправлено {user.email}"
-        
+        result = MailService.send_approval_batch()
     except Exception as e:
-        return f"Ошибка отправки: {str(e)}"
+        if not MailService.is_transient(e):
+            raise
+        raise self.retry(exc=e, countdown=settings.MAIL_RETRY_BACKOFF_SECONDS * 2 ** self.request.retries)
+
+    # Полная пачка — вероятно, очередь не пуста. Недоставленные из очереди уже ушли, поэтому
+    # повторный запуск не упрётся в те же строки
+    if len(result['sent']) + len(result['failed']) >= settings.MAIL_BATCH_SIZE:
+        MailService._enqueue_flush()
+    return f"Отправлено писем: {len(result['sent'])}, не доставлено: {len(result['failed'])}"
+
+
+@shared_task
+def rescore_tender(tender_id):
+    """
+    Коалесцированный пересчёт оценок тендера.
+    Флаг снимается до расчёта: триггер, пришедший во время пересчёта, поставит новый запуск.
+    """
+    shared_cache.delete(EvaluationService.rescore_flag_key(tender_id))
+
+    try:
+        tender = Tender.objects.get(id=tender_id)
+    except Tender.DoesNotExist:
+        return f"Тендер {tender_id} не найден"
+
+    if EvaluationService.ensure_scores_fresh(tender):
+        return f"Тендер {tender_id} пересчитан (версия {tender.scored_version})"
+    return f"Тендер {tender_id} уже актуален"
+
+
+@shared_task
+def reconcile_platform_counters():
+    """Периодическая сверка материализованных счётчиков с таблицами"""
+    drift = PlatformCounterService.reconcile()
+    if drift:
+        return f"Счётчики исправлены: {drift}"
+    return "Счётчики актуальны"
+
+
+@shared_task
+def export_tender_results(export_id):
+    """Фоновая выгрузка результатов тендера в файл"""
+    export = ExportService.run_export(export_id)
+    return f"Выгрузка {export_id}: {export.status}"
+
+
+@shared_task
+def render_contract(proposal_id):
+    """PDF договора для одной заявки (очередь contracts)"""
+    contract = ContractService.render_contract(proposal_id)
+    return f"Договор {contract.contract_number} сформирован"
+
+
+@shared_task(bind=True, max_retries=settings.CONTRACT_MAX_RETRIES)
+def render_contracts_batch(self, proposal_ids):
+    """
+    Пачка договоров в одном вызове: шаблон и шрифты воркера разбираются один раз.
+    Ошибка одного договора не останавливает остальные и пишется в лог; договоры
+    с временным сбоем повторяются той же задачей с экспоненциальной задержкой.
+    """
+    rendered, failed, transient = 0, [], []
+    for proposal_id in proposal_ids:
+        try:
+            ContractService.render_contract(proposal_id)
+            rendered += 1
+        except Exception as e:
+            logger.exception("Договор по заявке %s не сформирован", proposal_id)
+            if ContractService.is_transient(e):
+                transient.append(proposal_id)
+            else:
+                failed.append(proposal_id)
+
+    if transient:
+        if self.request.retries < self.max_retries:
+            raise self.retry(
+                args=[transient], countdown=settings.CONTRACT_RETRY_BACKOFF_SECONDS * 2 ** self.request.retries
+            )
+        failed.extend(transient)
+    return f"Сформировано договоров: {rendered}, с ошибкой: {failed}"
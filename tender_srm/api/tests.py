@@ -1,5 +1,31 @@
-from django.test import TestCase
+import csv
+import datetime
+import hashlib
+import os
+import io
+import json
+import shutil
+import smtplib
+import tempfile
+import unittest
+import re
+import numpy as np
+from decimal import Decimal
+from unittest import mock
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection, transaction, OperationalError
+from django.db.models import F
+from django.core.cache import cache
+from django.core import mail
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.urls import reverse
+from django.utils import timezone
+from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.contrib.auth import get_user_model
 from rest_framework import status
 from rest_framework.test import APITestCase, APIClient
@@ -7,14 +33,43 @@ from rest_framework_simplejwt.tokens import AccessToken
 
 from tenders.models import (
     User, Organization, Tender, Proposal, Document, Manager,
-    Criterion, TenderCriterion, Evaluation
+    Criterion, TenderCriterion, Evaluation, CriterionBounds, Contract, DocumentBlob, ProposalRank,
+    AhpComparisonMatrix
 )
+from tenders.services.evaluation_service import EvaluationService
+from tenders.services.proposal_service import ProposalService
+from tenders.services.tender_service import TenderService
+from tenders.services.criterion_service import CriterionService
+from tenders.repositories.proposal_repository import ProposalRepository
+from tenders.repositories.ahp_repository import AhpRepository
+from tenders.services.counter_service import PlatformCounterService
+from tenders.services.contract_service import ContractService
+from tenders.services.export_service import ExportService
+from tenders.services.document_storage_service import DocumentStorageService
+from tenders.services.mail_service import MailService
+from tenders.services.user_context_service import UserContextService
+from tenders.services.leaderboard_service import LeaderboardService
+from api.management.commands.benchmark_async_api import Command as BenchmarkCommand
+from api.tasks import (
+    rescore_tender, reconcile_platform_counters, export_tender_results, send_pending_approval_emails,
+    render_contracts_batch,
+)
+from tenders.pagination import KeysetPaginator
+from tenders.cache_tags import shared_cache, get_tag_versions, invalidate_tags, tender_tag
+from tenders.profiling import QueryBudgetExceeded
+from tenders.services.topsis_service import TopsisService
+from tenders.services.ahp_service import AhpService
+from tenders.services.score_matrix_service import ScoreMatrixService
+from tenders.services.sensitivity_service import SensitivityService
 
 User = get_user_model()
 
 
 class BaseAPITestCase(APITestCase):
     def setUp(self):
+        # Кеши в памяти переживают тест, а id в SQLite после отката повторяются
+        cache.clear()
+        shared_cache.clear()
         self.client = APIClient()
         
         self.manager_user = User.objects.create_user(
@@ -427,3 +482,1779 @@ class EvaluationAPITests(BaseAPITestCase):
     evaluation.refresh_from_db()
     self.assertEqual(float(evaluation.score), 8.5)
 
+
+
+class TopsisServiceTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.tender.method = 'TOPSIS'
+        self.tender.save()
+        self.price = TenderCriterion.objects.create(tender=self.tender, criterion=self.criterion1, weight=0.6)
+        self.quality = TenderCriterion.objects.create(tender=self.tender, criterion=self.criterion2, weight=0.4)
+
+    def _proposal(self, reg_number, price, quality):
+        user = User.objects.create_user(username=f'sup{reg_number}', password='testpass123', role='Поставщик')
+        org = Organization.objects.create(
+            user=user, name=f'Поставщик {reg_number}', fio='Тест', registration_number=reg_number,
+            org_type='ООО', verification_status='Подтверждено'
+        )
+        proposal = Proposal.objects.create(tender=self.tender, supplier=org)
+        Evaluation.objects.create(proposal=proposal, tender_criterion=self.price, proposed_value=price, score=0)
+        Evaluation.objects.create(proposal=proposal, tender_criterion=self.quality, score=quality)
+        return proposal
+
+    def test_final_scores_follow_direction_and_weights(self):
+        """Дешевле и качественнее — выше итоговая оценка"""
+        best = self._proposal('1001', 800, 9)
+        middle = self._proposal('1002', 1000, 6)
+        worst = self._proposal('1003', 1200, 2)
+
+        scores = TopsisService.calculate_final_scores(self.tender)
+
+        self.assertEqual(len(scores), 3)
+        for proposal in (best, middle, worst):
+            proposal.refresh_from_db()
+        self.assertEqual(float(best.final_score), 10.0)
+        self.assertEqual(float(worst.final_score), 0.0)
+        self.assertTrue(0 < middle.final_score < 10)
+
+    def test_single_proposal_is_ideal(self):
+        proposal = self._proposal('1004', 900, 5)
+        TopsisService.calculate_final_scores(self.tender)
+        proposal.refresh_from_db()
+        self.assertEqual(float(proposal.final_score), 10.0)
+
+
+class AhpServiceTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.price = TenderCriterion.objects.create(tender=self.tender, criterion=self.criterion1, weight=0.5)
+        self.quality = TenderCriterion.objects.create(tender=self.tender, criterion=self.criterion2, weight=0.5)
+        self.proposal = Proposal.objects.create(tender=self.tender, supplier=self.supplier_organization)
+        Evaluation.objects.create(proposal=self.proposal, tender_criterion=self.price, proposed_value=900, score=10)
+        Evaluation.objects.create(proposal=self.proposal, tender_criterion=self.quality, score=4)
+
+    def test_eigenvector_weights(self):
+        result = AhpService.compute_weights([[1, 3], [1 / 3, 1]])
+        self.assertAlmostEqual(result['weights'][0], 0.75)
+        self.assertAlmostEqual(result['weights'][1], 0.25)
+        self.assertAlmostEqual(result['consistency_ratio'], 0.0)
+
+    def test_save_matrix_updates_final_score(self):
+        self.authenticate_user(self.firm_user)
+        url = reverse('api_tender_ahp', kwargs={'pk': self.tender.id})
+
+        response = self.client.post(url, {'matrix': [[1, 3], [0.33, 1]]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['source'], 'matrix')
+        self.assertEqual(response.data['revision'], 1)
+        self.proposal.refresh_from_db()
+        self.assertAlmostEqual(float(self.proposal.final_score), 8.5, places=1)
+
+    def test_inconsistent_matrix_rejected(self):
+        criterion3 = Criterion.objects.create(
+            name='Срок', criterion_type='Количественный', direction='Минимизирующий'
+        )
+        TenderCriterion.objects.create(tender=self.tender, criterion=criterion3, weight=0.2)
+        matrix = [[1, 9, 1 / 9], [1 / 9, 1, 9], [9, 1 / 9, 1]]
+
+        with self.assertRaises(ValueError):
+            AhpService.save_matrix(self.firm_user, self.tender.id, matrix)
+
+    def test_supplier_cannot_set_matrix(self):
+        with self.assertRaises(PermissionError):
+            AhpService.save_matrix(self.supplier_user, self.tender.id, [[1, 1], [1, 1]])
+
+    def test_save_matrix_invalidates_tender_cache(self):
+        before = get_tag_versions([tender_tag(self.tender.id)])
+
+        AhpService.save_matrix(self.firm_user, self.tender.id, [[1, 3], [1 / 3, 1]])
+
+        self.assertNotEqual(get_tag_versions([tender_tag(self.tender.id)]), before)
+
+    def test_admin_edit_goes_through_service(self):
+        from tenders.admin import AhpComparisonMatrixAdmin, AhpComparisonMatrixForm
+        AhpService.save_matrix(self.firm_user, self.tender.id, [[1, 1], [1, 1]])
+        ahp_matrix = AhpComparisonMatrix.objects.get(tender=self.tender)
+
+        invalid = AhpComparisonMatrixForm({'tender': self.tender.id, 'matrix': '[[1, 3], [3, 1]]'}, instance=ahp_matrix)
+        self.assertFalse(invalid.is_valid())
+
+        form = AhpComparisonMatrixForm({'tender': self.tender.id, 'matrix': '[[1, 3], [0.33, 1]]'}, instance=ahp_matrix)
+        self.assertTrue(form.is_valid())
+        model_admin = AhpComparisonMatrixAdmin(AhpComparisonMatrix, mock.Mock())
+        model_admin.save_model(mock.Mock(), form.save(commit=False), form, True)
+
+        self.assertEqual(AhpComparisonMatrix.objects.get(tender=self.tender).revision, 2)
+        self.proposal.refresh_from_db()
+        self.assertAlmostEqual(float(self.proposal.final_score), 8.5, places=1)
+        self.assertEqual(ProposalRank.objects.get(proposal=self.proposal).final_score, self.proposal.final_score)
+
+    def test_malformed_matrix_rejected_by_admin_form(self):
+        from tenders.admin import AhpComparisonMatrixForm
+        for matrix in ('{"a": 1}', '[[1, {}], [1, 1]]', '[[1, 2], [1]]', '[["1", 1], [1, 1]]', '5'):
+            form = AhpComparisonMatrixForm({'tender': self.tender.id, 'matrix': matrix})
+            self.assertFalse(form.is_valid(), matrix)
+
+    def test_rolled_back_matrix_not_cached(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                AhpService.save_matrix(self.firm_user, self.tender.id, [[1, 3], [1 / 3, 1]])
+                raise RuntimeError
+
+        # Другой процесс сохраняет ту же ревизию 1 с другим содержимым
+        ahp_matrix = AhpRepository.save_matrix(self.tender, ScoreMatrixService.criteria_ids(self.tender), [[1, 1], [1, 1]])
+        result = AhpService.get_weights(self.tender)
+
+        self.assertEqual(ahp_matrix.revision, 1)
+        self.assertAlmostEqual(result['weights'][0], 0.5)
+
+
+@override_settings(SCORING_ASYNC=False)
+class IncrementalScoringTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.price = TenderCriterion.objects.create(tender=self.tender, criterion=self.criterion1, weight=1)
+        self.counter = 0
+
+    def _submit(self, price):
+        self.counter += 1
+        user = User.objects.create_user(username=f'inc{self.counter}', password='testpass123', role='Поставщик')
+        org = Organization.objects.create(
+            user=user, name=f'Инк {self.counter}', fio='Тест', registration_number=f'inc{self.counter}',
+            org_type='ООО', verification_status='Подтверждено'
+        )
+        proposal = Proposal.objects.create(tender=self.tender, supplier=org)
+        evaluation = Evaluation.objects.create(
+            proposal=proposal, tender_criterion=self.price, proposed_value=price, score=0, is_auto_calculated=True
+        )
+        EvaluationService.score_new_proposal(proposal)
+        return evaluation
+
+    def test_matches_full_recalculation(self):
+        evaluations = [self._submit(price) for price in (1000, 800, 1200, 900, 1100)]
+        incremental = [Evaluation.objects.get(pk=e.pk).score for e in evaluations]
+
+        EvaluationService.recalculate_quantitative_scores(self.tender)
+        full = [Evaluation.objects.get(pk=e.pk).score for e in evaluations]
+
+        self.assertEqual(incremental, full)
+        bounds = CriterionBounds.objects.get(tender_criterion=self.price)
+        self.assertEqual((bounds.min_value, bounds.max_value), (800, 1200))
+
+    def test_value_inside_bounds_rewrites_only_own_score(self):
+        low = self._submit(800)
+        high = self._submit(1200)
+        Evaluation.objects.filter(pk__in=[low.pk, high.pk]).update(score=5)
+
+        middle = self._submit(1000)
+
+        self.assertEqual(Evaluation.objects.get(pk=low.pk).score, 5)
+        self.assertEqual(Evaluation.objects.get(pk=middle.pk).score, Decimal('5.50'))
+
+    @override_settings(SCORING_ASYNC=True)
+    def test_inside_bounds_scores_only_new_proposal(self):
+        low = self._submit(800)
+        high = self._submit(1200)
+        EvaluationService.recalculate_quantitative_scores(self.tender)
+        ranks_before = dict(ProposalRank.objects.values_list('proposal_id', 'rank'))
+
+        with mock.patch.object(EvaluationService, 'update_final_scores') as full_pass, \
+                mock.patch.object(EvaluationService, 'schedule_rescore') as schedule:
+            middle = self._submit(1000)
+
+        full_pass.assert_not_called()
+        schedule.assert_not_called()
+        self.assertEqual(Proposal.objects.get(pk=middle.proposal_id).final_score, Decimal('5.50'))
+        self.assertEqual(
+            dict(ProposalRank.objects.values_list('proposal_id', 'rank')),
+            {**ranks_before, middle.proposal_id: 2, high.proposal_id: 3},
+        )
+        entry = ProposalRank.objects.get(proposal_id=middle.proposal_id)
+        self.assertEqual(entry.gap_to_leader, Decimal('4.50'))
+        self.assertEqual(ranks_before[low.proposal_id], 1)
+
+    @override_settings(SCORING_ASYNC=True)
+    def test_bounds_shift_defers_full_pass(self):
+        self._submit(800)
+        self._submit(1200)
+        EvaluationService.recalculate_quantitative_scores(self.tender)
+
+        with mock.patch.object(EvaluationService, 'schedule_rescore') as schedule:
+            outlier = self._submit(700)
+
+        schedule.assert_called_once_with(self.tender.id)
+        self.assertEqual(Evaluation.objects.get(pk=outlier.pk).score, 0)
+        self.assertFalse(ProposalRank.objects.filter(proposal_id=outlier.proposal_id).exists())
+
+
+class ScoreFreshnessTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        price = TenderCriterion.objects.create(tender=self.tender, criterion=self.criterion1, weight=1)
+        self.proposal = Proposal.objects.create(tender=self.tender, supplier=self.supplier_organization)
+        self.evaluation = Evaluation.objects.create(
+            proposal=self.proposal, tender_criterion=price, proposed_value=900, score=10, is_auto_calculated=True
+        )
+        self.url = reverse('api_proposal_detail', kwargs={'pk': self.proposal.id})
+        self.authenticate_user(self.manager_user)
+
+    def test_read_does_not_recalculate_fresh_scores(self):
+        Evaluation.objects.filter(pk=self.evaluation.pk).update(score=3)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Evaluation.objects.get(pk=self.evaluation.pk).score, 3)
+
+    def test_stale_read_served_and_rescore_queued(self):
+        Evaluation.objects.filter(pk=self.evaluation.pk).update(score=3)
+        EvaluationService.invalidate_scores([self.tender.id])
+
+        with mock.patch.object(rescore_tender, 'apply_async') as apply_async:
+            response = self.client.get(self.url)
+            self.client.get(self.url)
+
+        # Пересчёт не на потоке запроса: отдаются прежние оценки, задача ставится один раз
+        self.assertFalse(response.data['is_current'])
+        self.assertEqual(Evaluation.objects.get(pk=self.evaluation.pk).score, 3)
+        apply_async.assert_called_once_with(args=[self.tender.id], countdown=settings.SCORING_COALESCE_SECONDS)
+
+        rescore_tender(self.tender.id)
+        self.assertEqual(Evaluation.objects.get(pk=self.evaluation.pk).score, 10)
+        self.assertTrue(self.client.get(self.url).data['is_current'])
+
+
+class ProposalBatchSubmissionTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        TenderCriterion.objects.create(tender=self.tender, criterion=self.criterion1, weight=0.7)
+        TenderCriterion.objects.create(tender=self.tender, criterion=self.criterion2, weight=0.3)
+
+    def _supplier(self, reg_number):
+        user = User.objects.create_user(username=f'imp{reg_number}', password='testpass123', role='Поставщик')
+        return Organization.objects.create(
+            user=user, name=f'Импорт {reg_number}', fio='Тест', registration_number=reg_number,
+            org_type='ООО', verification_status='Подтверждено'
+        )
+
+    def test_invalid_values_rejected_before_any_write(self):
+        with self.assertRaises(DjangoValidationError):
+            ProposalService.submit_proposal_with_criteria(
+                self.supplier_user, self.tender.id, {str(self.criterion1.id): 'abc'}
+            )
+        self.assertFalse(Proposal.objects.exists())
+
+    @override_settings(SCORING_ASYNC=False)
+    def test_submit_creates_all_evaluations(self):
+        proposal = ProposalService.submit_proposal_with_criteria(
+            self.supplier_user, self.tender.id, {str(self.criterion1.id): '1000'}
+        )
+        self.assertEqual(proposal.evaluations.count(), 2)
+        self.assertEqual(proposal.evaluations.get(tender_criterion__criterion=self.criterion1).score, 10)
+
+    @override_settings(SCORING_ASYNC=False)
+    def test_bulk_import(self):
+        suppliers = [self._supplier(f'55{i}') for i in range(3)]
+        payload = {'proposals': [
+            {'supplier': org.id, 'criteria': {str(self.criterion1.id): str(price)}}
+            for org, price in zip(suppliers, (800, 1000, 1200))
+        ]}
+        self.authenticate_user(self.manager_user)
+
+        response = self.client.post(
+            reverse('api_proposal_import', kwargs={'tender_id': self.tender.id}), payload, format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data['ids']), 3)
+        self.assertEqual(Evaluation.objects.filter(proposal__tender=self.tender).count(), 6)
+        scores = Evaluation.objects.filter(
+            tender_criterion__criterion=self.criterion1
+        ).order_by('proposed_value').values_list('score', flat=True)
+        self.assertEqual([float(score) for score in scores], [10.0, 5.5, 1.0])
+
+    def test_bulk_import_rejects_duplicates(self):
+        supplier = self._supplier('561')
+        payload = {'proposals': [
+            {'supplier': supplier.id, 'criteria': {str(self.criterion1.id): '900'}},
+            {'supplier': supplier.id, 'criteria': {str(self.criterion1.id): '950'}},
+        ]}
+        self.authenticate_user(self.manager_user)
+
+        response = self.client.post(
+            reverse('api_proposal_import', kwargs={'tender_id': self.tender.id}), payload, format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Proposal.objects.exists())
+
+
+
+class AsyncScoringTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        TenderCriterion.objects.create(tender=self.tender, criterion=self.criterion1, weight=1)
+
+    def test_submission_defers_scoring_to_task(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            proposal = ProposalService.submit_proposal_with_criteria(
+                self.supplier_user, self.tender.id, {str(self.criterion1.id): '1000'}
+            )
+        evaluation = proposal.evaluations.get()
+        self.assertEqual(evaluation.score, 0)
+
+        self.authenticate_user(self.firm_user)
+        url = reverse('api_tender_scoring_status', kwargs={'pk': self.tender.id})
+        self.assertFalse(self.client.get(url).data['is_current'])
+
+        rescore_tender(self.tender.id)
+
+        evaluation.refresh_from_db()
+        self.assertEqual(evaluation.score, 10)
+        self.assertTrue(self.client.get(url).data['is_current'])
+
+    def test_triggers_coalesce_into_one_task(self):
+        with mock.patch.object(rescore_tender, 'apply_async') as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                for _ in range(3):
+                    EvaluationService.schedule_rescore(self.tender.id)
+
+        apply_async.assert_called_once()
+        self.assertTrue(EvaluationService.is_rescore_scheduled(self.tender.id))
+
+
+class TenderListQueryCountTests(BaseAPITestCase):
+    def test_query_count_is_fixed_for_10000_open_tenders(self):
+        """Бенчмарк: число запросов списка не зависит от числа тендеров"""
+        Tender.objects.bulk_create([
+            Tender(
+                title=f'Тендер {i}', status='Открыт', method='TOPSIS', start_date='2025-01-01',
+                end_date='2025-12-31', budget=1000, organization=self.firm_organization
+            )
+            for i in range(10000)
+        ], batch_size=2000)
+        Proposal.objects.create(tender=self.tender, supplier=self.supplier_organization)
+        self.authenticate_user(self.supplier_user)
+        url = reverse('api_tender_list')
+
+        # Аутентификация по JWT + одна выборка страницы
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 50)
+        self.assertIsNotNone(response.data['next'])
+
+        # Пользователь уже в кеше контекста — остаётся только выборка страницы
+        with self.assertNumQueries(1):
+            response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 50)
+
+    def test_proposals_count_annotated(self):
+        Proposal.objects.create(tender=self.tender, supplier=self.supplier_organization)
+        self.authenticate_user(self.supplier_user)
+
+        response = self.client.get(reverse('api_tender_list'))
+
+        self.assertEqual(response.data['results'][0]['proposals_count'], 1)
+
+
+class KeysetPaginationTests(BaseAPITestCase):
+    def test_pages_cover_all_rows_once_with_equal_timestamps(self):
+        Tender.objects.bulk_create([
+            Tender(
+                title=f'Тендер {i}', status='Открыт', method='AHP', start_date='2025-01-01',
+                end_date='2025-12-31', budget=1000, organization=self.firm_organization
+            )
+            for i in range(7)
+        ])
+        Tender.objects.update(created_at=self.tender.created_at)
+        paginator = KeysetPaginator(Tender.objects.all(), ('-created_at', '-id'), 3)
+
+        seen = []
+        items, cursor = paginator.get_page()
+        seen.extend(items)
+        while cursor:
+            items, cursor = paginator.get_page(cursor)
+            seen.extend(items)
+
+        ids = [tender.id for tender in seen]
+        self.assertEqual(ids, sorted(Tender.objects.values_list('id', flat=True), reverse=True))
+
+    def test_invalid_cursor_rejected(self):
+        self.authenticate_user(self.manager_user)
+        response = self.client.get(reverse('api_pending_proposals'), {'cursor': 'не-курсор'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_mistyped_cursor_rejected(self):
+        encode = KeysetPaginator.encode_cursor
+        self.authenticate_user(self.manager_user)
+        for cursor in (encode(['garbage', 1]), encode([{'x': 1}, 1]), encode([None, 1])):
+            response = self.client.get(reverse('api_pending_proposals'), {'cursor': cursor})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        # Курсор от сортировки по бюджету не подходит к сортировке по дате
+        paginator = KeysetPaginator(Tender.objects.all(), ('-created_at', '-id'), 3)
+        with self.assertRaises(ValueError):
+            paginator.get_page(encode(['1000.00', self.tender.id]))
+
+    def test_pending_proposals_paginated_oldest_first(self):
+        for i in range(3):
+            user = User.objects.create_user(username=f'kp{i}', password='testpass123', role='Поставщик')
+            org = Organization.objects.create(
+                user=user, name=f'КП {i}', fio='Тест', registration_number=f'kp{i}', org_type='ООО'
+            )
+            Proposal.objects.create(tender=self.tender, supplier=org)
+        self.authenticate_user(self.manager_user)
+
+        first = self.client.get(reverse('api_pending_proposals'), {'page_size': 2})
+        second = self.client.get(first.data['next'])
+
+        ids = [p['id'] for p in first.data['results'] + second.data['results']]
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(ids), 3)
+        self.assertIsNone(second.data['next'])
+
+
+class HotQueryIndexTests(BaseAPITestCase):
+    """EXPLAIN горячих запросов: ни один не должен уходить в последовательное сканирование"""
+
+    def hot_queries(self):
+        return {
+            'open_tenders': Tender.objects.filter(status='Открыт').order_by('-created_at', '-id')[:50],
+            'pending_organizations': Organization.objects.filter(verification_status='На проверке').order_by('id'),
+            'verified_organizations': Organization.objects.filter(verification_status='Подтверждено'),
+            'manager_queue': Proposal.objects.filter(status__in=['Подана', 'Проверяется']).order_by('submitted_at', 'id'),
+            'submitted_proposals': Proposal.objects.filter(status='Подана'),
+            'proposal_exists': Proposal.objects.filter(tender_id=1, supplier_id=1),
+            'criterion_evaluations': Evaluation.objects.filter(
+                tender_criterion_id=1, proposal__tender_id=1, proposed_value__isnull=False
+            ),
+        }
+
+    def seq_scans(self, plan):
+        if connection.vendor == 'postgresql':
+            return re.findall(r'Seq Scan on (\w+)', plan)
+        # SQLite: «SCAN table» без «USING ... INDEX» — полный проход по таблице
+        return re.findall(r'SCAN (\w+)(?! USING)', plan)
+
+    def test_hot_queries_use_indexes(self):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                # На пустых тестовых таблицах планировщик иначе всегда выберет Seq Scan
+                cursor.execute('SET enable_seqscan = off')
+            try:
+                for name, queryset in self.hot_queries().items():
+                    with self.subTest(query=name):
+                        plan = queryset.explain()
+                        self.assertEqual(self.seq_scans(plan), [], plan)
+            finally:
+                if connection.vendor == 'postgresql':
+                    cursor.execute('RESET enable_seqscan')
+
+
+class ResponseCacheTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        shared_cache.clear()
+        self.authenticate_user(self.supplier_user)
+        self.url = reverse('api_tender_detail', kwargs={'pk': self.tender.id})
+
+    def test_etag_and_not_modified(self):
+        first = self.client.get(self.url)
+        self.assertIn('ETag', first)
+
+        second = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(second.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_cache_hit_skips_database(self):
+        self.client.get(self.url)
+        # Пользователь JWT тоже берётся из кеша контекста
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_save_invalidates_entry(self):
+        self.client.get(self.url)
+        self.tender.title = 'Новое название'
+        self.tender.save()
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.json()['title'], 'Новое название')
+
+    def test_organization_rename_invalidates_tender_responses(self):
+        list_url = reverse('api_tender_list')
+        self.client.get(list_url)
+        self.client.get(self.url)
+
+        self.firm_organization.name = 'Новый организатор'
+        self.firm_organization.save()
+
+        names = {tender['organization_name'] for tender in self.client.get(list_url).json()['results']}
+        self.assertEqual(names, {'Новый организатор'})
+        self.assertEqual(self.client.get(self.url).json()['organization_name'], 'Новый организатор')
+
+    def test_user_and_document_changes_invalidate_organization_detail(self):
+        self.authenticate_user(self.manager_user)
+        url = reverse('api_organization_detail', kwargs={'pk': self.supplier_organization.id})
+        self.client.get(url)
+
+        self.supplier_user.email = 'new@example.com'
+        self.supplier_user.save()
+        Document.objects.create(
+            organization=self.supplier_organization, document_type='verification',
+            name='Устав', file='documents/charter.pdf'
+        )
+        data = self.client.get(url).json()
+
+        self.assertEqual(data['user']['email'], 'new@example.com')
+        self.assertEqual([doc['name'] for doc in data['verification_documents']], ['Устав'])
+
+    def test_query_string_is_part_of_key(self):
+        list_url = reverse('api_tender_list')
+        Tender.objects.create(
+            title='Второй', status='Открыт', method='AHP', start_date='2025-01-01',
+            end_date='2025-12-31', budget=10, organization=self.firm_organization
+        )
+
+        one = self.client.get(list_url, {'page_size': 1}).json()
+        two = self.client.get(list_url, {'page_size': 2}).json()
+
+        self.assertEqual(len(one['results']), 1)
+        self.assertEqual(len(two['results']), 2)
+
+
+class CriteriaCatalogTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        TenderService._criteria_catalog = (None, [])
+
+    def test_warm_read_only_checks_version(self):
+        TenderService.get_criteria_list()
+        # Только сверка версии в общем кеше, каталог из БД не перечитывается
+        with self.assertNumQueries(0):
+            criteria = TenderService.get_criteria_list()
+        self.assertEqual(len(criteria), 2)
+
+    def test_edit_visible_on_next_read(self):
+        stale = TenderService.get_criteria_list()
+        # Другой воркер меняет каталог: локальный список этого процесса устарел
+        Criterion.objects.create(name='Срок поставки', criterion_type='Количественный', direction='Минимизирующий')
+
+        fresh = TenderService.get_criteria_list()
+
+        self.assertEqual(len(fresh), len(stale) + 1)
+
+    def test_catalog_reloaded_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            Criterion.objects.create(name='Гарантия', criterion_type='Количественный', direction='Максимизирующий')
+            # Другой воркер до коммита перечитал старый каталог под уже сдвинутой версией
+            TenderService._criteria_catalog = (TenderService._criteria_version(), [])
+        for callback in callbacks:
+            callback()
+
+        self.assertEqual(len(TenderService.get_criteria_list()), 3)
+
+    def test_create_form_endpoint(self):
+        self.authenticate_user(self.firm_user)
+        response = self.client.get(reverse('api_tender_create'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual({c['name'] for c in response.data}, {'Цена', 'Качество'})
+
+
+class PlatformCounterTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        # Фикстуры созданы через ORM мимо сервисов — начальные значения выставляет reconcile
+        PlatformCounterService.reconcile()
+
+    def test_counters_follow_service_writes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            TenderService.create_tender(self.firm_user, {
+                'title': 'Новый тендер', 'method': 'AHP', 'start_date': '2025-01-01',
+                'end_date': '2025-12-31', 'budget': 1000,
+            })
+            CriterionService.create_criterion({
+                'name': 'Гарантия', 'criterion_type': 'Количественный', 'direction': 'Максимизирующий'
+            })
+
+        counters = PlatformCounterService.get_counters()
+        self.assertEqual(counters['open_tenders'], 2)
+        self.assertEqual(counters['criteria'], 3)
+        self.assertEqual(PlatformCounterService.reconcile(), {})
+
+    def test_status_transitions(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            proposal = ProposalRepository.create_proposal(self.tender, self.supplier_organization)
+        self.assertEqual(PlatformCounterService.get_counters()['pending_proposals'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ProposalService.set_status(proposal, 'Подтверждена')
+
+        counters = PlatformCounterService.get_counters()
+        self.assertEqual(counters['pending_proposals'], 0)
+        self.assertEqual(counters['proposals_total'], 1)
+        self.assertEqual(PlatformCounterService.reconcile(), {})
+
+    def test_delta_applied_after_commit_only(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                ProposalRepository.create_proposal(self.tender, self.supplier_organization)
+                # До коммита строка счётчика не трогается
+                self.assertEqual(PlatformCounterService.get_counters()['proposals_total'], 0)
+                raise RuntimeError
+
+        self.assertEqual(callbacks, [])
+        self.assertEqual(PlatformCounterService.get_counters()['proposals_total'], 0)
+
+    def test_bulk_status_update(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            updated = PlatformCounterService.update_status(Organization.objects.all(), 'На проверке')
+
+        self.assertEqual(updated, 2)
+        counters = PlatformCounterService.get_counters()
+        self.assertEqual(counters['verified_organizations'], 0)
+        self.assertEqual(counters['pending_organizations'], 2)
+
+    def test_reconcile_fixes_drift(self):
+        # update() мимо сервиса — счётчик расходится с таблицей
+        Tender.objects.update(status='В оценке')
+
+        result = reconcile_platform_counters()
+
+        self.assertIn('open_tenders', result)
+        self.assertEqual(PlatformCounterService.get_counters()['open_tenders'], 0)
+
+    def test_home_reads_counters_only(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('home'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.context['stats']['organizations_count'], 2)
+
+
+class TenderSearchTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.laptops = Tender.objects.create(
+            title='Поставка ноутбуков', description='Ноутбуки для офиса', status='Открыт', method='TOPSIS',
+            start_date='2025-01-01', end_date='2025-12-31', budget=50000, organization=self.firm_organization
+        )
+        self.furniture = Tender.objects.create(
+            title='Офисная мебель', description='Столы и стулья, доставка ноутбуков не требуется',
+            status='Открыт', method='TOPSIS', start_date='2025-01-01', end_date='2025-12-31',
+            budget=30000, organization=self.firm_organization
+        )
+        self.authenticate_user(self.supplier_user)
+
+    def test_ranked_results(self):
+        response = self.client.get(reverse('api_tender_search'), {'q': 'ноутбуков'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ids = [item['id'] for item in response.data['results']]
+        # Совпадение в названии релевантнее совпадения в описании
+        self.assertEqual(ids, [self.laptops.id, self.furniture.id])
+        self.assertGreater(response.data['results'][0]['rank'], response.data['results'][1]['rank'])
+
+    def test_organization_filter(self):
+        response = self.client.get(reverse('api_tender_search'), {'organization': '1234567'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 3)
+
+    def test_empty_query_rejected(self):
+        response = self.client.get(reverse('api_tender_search'))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_html_list_orders_by_relevance(self):
+        self.client.force_login(self.supplier_user)
+
+        response = self.client.get(reverse('tender_list'), {'search': 'ноутбуков'})
+
+        self.assertEqual(response.context['ordering'], 'rank')
+        self.assertEqual([t.id for t in response.context['page_obj']], [self.laptops.id, self.furniture.id])
+
+    @unittest.skipUnless(connection.vendor == 'postgresql', 'Полнотекстовый поиск требует PostgreSQL')
+    def test_russian_stemming(self):
+        # «поставки» и «поставка» приводятся к одной основе
+        response = self.client.get(reverse('api_tender_search'), {'q': 'поставки'})
+        self.assertEqual([item['id'] for item in response.data['results']], [self.laptops.id])
+
+
+class TenderExportTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.price = TenderCriterion.objects.create(tender=self.tender, criterion=self.criterion1, weight=0.7)
+        self.quality = TenderCriterion.objects.create(tender=self.tender, criterion=self.criterion2, weight=0.3)
+        self.proposal = Proposal.objects.create(
+            tender=self.tender, supplier=self.supplier_organization, final_score=Decimal('7.50')
+        )
+        Evaluation.objects.create(
+            proposal=self.proposal, tender_criterion=self.price, proposed_value=Decimal('1000.00'), score=Decimal('9.00')
+        )
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+
+    def test_csv_is_streamed(self):
+        self.authenticate_user(self.firm_user)
+
+        response = self.client.get(reverse('api_tender_export', args=[self.tender.id]))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode('utf-8-sig')
+        rows = list(csv.reader(io.StringIO(content), delimiter=';'))
+        self.assertEqual(rows[0][6:], ['Цена: значение', 'Цена: оценка', 'Качество: значение', 'Качество: оценка'])
+        self.assertEqual(rows[1][0], str(self.proposal.id))
+        self.assertEqual(rows[1][5:], ['7.50', '1000.00', '9.00', '', ''])
+
+    @override_settings(REQUEST_PROFILE_SAMPLE_RATE=1.0)
+    def test_streamed_queries_are_profiled(self):
+        self.authenticate_user(self.firm_user)
+        response = self.client.get(reverse('api_tender_export', args=[self.tender.id]))
+
+        with CaptureQueriesContext(connection) as stream_queries, \
+                self.assertLogs('tenders.profiling', 'INFO') as logs:
+            b''.join(response.streaming_content)
+
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'api.views.TenderExportAPIView')
+        self.assertGreater(len(stream_queries), 0)
+        self.assertGreaterEqual(record['queries'], len(stream_queries) + 1)
+
+    @override_settings(QUERY_BUDGETS={'api.views.TenderExportAPIView': 1}, QUERY_BUDGET_STRICT=True)
+    def test_streamed_queries_checked_against_budget(self):
+        self.authenticate_user(self.firm_user)
+        response = self.client.get(reverse('api_tender_export', args=[self.tender.id]))
+
+        with self.assertRaises(QueryBudgetExceeded):
+            b''.join(response.streaming_content)
+
+    def test_formula_like_cells_escaped(self):
+        self.supplier_organization.name = '=HYPERLINK("http://evil","x")'
+        self.supplier_organization.registration_number = '+79990000000'
+        self.supplier_organization.save()
+
+        rows = list(ExportService.iter_rows(self.tender))
+
+        self.assertEqual(rows[1][1], '\'=HYPERLINK("http://evil","x")')
+        self.assertEqual(rows[1][2], "'+79990000000")
+
+    def test_stale_scores_exported_in_background_after_rescore(self):
+        self.authenticate_user(self.firm_user)
+        Tender.objects.filter(id=self.tender.id).update(inputs_version=F('inputs_version') + 1)
+
+        with mock.patch('api.tasks.export_tender_results.delay'), self.captureOnCommitCallbacks(execute=True):
+            response = self.client.get(reverse('api_tender_export', args=[self.tender.id]))
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+        with override_settings(MEDIA_ROOT=self.media_root), \
+                mock.patch.object(EvaluationService, 'recalculate_quantitative_scores') as recalculate:
+            export = ExportService.run_export(response.data['export_id'])
+
+        self.assertEqual(export.status, 'Готов')
+        recalculate.assert_called_once()
+        self.tender.refresh_from_db()
+        self.assertEqual(self.tender.scored_version, self.tender.inputs_version)
+
+    def test_supplier_cannot_export(self):
+        self.authenticate_user(self.supplier_user)
+        response = self.client.get(reverse('api_tender_export', args=[self.tender.id]))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_xlsx_runs_in_background(self):
+        from openpyxl import load_workbook
+
+        self.authenticate_user(self.manager_user)
+        with override_settings(MEDIA_ROOT=self.media_root), \
+                mock.patch('api.tasks.export_tender_results.delay') as delay, \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.client.get(reverse('api_tender_export', args=[self.tender.id]), {'file_format': 'xlsx'})
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        export_id = response.data['export_id']
+        delay.assert_called_once_with(export_id)
+
+        with override_settings(MEDIA_ROOT=self.media_root):
+            export_tender_results(export_id)
+            status_response = self.client.get(reverse('api_export_status', args=[export_id]))
+            self.assertEqual(status_response.data['status'], 'Готов')
+            download = self.client.get(status_response.data['download_url'])
+            content = b''.join(download.streaming_content)
+
+        sheet = load_workbook(io.BytesIO(content)).active
+        self.assertEqual(sheet.max_row, 2)
+        self.assertEqual(sheet.cell(row=2, column=1).value, self.proposal.id)
+
+    @override_settings(EXPORT_STREAM_MAX_PROPOSALS=0)
+    def test_large_csv_goes_to_background(self):
+        self.authenticate_user(self.firm_user)
+        with mock.patch('api.tasks.export_tender_results.delay'):
+            response = self.client.get(reverse('api_tender_export', args=[self.tender.id]))
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+
+class ContractGenerationTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.tender.status = 'Закрыт'
+        self.tender.save()
+        self.price = TenderCriterion.objects.create(tender=self.tender, criterion=self.criterion1, weight=1)
+        self.runner_up = Proposal.objects.create(
+            tender=self.tender, supplier=self.supplier_organization, status='Подтверждена', final_score=Decimal('6.00')
+        )
+        self.winner = Proposal.objects.create(
+            tender=self.tender, supplier=self.supplier_organization, status='Подтверждена', final_score=Decimal('8.00')
+        )
+        Evaluation.objects.create(
+            proposal=self.winner, tender_criterion=self.price, proposed_value=Decimal('900.00'), score=Decimal('8.00')
+        )
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+
+    def test_winner_of_closed_tender(self):
+        Tender.objects.create(
+            title='Открытый', status='Открыт', method='TOPSIS', start_date='2025-01-01',
+            end_date='2025-12-31', budget=1000, organization=self.firm_organization
+        )
+        self.assertEqual(list(ContractService.winners_queryset()), [self.winner])
+
+    def test_render_contract_saves_pdf_once(self):
+        with override_settings(MEDIA_ROOT=self.media_root), \
+                mock.patch.object(ContractService, 'render_pdf', return_value=b'%PDF-1.7') as render_pdf:
+            contract = ContractService.render_contract(self.winner.id)
+            ContractService.render_contract(self.winner.id)
+
+        render_pdf.assert_called_once()
+        html = render_pdf.call_args[0][0]
+        self.assertIn(contract.contract_number, html)
+        self.assertIn('Тестовый Поставщик', html)
+        self.assertIn('900,00', html)
+        self.assertTrue(contract.pdf_file.name.endswith('.pdf'))
+        self.assertFalse(ContractService.winners_queryset().exists())
+
+    def test_generate_endpoint_queues_batches(self):
+        self.authenticate_user(self.manager_user)
+        with mock.patch('api.tasks.render_contracts_batch.apply_async') as apply_async:
+            response = self.client.post(reverse('api_contracts_generate'), {}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['queued'], 1)
+        apply_async.assert_called_once_with(args=[[self.winner.id]], queue='contracts')
+
+    def test_stale_tender_skipped_and_rescore_queued(self):
+        Tender.objects.filter(id=self.tender.id).update(inputs_version=F('inputs_version') + 1)
+        shared_cache.delete(EvaluationService.rescore_flag_key(self.tender.id))
+        self.authenticate_user(self.manager_user)
+        with mock.patch('api.tasks.render_contracts_batch.apply_async') as apply_async, \
+                mock.patch.object(rescore_tender, 'apply_async') as rescore:
+            response = self.client.post(reverse('api_contracts_generate'), {}, format='json')
+
+        self.assertEqual(response.data['queued'], 0)
+        self.assertEqual(response.data['stale_tender_ids'], [self.tender.id])
+        apply_async.assert_not_called()
+        rescore.assert_called_once()
+
+    def test_render_refuses_stale_scores(self):
+        Tender.objects.filter(id=self.tender.id).update(inputs_version=F('inputs_version') + 1)
+        with self.assertRaises(ValueError):
+            ContractService.render_contract(self.winner.id)
+        self.assertFalse(Contract.objects.filter(proposal=self.winner).exists())
+
+    def test_generate_requires_manager(self):
+        self.authenticate_user(self.firm_user)
+        response = self.client.post(reverse('api_contracts_generate'), {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_batch_logs_failures_and_retries_transient(self):
+        errors = {self.winner.id: OperationalError('connection lost'), self.runner_up.id: ValueError('template')}
+
+        def render(proposal_id):
+            raise errors[proposal_id]
+
+        with mock.patch.object(ContractService, 'render_contract', side_effect=render), \
+                mock.patch.object(render_contracts_batch, 'retry', side_effect=RuntimeError('retry')) as retry, \
+                self.assertLogs('api.tasks', level='ERROR') as logs:
+            with self.assertRaisesMessage(RuntimeError, 'retry'):
+                render_contracts_batch([self.winner.id, self.runner_up.id])
+
+        self.assertEqual(len(logs.records), 2)
+        self.assertIsNotNone(logs.records[0].exc_info)
+        # Повторяется только договор с временным сбоем
+        self.assertEqual(retry.call_args.kwargs['args'], [[self.winner.id]])
+
+    def test_batch_gives_up_after_max_retries(self):
+        render_contracts_batch.push_request(retries=settings.CONTRACT_MAX_RETRIES)
+        self.addCleanup(render_contracts_batch.pop_request)
+
+        with mock.patch.object(ContractService, 'render_contract', side_effect=OperationalError('down')), \
+                mock.patch.object(render_contracts_batch, 'retry') as retry, \
+                self.assertLogs('api.tasks', level='ERROR'):
+            result = render_contracts_batch([self.winner.id])
+
+        retry.assert_not_called()
+        self.assertIn(str(self.winner.id), result)
+
+
+class DocumentDeduplicationTests(BaseAPITestCase):
+    CONTENT = b'%PDF-1.4 charter'
+
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def register(self, username, registration_number):
+        return self.client.post(reverse('api_register'), {
+            'username': username, 'email': f'{username}@test.com', 'password': 'newpass123',
+            'role': 'Поставщик', 'name': username, 'fio': 'Сидоров Сидор',
+            'registration_number': registration_number, 'org_type': 'ООО',
+            'charter': SimpleUploadedFile('устав.pdf', self.CONTENT, content_type='application/pdf'),
+        }, format='multipart')
+
+    def test_same_upload_stored_once(self):
+        self.assertEqual(self.register('first', '100000001').status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.register('second', '100000002').status_code, status.HTTP_201_CREATED)
+
+        digest = hashlib.sha256(self.CONTENT).hexdigest()
+        blob = DocumentBlob.objects.get()
+        self.assertEqual(blob.sha256, digest)
+        self.assertEqual(blob.ref_count, 2)
+        self.assertEqual(set(Document.objects.values_list('file', flat=True)), {blob.file.name})
+
+        stored = [name for _, _, names in os.walk(self.media_root) for name in names]
+        self.assertEqual(stored, [f'{digest}.pdf'])
+
+    def test_last_reference_removes_file(self):
+        first = DocumentStorageService.build_document(
+            SimpleUploadedFile('a.pdf', self.CONTENT), organization=self.supplier_organization, name='Устав'
+        )
+        first.save()
+        second = DocumentStorageService.build_document(
+            SimpleUploadedFile('b.pdf', self.CONTENT), organization=self.firm_organization, name='Устав'
+        )
+        second.save()
+        path = os.path.join(self.media_root, first.file.name)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertEqual(DocumentBlob.objects.get().ref_count, 1)
+        self.assertTrue(os.path.exists(path))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.firm_organization.delete()
+        self.assertFalse(DocumentBlob.objects.exists())
+        self.assertFalse(os.path.exists(path))
+
+    def test_failed_document_insert_does_not_keep_reference(self):
+        DocumentStorageService.build_document(
+            SimpleUploadedFile('a.pdf', self.CONTENT), organization=self.supplier_organization, name='Устав'
+        ).save()
+
+        with mock.patch.object(Document.objects, 'bulk_create', side_effect=OperationalError), \
+                self.assertRaises(OperationalError):
+            ProposalRepository.create_proposal(
+                self.tender, self.supplier_organization, [SimpleUploadedFile('b.pdf', self.CONTENT)]
+            )
+
+        self.assertEqual(DocumentBlob.objects.get().ref_count, 1)
+
+    def test_build_document_requires_transaction(self):
+        with mock.patch.object(transaction, 'get_connection') as get_connection:
+            get_connection.return_value.in_atomic_block = False
+            with self.assertRaises(transaction.TransactionManagementError):
+                DocumentStorageService.build_document(SimpleUploadedFile('a.pdf', self.CONTENT), name='Устав')
+        self.assertFalse(DocumentBlob.objects.exists())
+
+    def test_orphan_file_kept_if_reuploaded_while_waiting_for_lock(self):
+        document = DocumentStorageService.build_document(
+            SimpleUploadedFile('a.pdf', self.CONTENT), organization=self.supplier_organization, name='Устав'
+        )
+        document.save()
+        path = os.path.join(self.media_root, document.file.name)
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            document.delete()
+
+        # Параллельная загрузка того же файла успевает закоммитить blob, пока удаление ждёт блокировку
+        waiting = []
+
+        def lock_digest(digest):
+            if not waiting:
+                waiting.append(digest)
+                DocumentStorageService.store(SimpleUploadedFile('b.pdf', self.CONTENT))
+
+        with mock.patch.object(DocumentStorageService, '_lock_digest', side_effect=lock_digest):
+            for callback in callbacks:
+                callback()
+
+        self.assertEqual(DocumentBlob.objects.get().ref_count, 1)
+        self.assertTrue(os.path.exists(path))
+
+
+class ProtectedDocumentDownloadTests(BaseAPITestCase):
+    CONTENT = b'0123456789' * 10
+
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        proposal = Proposal.objects.create(tender=self.tender, supplier=self.supplier_organization)
+        self.document = DocumentStorageService.build_document(
+            SimpleUploadedFile('scan.pdf', self.CONTENT), proposal=proposal, name='Скан'
+        )
+        self.document.save()
+        self.url = reverse('api_document_download', args=[self.document.id])
+
+    def test_full_download(self):
+        self.authenticate_user(self.supplier_user)
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b''.join(response.streaming_content), self.CONTENT)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('attachment', response['Content-Disposition'])
+
+    def test_range_requests(self):
+        self.authenticate_user(self.firm_user)
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 10-19/100')
+        self.assertEqual(b''.join(response.streaming_content), self.CONTENT[10:20])
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=-5')
+        self.assertEqual(b''.join(response.streaming_content), self.CONTENT[-5:])
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=500-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */100')
+
+    def test_unrelated_organization_forbidden(self):
+        outsider = User.objects.create_user(username='outsider', password='testpass123', role='Поставщик')
+        Organization.objects.create(
+            user=outsider, name='Чужая', fio='Чужой', registration_number='555', org_type='ООО',
+            verification_status='Подтверждено'
+        )
+        self.authenticate_user(outsider)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(PROTECTED_MEDIA_BACKEND='nginx')
+    def test_proxy_offload(self):
+        self.authenticate_user(self.manager_user)
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.document.file.name}')
+        self.assertEqual(response.content, b'')
+
+    def test_html_view(self):
+        self.client.force_login(self.manager_user)
+        response = self.client.get(reverse('document_download', args=[self.document.id]), {'inline': '1'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('inline', response['Content-Disposition'])
+        self.assertEqual(response['ETag'], f'"{self.document.blob_id}"')
+
+
+class ApprovalEmailBatchTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.pending = []
+        for i in range(3):
+            user = User.objects.create_user(username=f'firm{i}', email=f'firm{i}@test.com', password='x', role='Фирма')
+            self.pending.append(Organization.objects.create(
+                user=user, name=f'Фирма {i}', fio='Иванов', registration_number=f'70000{i}', org_type='ООО',
+                verification_status='Подтверждено'
+            ))
+        # Организации из BaseAPITestCase уже уведомлены
+        Organization.objects.exclude(id__in=[org.id for org in self.pending]).update(approval_email_sent=True)
+
+    def test_batch_uses_single_connection(self):
+        with mock.patch('tenders.services.mail_service.get_connection', wraps=mail.get_connection) as get_connection:
+            result = MailService.send_approval_batch()
+
+        get_connection.assert_called_once()
+        self.assertEqual(len(result['sent']), 3)
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ['firm0@test.com', 'firm1@test.com', 'firm2@test.com'])
+        self.assertFalse(MailService.pending_approvals().exists())
+
+        # Повторный запуск ничего не отправляет
+        self.assertEqual(MailService.send_approval_batch()['sent'], [])
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_transient_failure_keeps_sent_flags(self):
+        original_send = mail.EmailMessage.send
+        calls = []
+
+        def flaky_send(message, *args, **kwargs):
+            calls.append(message)
+            if len(calls) == 2:
+                raise smtplib.SMTPServerDisconnected('обрыв соединения')
+            return original_send(message, *args, **kwargs)
+
+        with mock.patch.object(mail.EmailMessage, 'send', flaky_send):
+            with self.assertRaises(smtplib.SMTPServerDisconnected):
+                MailService.send_approval_batch()
+
+        self.assertEqual(MailService.pending_approvals().count(), 2)
+        MailService.send_approval_batch()
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_permanent_failure_leaves_queue(self):
+        original_send = mail.EmailMessage.send
+        claimed_during_send = []
+
+        def send(message, *args, **kwargs):
+            # Строки захвачены на время отправки, но транзакция захвата уже закрыта
+            claimed_during_send.append(
+                Organization.objects.filter(user__email=message.to[0], approval_email_claimed_at__isnull=False).exists()
+            )
+            if message.to[0] == 'firm1@test.com':
+                raise smtplib.SMTPRecipientsRefused({message.to[0]: (550, b'no such user')})
+            return original_send(message, *args, **kwargs)
+
+        with mock.patch.object(mail.EmailMessage, 'send', send):
+            result = MailService.send_approval_batch()
+
+        self.assertEqual(result['failed'], [self.pending[1].id])
+        self.assertEqual(claimed_during_send, [True, True, True])
+        failed = Organization.objects.get(id=self.pending[1].id)
+        self.assertTrue(failed.approval_email_failed)
+        self.assertIsNone(failed.approval_email_claimed_at)
+        # Плохой адрес не отправляется повторно
+        self.assertFalse(MailService.pending_approvals().exists())
+        self.assertEqual(MailService.send_approval_batch(), {'sent': [], 'failed': []})
+
+    @override_settings(MAIL_MAX_ATTEMPTS=2)
+    def test_repeated_transient_failures_give_up(self):
+        error = smtplib.SMTPResponseException(451, b'try later')
+        with mock.patch.object(mail.EmailMessage, 'send', side_effect=error):
+            for _ in range(2):
+                with self.assertRaises(smtplib.SMTPResponseException):
+                    MailService.send_approval_batch()
+
+        head = Organization.objects.get(id=self.pending[0].id)
+        self.assertEqual(head.approval_email_attempts, 2)
+        self.assertTrue(head.approval_email_failed)
+        self.assertEqual(MailService.pending_approvals().count(), 2)
+
+    def test_claimed_rows_skipped_until_claim_expires(self):
+        Organization.objects.filter(id=self.pending[0].id).update(approval_email_claimed_at=timezone.now())
+        self.assertEqual(len(MailService.send_approval_batch()['sent']), 2)
+
+        Organization.objects.filter(id=self.pending[0].id).update(
+            approval_email_claimed_at=timezone.now() - datetime.timedelta(seconds=settings.MAIL_CLAIM_TIMEOUT_SECONDS + 1)
+        )
+        self.assertEqual(MailService.send_approval_batch()['sent'], [self.pending[0].id])
+
+    def test_task_retries_transient_errors(self):
+        error = smtplib.SMTPServerDisconnected('обрыв')
+        with mock.patch.object(MailService, 'send_approval_batch', side_effect=error), \
+                mock.patch.object(send_pending_approval_emails, 'retry', side_effect=RuntimeError('retry')) as retry:
+            with self.assertRaisesMessage(RuntimeError, 'retry'):
+                send_pending_approval_emails()
+
+        retry.assert_called_once_with(exc=error, countdown=30)
+
+    def test_task_does_not_retry_permanent_errors(self):
+        error = smtplib.SMTPAuthenticationError(535, 'неверный пароль')
+        with mock.patch.object(MailService, 'send_approval_batch', side_effect=error), \
+                mock.patch.object(send_pending_approval_emails, 'retry') as retry:
+            with self.assertRaises(smtplib.SMTPAuthenticationError):
+                send_pending_approval_emails()
+
+        retry.assert_not_called()
+
+    def test_verification_schedules_one_flush(self):
+        org = self.pending[0]
+        Organization.objects.filter(id__in=[o.id for o in self.pending]).update(
+            verification_status='На проверке'
+        )
+        shared_cache.delete(MailService.FLUSH_FLAG_KEY)
+        self.authenticate_user(self.manager_user)
+
+        with mock.patch('api.tasks.send_pending_approval_emails.apply_async') as apply_async, \
+                self.captureOnCommitCallbacks(execute=True):
+            for pending in self.pending:
+                response = self.client.post(
+                    reverse('api_verify_organization', args=[pending.id]),
+                    {'verification_status': 'Подтверждено'}, format='json'
+                )
+                self.assertEqual(response.data['email']['status'], 'queued')
+
+        apply_async.assert_called_once()
+        self.assertFalse(Organization.objects.get(id=org.id).approval_email_sent)
+
+
+class UserContextTests(BaseAPITestCase):
+    def test_warm_profile_request_has_no_queries(self):
+        self.authenticate_user(self.firm_user)
+        with self.assertNumQueries(1):
+            self.client.get(reverse('api_profile'))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('api_profile'))
+        self.assertEqual(response.data['organization']['verification_status'], 'Подтверждено')
+
+    def test_organization_change_invalidates_context(self):
+        self.authenticate_user(self.firm_user)
+        self.client.get(reverse('api_profile'))
+
+        self.firm_organization.verification_status = 'Отклонено'
+        self.firm_organization.save()
+
+        response = self.client.get(reverse('api_profile'))
+        self.assertEqual(response.data['organization']['verification_status'], 'Отклонено')
+
+    def test_login_loads_user_in_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.post(
+                reverse('api_login'), {'username': 'firm', 'password': 'testpass123'}, format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['organization']['name'], 'Тестовая Фирма')
+
+    def test_manager_profile_created_once(self):
+        user = UserContextService.get_user(self.manager_user.id)
+        manager = UserContextService.get_manager_profile(user)
+
+        self.assertEqual(UserContextService.get_user(self.manager_user.id).manager_profile, manager)
+        with self.assertNumQueries(0):
+            UserContextService.get_manager_profile(user)
+
+    def test_inactive_user_rejected(self):
+        self.authenticate_user(self.firm_user)
+        self.client.get(reverse('api_profile'))
+        self.firm_user.is_active = False
+        self.firm_user.save()
+
+        response = self.client.get(reverse('api_profile'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class AsyncReadEndpointTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        TenderCriterion.objects.create(tender=self.tender, criterion=self.criterion1, weight=1)
+        Proposal.objects.create(tender=self.tender, supplier=self.supplier_organization, status='Подана')
+
+    def auth_headers(self, user):
+        return {'AUTHORIZATION': f'Bearer {AccessToken.for_user(user)}'}
+
+    def test_responses_match_sync_views(self):
+        pairs = [
+            (self.firm_user, reverse('api_tender_list'), reverse('api_async_tender_list')),
+            (self.firm_user, reverse('api_tender_detail', kwargs={'pk': self.tender.id}),
+             reverse('api_async_tender_detail', kwargs={'pk': self.tender.id})),
+            (self.manager_user, reverse('api_pending_proposals'), reverse('api_async_pending_proposals')),
+            (self.manager_user, reverse('api_pending_organizations'), reverse('api_async_pending_organizations')),
+        ]
+        for user, sync_url, async_url in pairs:
+            self.authenticate_user(user)
+            expected = self.client.get(sync_url).json()
+            response = async_to_sync(self.async_client.get)(async_url, headers=self.auth_headers(user))
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK, async_url)
+            self.assertEqual(response.json(), expected, async_url)
+
+    async def test_list_pages_through_cursor(self):
+        await Tender.objects.abulk_create([
+            Tender(
+                title=f'Тендер {i}', status='Открыт', method='TOPSIS', start_date='2025-01-01',
+                end_date='2025-12-31', budget=1000, organization=self.firm_organization
+            )
+            for i in range(4)
+        ])
+        url = reverse('api_async_tender_list') + '?page_size=3'
+        headers = self.auth_headers(self.firm_user)
+
+        first = (await self.async_client.get(url, headers=headers)).json()
+        second = (await self.async_client.get(first['next'], headers=headers)).json()
+
+        self.assertEqual(len(first['results']), 3)
+        self.assertEqual(len(second['results']), 2)
+        self.assertIsNone(second['next'])
+
+    async def test_detail_cached_with_etag(self):
+        url = reverse('api_async_tender_detail', kwargs={'pk': self.tender.id})
+        headers = self.auth_headers(self.firm_user)
+        response = await self.async_client.get(url, headers=headers)
+
+        cached = await self.async_client.get(url, headers={**headers, 'IF_NONE_MATCH': response['ETag']})
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        missing = await self.async_client.get(
+            reverse('api_async_tender_detail', kwargs={'pk': 999999}), headers=headers
+        )
+        self.assertEqual(missing.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_authentication_and_manager_role_required(self):
+        url = reverse('api_async_pending_proposals')
+
+        anonymous = await self.async_client.get(url)
+        self.assertEqual(anonymous.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn('Bearer', anonymous['WWW-Authenticate'])
+
+        supplier = await self.async_client.get(url, headers=self.auth_headers(self.supplier_user))
+        self.assertEqual(supplier.status_code, status.HTTP_403_FORBIDDEN)
+
+        invalid = await self.async_client.get(url, headers={'AUTHORIZATION': 'Bearer broken'})
+        self.assertEqual(invalid.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_benchmark_command_reports_both_deployments(self):
+        out = io.StringIO()
+        with mock.patch.object(BenchmarkCommand, '_fetch', return_value=(0.01, True)) as fetch:
+            call_command(
+                'benchmark_async_api', username='firm', endpoint=['tender-detail'],
+                requests=10, concurrency=2, json=True, stdout=out
+            )
+
+        results = json.loads(out.getvalue())
+        self.assertEqual([r['deployment'] for r in results], ['wsgi', 'asgi'])
+        self.assertTrue(results[1]['url'].endswith(
+            reverse('api_async_tender_detail', kwargs={'pk': self.tender.id})
+        ))
+        self.assertEqual(results[0]['errors'], 0)
+        self.assertEqual(fetch.call_count, 22)
+
+
+@override_settings(SERVER_TIMING_HEADER=True)
+class RequestProfilingTests(BaseAPITestCase):
+    def test_server_timing_breaks_down_request(self):
+        self.authenticate_user(self.firm_user)
+        response = self.client.get(reverse('api_tender_list'))
+
+        timing = response['Server-Timing']
+        for metric in ('db;dur=', 'serialize;dur=', 'template;dur=', 'app;dur=', 'total;dur='):
+            self.assertIn(metric, timing)
+        self.assertIn('desc="2 queries"', timing)
+
+    @override_settings(SERVER_TIMING_HEADER=False)
+    def test_server_timing_disabled(self):
+        self.authenticate_user(self.firm_user)
+        response = self.client.get(reverse('api_tender_list'))
+        self.assertNotIn('Server-Timing', response)
+
+    @override_settings(QUERY_BUDGETS={'api.views.TenderListAPIView': 1}, QUERY_BUDGET_STRICT=True)
+    def test_query_budget_exceeded_raises(self):
+        self.authenticate_user(self.firm_user)
+
+        with self.assertRaisesMessage(QueryBudgetExceeded, 'api.views.TenderListAPIView: 2'):
+            self.client.get(reverse('api_tender_list'))
+
+    @override_settings(QUERY_BUDGETS={'api.views.TenderListAPIView': 1}, QUERY_BUDGET_STRICT=False)
+    def test_query_budget_exceeded_logged_outside_tests(self):
+        self.authenticate_user(self.firm_user)
+
+        with self.assertLogs('tenders.profiling', 'WARNING') as logs:
+            response = self.client.get(reverse('api_tender_list'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'api.views.TenderListAPIView')
+        self.assertEqual(record['queries'], 2)
+        self.assertEqual(record['query_budget'], 1)
+
+    @override_settings(REQUEST_PROFILE_SAMPLE_RATE=1.0)
+    def test_sampled_log_names_function_view(self):
+        with self.assertLogs('tenders.profiling', 'INFO') as logs:
+            self.client.get(reverse('home'))
+
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'tenders.views.home')
+        self.assertGreater(record['template_ms'], 0)
+
+    def test_async_view_queries_counted(self):
+        response = async_to_sync(self.async_client.get)(
+            reverse('api_async_tender_list'),
+            headers={'AUTHORIZATION': f'Bearer {AccessToken.for_user(self.firm_user)}'},
+        )
+        self.assertIn('desc="2 queries"', response['Server-Timing'])
+
+
+class SyntheticDataBenchmarkTests(TestCase):
+    def generate(self, prefix):
+        call_command(
+            'generate_synthetic_data', organizations=30, tenders=6, proposals=40, criteria_per_tender=4,
+            seed=7, batch_size=50, tenders_per_chunk=4, prefix=prefix, stdout=io.StringIO()
+        )
+        tenders = Tender.objects.filter(description__contains=f' {prefix} ').order_by('id')
+        return [
+            (tender.budget, tender.status, tender.method, tender.proposals.count(),
+             sorted(tender.criteria.values_list('weight', flat=True)))
+            for tender in tenders
+        ]
+
+    def test_same_seed_generates_same_data(self):
+        first = self.generate('a')
+        self.assertEqual(first, self.generate('b'))
+
+        self.assertEqual(len(first), 6)
+        self.assertEqual(Proposal.objects.count(), 80)
+        self.assertEqual(Evaluation.objects.count(), 80 * 4)
+        self.assertEqual(
+            PlatformCounterService.get_counters()['proposals_total'], 80
+        )
+
+    def test_existing_prefix_rejected(self):
+        self.generate('a')
+        with self.assertRaisesMessage(CommandError, 'уже есть'):
+            self.generate('a')
+
+    def test_benchmark_reports_every_hot_path(self):
+        self.generate('a')
+        out = io.StringIO()
+
+        call_command('benchmark_hot_paths', iterations=2, warmup=0, json=True, stdout=out)
+
+        report = json.loads(out.getvalue())
+        self.assertEqual(
+            [result['name'] for result in report['results']],
+            ['recalculate_quantitative_scores', 'submit_proposal_with_criteria', 'manager_requests',
+             'tender_list_api', 'tender_detail_api'],
+        )
+        self.assertEqual(report['dataset']['proposals'], 40)
+        for result in report['results']:
+            self.assertEqual(result['iterations'], 2)
+            self.assertLessEqual(result['min_ms'], result['median_ms'])
+        # Пишущие замеры откатываются
+        self.assertEqual(Proposal.objects.count(), 40)
+
+
+class LeaderboardTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.proposals = [Proposal.objects.create(tender=self.tender, supplier=self.supplier_organization)]
+        for i, score in enumerate(['7.50', '9.00', '7.50']):
+            user = User.objects.create_user(username=f'rival{i}', password='testpass123', role='Поставщик')
+            organization = Organization.objects.create(
+                user=user, name=f'Конкурент {i}', fio='Сидоров', registration_number=f'RIV{i}',
+                org_type='ООО', verification_status='Подтверждено'
+            )
+            self.proposals.append(Proposal.objects.create(
+                tender=self.tender, supplier=organization, final_score=Decimal(score)
+            ))
+        Proposal.objects.filter(pk=self.proposals[0].pk).update(final_score=Decimal('6.00'))
+        LeaderboardService.refresh(self.tender)
+
+    def test_owner_sees_ranks_with_ties_and_gap(self):
+        self.authenticate_user(self.firm_user)
+        response = self.client.get(reverse('api_tender_leaderboard', kwargs={'pk': self.tender.id}))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = [(r['rank'], r['final_score'], r['gap_to_leader']) for r in response.data['results']]
+        self.assertEqual(rows, [(1, '9.00', '0.00'), (2, '7.50', '1.50'), (2, '7.50', '1.50'), (4, '6.00', '3.00')])
+        self.assertEqual(response.data['results'][0]['proposal_id'], self.proposals[2].id)
+
+    def test_pages_follow_rank_order(self):
+        self.authenticate_user(self.manager_user)
+        url = reverse('api_tender_leaderboard', kwargs={'pk': self.tender.id})
+
+        first = self.client.get(url, {'page_size': 2}).data
+        second = self.client.get(first['next']).data
+
+        ranks = [r['rank'] for r in first['results'] + second['results']]
+        self.assertEqual(ranks, [1, 2, 2, 4])
+        self.assertIsNone(second['next'])
+
+    def test_supplier_sees_only_own_position(self):
+        self.authenticate_user(self.supplier_user)
+
+        board = self.client.get(reverse('api_tender_leaderboard', kwargs={'pk': self.tender.id}))
+        self.assertEqual(board.status_code, status.HTTP_403_FORBIDDEN)
+
+        response = self.client.get(reverse('api_tender_leaderboard_position', kwargs={'pk': self.tender.id}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['rank'], 4)
+        self.assertEqual(response.data['gap_to_leader'], '3.00')
+        self.assertEqual(response.data['participants'], 4)
+
+    def test_refreshed_when_scoring_runs(self):
+        TenderCriterion.objects.create(tender=self.tender, criterion=self.criterion2, weight=1)
+        tender_criterion = self.tender.criteria.get()
+        for proposal, score in zip(self.proposals, ['10', '2', '3', '4']):
+            Evaluation.objects.create(proposal=proposal, tender_criterion=tender_criterion, score=Decimal(score))
+
+        EvaluationService.update_final_scores(self.tender)
+
+        leader = ProposalRank.objects.get(tender=self.tender, rank=1)
+        self.assertEqual(leader.proposal_id, self.proposals[0].id)
+        self.assertEqual(leader.final_score, Decimal('10.00'))
+        self.assertEqual(ProposalRank.objects.filter(tender=self.tender).count(), 4)
+
+    def ranks(self):
+        return list(ProposalRank.objects.filter(tender=self.tender).order_by('rank', 'proposal_id')
+                    .values_list('proposal_id', 'rank', 'gap_to_leader'))
+
+    def test_rejected_proposal_leaves_board(self):
+        ProposalService.set_status(Proposal.objects.get(pk=self.proposals[2].pk), 'Отклонена')
+
+        self.assertEqual(self.ranks(), [
+            (self.proposals[1].id, 1, Decimal('0.00')),
+            (self.proposals[3].id, 1, Decimal('0.00')),
+            (self.proposals[0].id, 3, Decimal('1.50')),
+        ])
+
+        ProposalService.set_status(Proposal.objects.get(pk=self.proposals[2].pk), 'Подтверждена')
+        self.assertEqual(self.ranks()[0], (self.proposals[2].id, 1, Decimal('0.00')))
+
+    def test_bulk_reject_refreshes_board(self):
+        self.authenticate_user(self.manager_user)
+        response = self.client.post(reverse('api_bulk_verify_proposals'), {
+            'ids': [self.proposals[1].id, self.proposals[2].id], 'status': 'Отклонена'
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['updated']), 2)
+        self.assertEqual(self.ranks(), [
+            (self.proposals[3].id, 1, Decimal('0.00')),
+            (self.proposals[0].id, 2, Decimal('1.50')),
+        ])
+
+
+class SensitivityTests(BaseAPITestCase):
+    _proposal = TopsisServiceTests._proposal
+
+    def setUp(self):
+        super().setUp()
+        self.tender.method = 'TOPSIS'
+        self.tender.save()
+        self.price = TenderCriterion.objects.create(tender=self.tender, criterion=self.criterion1, weight=0.6)
+        self.quality = TenderCriterion.objects.create(tender=self.tender, criterion=self.criterion2, weight=0.4)
+
+    def test_batch_matches_single_weight_vector(self):
+        rng = np.random.default_rng(7)
+        matrix = rng.uniform(1, 100, (30, 4))
+        matrix[5, 1] = np.nan
+        weights = rng.dirichlet(np.ones(4), size=3)
+        is_benefit = np.array([True, False, True, False])
+
+        batch = TopsisService.closeness_batch(matrix, weights, is_benefit)
+        for k in range(3):
+            np.testing.assert_allclose(batch[:, k], TopsisService.closeness(matrix, weights[k], is_benefit))
+        np.testing.assert_allclose(AhpService.weighted_sum(matrix, weights)[:, 1], AhpService.weighted_sum(matrix, weights[1]))
+
+    def test_win_probabilities_and_rank_distribution(self):
+        best = self._proposal('2001', 800, 9)
+        self._proposal('2002', 1000, 6)
+        self._proposal('2003', 1200, 2)
+        self.authenticate_user(self.firm_user)
+
+        response = self.client.get(
+            reverse('api_tender_sensitivity', kwargs={'pk': self.tender.id}), {'samples': 500, 'seed': 3}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['base_winner'], best.id)
+        # Лучшая по всем критериям заявка побеждает при любых весах
+        self.assertEqual(response.data['winner_stability'], 1.0)
+        self.assertEqual([p['expected_rank'] for p in response.data['proposals']], [1.0, 2.0, 3.0])
+        self.assertEqual(response.data['proposals'][2]['rank_distribution'], {'3': 1.0})
+
+    def test_close_proposals_share_wins(self):
+        matrix = np.array([[1.0, 9.0], [9.0, 1.0], [5.0, 5.0]])
+        result = SensitivityService.simulate('AHP', matrix, np.array([0.5, 0.5]), np.array([True, True]), 3000, 0.3, 1)
+
+        self.assertEqual(result['wins'].sum(), 3000)
+        self.assertTrue((result['rank_counts'].sum(axis=0) == 3000).all())
+        self.assertTrue((result['rank_counts'].sum(axis=1) == 3000).all())
+        self.assertTrue(result['wins'][0] > 1000 and result['wins'][1] > 1000)
+        self.assertEqual(result['wins'][2], 0)
+
+    def test_large_tender_bounded(self):
+        matrix = np.random.default_rng(5).uniform(1, 10, (40, 2))
+        result = SensitivityService.simulate(
+            'AHP', matrix, np.array([0.5, 0.5]), np.array([True, True]), 500, 0.5, 2, top_ranks=3
+        )
+
+        # Гистограмма только по первым местам, остальные показатели — по всем
+        self.assertEqual(result['rank_counts'].shape, (40, 3))
+        self.assertTrue((result['rank_counts'].sum(axis=0) == 500).all())
+        self.assertEqual(result['worst_ranks'].max(), 39)
+        self.assertEqual(result['rank_sum'].sum(), 500 * sum(range(40)))
+
+        with override_settings(SENSITIVITY_MAX_CELLS=400, SENSITIVITY_TOP_RANKS=2):
+            for i in range(3):
+                self._proposal(f'30{i}', 900 + i * 100, 5 + i)
+            data = SensitivityService.analyze(self.manager_user, self.tender.id, samples=5000, spread=0.3, seed=1)
+
+        self.assertEqual((data['samples'], data['requested_samples'], data['top_ranks']), (133, 5000, 2))
+        for proposal in data['proposals']:
+            self.assertTrue(set(proposal['rank_distribution']) <= {'1', '2'})
+
+    def test_same_seed_same_result(self):
+        self._proposal('2004', 900, 5)
+        self._proposal('2005', 1000, 7)
+        first = SensitivityService.analyze(self.manager_user, self.tender.id, samples=300, spread=0.5, seed=11)
+        second = SensitivityService.analyze(self.manager_user, self.tender.id, samples=300, spread=0.5, seed=11)
+        self.assertEqual(first, second)
+
+    def test_access_and_params(self):
+        self._proposal('2006', 900, 5)
+        url = reverse('api_tender_sensitivity', kwargs={'pk': self.tender.id})
+
+        self.authenticate_user(self.supplier_user)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.authenticate_user(self.manager_user)
+        self.assertEqual(self.client.get(url, {'samples': 10}).status_code, status.HTTP_400_BAD_REQUEST)
+        missing = self.client.get(reverse('api_tender_sensitivity', kwargs={'pk': 999999}))
+        self.assertEqual(missing.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class BulkVerificationTests(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        PlatformCounterService.reconcile()
+        self.organizations = []
+        for i in range(5):
+            user = User.objects.create_user(
+                username=f'bulk{i}', email=f'bulk{i}@test.com', password='x', role='Поставщик', is_active=False
+            )
+            organization = Organization.objects.create(
+                user=user, name=f'Поставщик {i}', fio='Иванов', registration_number=f'80000{i}', org_type='ООО'
+            )
+            Document.objects.create(
+                organization=organization, document_type='verification', name='Устав', file='documents/charter.pdf'
+            )
+            self.organizations.append(organization)
+        self.org_ids = [org.id for org in self.organizations]
+
+    def post_organizations(self, ids, verification_status='Подтверждено'):
+        return self.client.post(
+            reverse('api_bulk_verify_organizations'),
+            {'ids': ids, 'verification_status': verification_status}, format='json'
+        )
+
+    def test_approve_organizations_in_constant_queries(self):
+        self.authenticate_user(self.manager_user)
+        shared_cache.delete(MailService.FLUSH_FLAG_KEY)
+        counters_before = PlatformCounterService.get_counters()
+
+        with mock.patch('api.tasks.send_pending_approval_emails.apply_async') as apply_async, \
+                self.captureOnCommitCallbacks(execute=True):
+            # Прогрев: профиль менеджера создаётся, контекст пользователя попадает в кеш
+            self.post_organizations(self.org_ids[:1])
+            self.post_organizations(self.org_ids[1:2])
+            with CaptureQueriesContext(connection) as first:
+                self.post_organizations(self.org_ids[2:3])
+            with CaptureQueriesContext(connection) as rest:
+                response = self.post_organizations(self.org_ids[3:] + [999999])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated'], self.org_ids[3:])
+        self.assertEqual(response.data['not_found'], [999999])
+        # Одна задача на письма для обеих пачек
+        apply_async.assert_called_once()
+        # Число запросов не зависит от размера пачки
+        self.assertEqual(len(rest), len(first))
+
+        self.assertFalse(Organization.objects.filter(id__in=self.org_ids).exclude(verification_status='Подтверждено').exists())
+        self.assertFalse(Organization.objects.filter(id__in=self.org_ids, verified_by__isnull=True).exists())
+        self.assertEqual(User.objects.filter(organization__id__in=self.org_ids, is_active=True).count(), 5)
+        self.assertEqual(
+            Document.objects.filter(organization_id__in=self.org_ids, verification_status='Подтвержден').count(), 5
+        )
+        counters = PlatformCounterService.get_counters()
+        self.assertEqual(counters['verified_organizations'], counters_before['verified_organizations'] + 5)
+        self.assertEqual(counters['pending_organizations'], counters_before['pending_organizations'] - 5)
+
+    def test_reject_deactivates_users_and_refreshes_cache(self):
+        organization = self.organizations[0]
+        self.authenticate_user(organization.user)
+        User.objects.filter(id=organization.user_id).update(is_active=True)
+        UserContextService.invalidate(organization.user_id)
+        self.assertEqual(self.client.get(reverse('api_profile')).status_code, status.HTTP_200_OK)
+
+        self.authenticate_user(self.manager_user)
+        with mock.patch('api.tasks.send_pending_approval_emails.apply_async') as apply_async, \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.post_organizations(self.org_ids, 'Отклонено')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        apply_async.assert_not_called()
+        self.assertEqual(
+            Document.objects.filter(organization_id__in=self.org_ids, verification_status='Отклонен').count(), 5
+        )
+        # Контекст пользователя сброшен — отключённый пользователь больше не проходит аутентификацию
+        self.authenticate_user(organization.user)
+        self.assertEqual(self.client.get(reverse('api_profile')).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_proposals_and_documents(self):
+        proposals = []
+        for organization in self.organizations[:3]:
+            proposal = Proposal.objects.create(tender=self.tender, supplier=organization)
+            Document.objects.create(proposal=proposal, name='КП', file='documents/offer.pdf')
+            proposals.append(proposal)
+        ids = [proposal.id for proposal in proposals]
+        counters_before = PlatformCounterService.get_counters()
+        self.authenticate_user(self.manager_user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('api_bulk_verify_proposals'), {'ids': ids, 'status': 'Подтверждена'}, format='json'
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated'], ids)
+        self.assertEqual(Proposal.objects.filter(id__in=ids, status='Подтверждена').count(), 3)
+        self.assertEqual(Document.objects.filter(proposal_id__in=ids, verification_status='Подтвержден').count(), 3)
+        self.assertEqual(
+            PlatformCounterService.get_counters()['pending_proposals'], counters_before['pending_proposals'] - 3
+        )
+
+    def test_validation_and_access(self):
+        self.authenticate_user(self.firm_user)
+        self.assertEqual(self.post_organizations(self.org_ids).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.authenticate_user(self.manager_user)
+        self.assertEqual(self.post_organizations([]).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.post_organizations(self.org_ids, 'На проверке').status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(reverse('api_bulk_verify_proposals'), {'ids': [1], 'status': 'Подана'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_admin_action_updates_in_bulk(self):
+        from tenders.admin import OrganizationAdmin
+        admin_user = User.objects.create_superuser(username='root', email='root@test.com', password='x')
+        request = mock.Mock(user=admin_user)
+        model_admin = OrganizationAdmin(Organization, mock.Mock())
+
+        with mock.patch.object(model_admin, 'message_user') as message_user, \
+                mock.patch('api.tasks.send_pending_approval_emails.apply_async'):
+            model_admin.approve_organizations(request, Organization.objects.filter(id__in=self.org_ids))
+
+        message_user.assert_called_once_with(request, "Подтверждено организаций: 5")
+        self.assertEqual(User.objects.filter(organization__id__in=self.org_ids, is_active=True).count(), 5)
+
+
+class CacheTagTests(BaseAPITestCase):
+    def test_versions_live_in_shared_cache(self):
+        # Версия, сдвинутая другим процессом (например, Celery), видна через общий кеш
+        before = get_tag_versions([tender_tag(self.tender.id)])[tender_tag(self.tender.id)]
+        shared_cache.set(f"tag_version:{tender_tag(self.tender.id)}", before + 1, None)
+
+        self.assertEqual(get_tag_versions([tender_tag(self.tender.id)])[tender_tag(self.tender.id)], before + 1)
+
+    def test_bumped_again_after_commit(self):
+        tag = tender_tag(self.tender.id)
+        initial = get_tag_versions([tag])[tag]
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            invalidate_tags(tag)
+        in_transaction = get_tag_versions([tag])[tag]
+        for callback in callbacks:
+            callback()
+
+        self.assertGreater(in_transaction, initial)
+        self.assertGreater(get_tag_versions([tag])[tag], in_transaction)
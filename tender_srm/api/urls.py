@@ -1,6 +1,6 @@
 from django.urls import path
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
-from . import views
+from . import views, async_views
 
 urlpatterns = [
     # JWT токены
@@ -19,16 +19,36 @@ urlpatterns = [
     path('manager/pending-organizations/', views.PendingOrganizationsAPIView.as_view(), name='api_pending_organizations'),
     path('manager/organizations/<int:pk>/', views.OrganizationDetailAPIView.as_view(), name='api_organization_detail'),
     path('manager/organizations/<int:pk>/verify/', views.VerifyOrganizationAPIView.as_view(), name='api_verify_organization'),
+    path('manager/organizations/verify/', views.BulkVerifyOrganizationsAPIView.as_view(), name='api_bulk_verify_organizations'),
     path('manager/pending-proposals/', views.PendingProposalsAPIView.as_view(), name='api_pending_proposals'),
     path('manager/proposals/<int:pk>/verify/', views.VerifyProposalAPIView.as_view(), name='api_verify_proposal'),
+    path('manager/proposals/verify/', views.BulkVerifyProposalsAPIView.as_view(), name='api_bulk_verify_proposals'),
     path('manager/proposals/<int:pk>/', views.ProposalDetailAPIView.as_view(), name='api_proposal_detail'),
     path('manager/evaluations/<int:pk>/', views.EvaluationUpdateAPIView.as_view(), name='api_evaluation_update'),
     
     # Тендеры
     path('tenders/', views.TenderListAPIView.as_view(), name='api_tender_list'),
+    path('tenders/search/', views.TenderSearchAPIView.as_view(), name='api_tender_search'),
     path('tenders/create/', views.TenderCreateAPIView.as_view(), name='api_tender_create'),
     path('tenders/<int:pk>/', views.TenderDetailAPIView.as_view(), name='api_tender_detail'),
+    path('tenders/<int:pk>/ahp/', views.TenderAhpAPIView.as_view(), name='api_tender_ahp'),
+    path('tenders/<int:pk>/export/', views.TenderExportAPIView.as_view(), name='api_tender_export'),
+    path('documents/<int:pk>/download/', views.DocumentDownloadAPIView.as_view(), name='api_document_download'),
+    path('contracts/generate/', views.ContractGenerateAPIView.as_view(), name='api_contracts_generate'),
+    path('exports/<int:pk>/', views.TenderExportStatusAPIView.as_view(), name='api_export_status'),
+    path('exports/<int:pk>/download/', views.TenderExportDownloadAPIView.as_view(), name='api_export_download'),
+    path('tenders/<int:pk>/leaderboard/', views.TenderLeaderboardAPIView.as_view(), name='api_tender_leaderboard'),
+    path('tenders/<int:pk>/leaderboard/me/', views.TenderLeaderboardPositionAPIView.as_view(), name='api_tender_leaderboard_position'),
+    path('tenders/<int:pk>/sensitivity/', views.TenderSensitivityAPIView.as_view(), name='api_tender_sensitivity'),
+    path('tenders/<int:pk>/scoring-status/', views.TenderScoringStatusAPIView.as_view(), name='api_tender_scoring_status'),
     
     # Предложения
     path('tenders/<int:tender_id>/proposal/', views.ProposalCreateAPIView.as_view(), name='api_proposal_create'),
+    path('tenders/<int:tender_id>/proposals/import/', views.ProposalImportAPIView.as_view(), name='api_proposal_import'),
+
+    # Async-варианты частых чтений (выигрыш под ASGI)
+    path('async/tenders/', async_views.AsyncTenderListView.as_view(), name='api_async_tender_list'),
+    path('async/tenders/<int:pk>/', async_views.AsyncTenderDetailView.as_view(), name='api_async_tender_detail'),
+    path('async/manager/pending-proposals/', async_views.AsyncPendingProposalsView.as_view(), name='api_async_pending_proposals'),
+    path('async/manager/pending-organizations/', async_views.AsyncPendingOrganizationsView.as_view(), name='api_async_pending_organizations'),
 ]
\ No newline at end of file
@@ -4,7 +4,10 @@ from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
+from django.core.exceptions import PermissionDenied, ValidationError as DjangoValidationError
 from django.utils import timezone
+from django.http import StreamingHttpResponse
+from django.urls import reverse
 from django.db import transaction
 from rest_framework import generics
 from tenders.services.evaluation_service import EvaluationService
@@ -13,14 +16,30 @@ from .serializers import (
     OrganizationRegistrationSerializer, UserSerializer,
     OrganizationDetailSerializer, ProposalSerializer,
     OrganizationVerificationSerializer, ProposalVerificationSerializer,
+    BulkOrganizationVerificationSerializer, BulkProposalVerificationSerializer,
     TenderSerializer, TenderDetailSerializer,
-    TenderCreateSerializer, TenderListSerializer, ProposalCreateSerializer,
-    EvaluationSerializer, ProposalDetailSerializer  
+    TenderCreateSerializer, TenderListSerializer, TenderSearchSerializer, ProposalCreateSerializer,
+    EvaluationSerializer, ProposalDetailSerializer, AhpMatrixSerializer,
+    ProposalImportSerializer, CriterionSerializer, ContractGenerateSerializer, ProposalRankSerializer,
+    SensitivityParamsSerializer
 )
 from tenders.services.tender_service import TenderService
 from tenders.services.proposal_service import ProposalService
 from tenders.services.organization_service import OrganizationService
-from api.tasks import send_approval_email_to_firm
+from tenders.services.ahp_service import AhpService
+from tenders.services.export_service import ExportService
+from tenders.services.contract_service import ContractService
+from tenders.services.file_delivery_service import FileDeliveryService
+from tenders.services.user_context_service import UserContextService
+from tenders.services.leaderboard_service import LeaderboardService
+from tenders.services.sensitivity_service import SensitivityService
+from tenders.repositories.tender_repository import TenderRepository
+from api.simple_cache import cache_response
+from tenders.cache_tags import TENDERS_TAG, ORGANIZATIONS_TAG, CRITERIA_TAG, tender_tag, organization_tag
+from api.pagination import (
+    TenderKeysetPagination, TenderSearchKeysetPagination, ProposalKeysetPagination, OrganizationKeysetPagination,
+    LeaderboardKeysetPagination
+)
 
 
 # ===== АУТЕНТИФИКАЦИЯ =====
@@ -175,6 +194,7 @@ class PendingOrganizationsAPIView(generics.ListAPIView):
     
     permission_classes = [ManagerPermission]
     serializer_class = OrganizationDetailSerializer
+    pagination_class = OrganizationKeysetPagination
     
     def get_queryset(self):
         return Organization.objects.filter(
@@ -188,7 +208,11 @@ class OrganizationDetailAPIView(generics.RetrieveAPIView):
     permission_classes = [ManagerPermission]
     
     serializer_class = OrganizationDetailSerializer
-    queryset = Organization.objects.all()
+    queryset = Organization.objects.select_related('user').prefetch_related('verification_documents')
+
+    @cache_response(tags=lambda request, pk: [organization_tag(pk)], vary_on_user=False)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
 
 
 class VerifyOrganizationAPIView(APIView):
@@ -209,20 +233,12 @@ class VerifyOrganizationAPIView(APIView):
                 status=verification_status,
             )
             
-            organization = Organization.objects.get(pk=pk)
+            organization = Organization.objects.select_related('user', 'verified_by').get(pk=pk)
             
+            # Письмо ставит в пакетную очередь сам сервис; флаг отмечается после отправки
             if verification_status == 'Подтверждено' and not organization.approval_email_sent:
-                task = send_approval_email_to_firm.delay(
-                    organization.user.id, 
-                    organization.id
-                )
-                
-                organization.approval_email_sent = True
-                organization.save()
-                
                 email_status = {
-                    "status": "sending_async",
-                    "celery_task_id": task.id,
+                    "status": "queued",
                     "user_email": organization.user.email
                 }
             else:
@@ -248,12 +264,40 @@ class VerifyOrganizationAPIView(APIView):
 
 
 
+class BulkVerifyOrganizationsAPIView(APIView):
+    """Верификация пачки организаций: {"ids": [...], "verification_status": ...}"""
+    permission_classes = [ManagerPermission]
+
+    def post(self, request):
+        serializer = BulkOrganizationVerificationSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        verification_status = serializer.validated_data['verification_status']
+        try:
+            result = OrganizationService.bulk_verify_organizations(
+                manager_user=request.user,
+                org_ids=serializer.validated_data['ids'],
+                status=verification_status,
+            )
+        except PermissionError as e:
+            return Response({'error': str(e)}, status=status.HTTP_403_FORBIDDEN)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'message': f'Организаций {verification_status.lower()}: {len(result["updated"])}',
+            'verification_status': verification_status,
+            **result,
+        }, status=status.HTTP_200_OK)
+
 
 class PendingProposalsAPIView(generics.ListAPIView):
     """Список предложений на проверку"""
     
     permission_classes = [ManagerPermission]
     serializer_class = ProposalSerializer
+    pagination_class = ProposalKeysetPagination
     
     def get_queryset(self):
         return Proposal.objects.filter(
@@ -278,13 +322,9 @@ class VerifyProposalAPIView(APIView):
             notes = serializer.validated_data.get('notes', '')
             
             with transaction.atomic():
-                proposal.status = status_value
-                proposal.save()
+                ProposalService.set_status(proposal, status_value)
                 
-                manager_profile, created = Manager.objects.get_or_create(
-                    user=request.user,
-                    defaults={'fio': request.user.get_full_name() or request.user.username}
-                )
+                manager_profile = UserContextService.get_manager_profile(request.user)
                 
                 proposal.documents.update(
                     verification_status='Подтвержден' if status_value == 'Подтверждена' else 'Отклонен',
@@ -300,18 +340,64 @@ class VerifyProposalAPIView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class BulkVerifyProposalsAPIView(APIView):
+    """Верификация пачки предложений: {"ids": [...], "status": ...}"""
+    permission_classes = [ManagerPermission]
+
+    def post(self, request):
+        serializer = BulkProposalVerificationSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        status_value = serializer.validated_data['status']
+        try:
+            result = ProposalService.bulk_verify_proposals(
+                request.user, serializer.validated_data['ids'], status_value
+            )
+        except PermissionError as e:
+            return Response({'error': str(e)}, status=status.HTTP_403_FORBIDDEN)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'message': f'Предложений {status_value.lower()}: {len(result["updated"])}',
+            'status': status_value,
+            **result,
+        })
+
+
 # ===== ТЕНДЕРЫ API =====
 
 class TenderListAPIView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = TenderListSerializer
+    pagination_class = TenderKeysetPagination
     
     def get_queryset(self):
-        user = self.request.user
-        if user.role == 'Фирма' and hasattr(user, 'organization'):
-            return Tender.objects.filter(status='Открыт')
-        else:
-            return Tender.objects.filter(status='Открыт')
+        return TenderRepository.get_open_tenders_for_list()
+
+    @cache_response(tags=[TENDERS_TAG], vary_on_user=False)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+
+class TenderSearchAPIView(generics.ListAPIView):
+    """Поиск открытых тендеров: ?q= — полнотекстовый запрос, ?organization= — организатор (нечётко)"""
+    permission_classes = [IsAuthenticated]
+    serializer_class = TenderSearchSerializer
+    pagination_class = TenderSearchKeysetPagination
+
+    def get_queryset(self):
+        return TenderRepository.search_open_tenders(
+            self.request.query_params.get('q', '').strip(),
+            self.request.query_params.get('organization', '').strip(),
+        )
+
+    @cache_response(tags=[TENDERS_TAG, ORGANIZATIONS_TAG], vary_on_user=False)
+    def list(self, request, *args, **kwargs):
+        if not (request.query_params.get('q', '').strip() or request.query_params.get('organization', '').strip()):
+            return Response({'error': 'Укажите параметр q или organization'}, status=status.HTTP_400_BAD_REQUEST)
+        return super().list(request, *args, **kwargs)
 
 
 class TenderCreateAPIView(APIView):
@@ -342,9 +428,200 @@ class TenderCreateAPIView(APIView):
 
 class TenderDetailAPIView(generics.RetrieveAPIView):
     permission_classes = [IsAuthenticated]
-    queryset = Tender.objects.all()
+    queryset = Tender.objects.select_related('organization').prefetch_related('criteria__criterion')
     serializer_class = TenderDetailSerializer
 
+    @cache_response(tags=lambda request, pk: [tender_tag(pk), CRITERIA_TAG], vary_on_user=False)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+
+class TenderAhpAPIView(APIView):
+    """Матрица парных сравнений AHP: веса, CR и сохранение новой ревизии"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        try:
+            tender = Tender.objects.get(pk=pk)
+        except Tender.DoesNotExist:
+            return Response({'error': 'Тендер не найден'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(AhpService.get_weights(tender))
+
+    def post(self, request, pk):
+        serializer = AhpMatrixSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            result = AhpService.save_matrix(request.user, pk, serializer.validated_data['matrix'])
+            return Response(result, status=status.HTTP_200_OK)
+        except PermissionError as e:
+            return Response({'error': str(e)}, status=status.HTTP_403_FORBIDDEN)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class TenderScoringStatusAPIView(APIView):
+    """Актуальны ли оценки тендера и стоит ли пересчёт в очереди"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        try:
+            tender = Tender.objects.only('id', 'inputs_version', 'scored_version').get(pk=pk)
+        except Tender.DoesNotExist:
+            return Response({'error': 'Тендер не найден'}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({
+            'tender_id': tender.id,
+            'inputs_version': tender.inputs_version,
+            'scored_version': tender.scored_version,
+            'is_current': tender.inputs_version == tender.scored_version,
+            'rescore_scheduled': EvaluationService.is_rescore_scheduled(tender.id),
+        })
+
+
+class TenderLeaderboardAPIView(generics.ListAPIView):
+    """Рейтинг заявок тендера (владелец, менеджер): место, итоговая оценка, отставание от лидера"""
+    permission_classes = [IsAuthenticated]
+    serializer_class = ProposalRankSerializer
+    pagination_class = LeaderboardKeysetPagination
+
+    def list(self, request, *args, **kwargs):
+        try:
+            tender, queryset = LeaderboardService.get_leaderboard(request.user, self.kwargs['pk'])
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_404_NOT_FOUND)
+        except PermissionError as e:
+            return Response({'error': str(e)}, status=status.HTTP_403_FORBIDDEN)
+
+        page = self.paginate_queryset(queryset)
+        return Response({
+            **self.paginator.get_paginated_data(self.get_serializer(page, many=True).data),
+            'is_current': LeaderboardService.is_current(tender),
+        })
+
+
+class TenderLeaderboardPositionAPIView(APIView):
+    """Место заявки поставщика в рейтинге тендера"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        try:
+            position = LeaderboardService.get_position(request.user, pk)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_404_NOT_FOUND)
+        except PermissionError as e:
+            return Response({'error': str(e)}, status=status.HTTP_403_FORBIDDEN)
+
+        return Response({
+            **ProposalRankSerializer(position['entry']).data,
+            'tender_id': position['tender'].id,
+            'participants': position['participants'],
+            'is_current': LeaderboardService.is_current(position['tender']),
+        })
+
+
+class TenderSensitivityAPIView(APIView):
+    """
+    Устойчивость победителя к весам критериев (владелец, менеджер):
+    ?samples=10000&spread=0.2&seed=0 — вероятность победы и распределение мест каждой заявки
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        serializer = SensitivityParamsSerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            result = SensitivityService.analyze(request.user, pk, **serializer.validated_data)
+        except PermissionError as e:
+            return Response({'error': str(e)}, status=status.HTTP_403_FORBIDDEN)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_404_NOT_FOUND)
+        return Response(result)
+
+
+class TenderExportAPIView(APIView):
+    """
+    Выгрузка заявок тендера с оценками: ?file_format=csv|xlsx.
+    CSV отдаётся потоком, XLSX и крупные тендеры — фоновой задачей (202 и ссылка на статус).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        file_format = request.query_params.get('file_format', 'csv')
+        try:
+            tender = ExportService.get_tender_for_export(request.user, pk)
+            background = ExportService.needs_background(tender, file_format)
+        except PermissionError as e:
+            return Response({'error': str(e)}, status=status.HTTP_403_FORBIDDEN)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if background:
+            export = ExportService.start_export(request.user, tender, file_format)
+            return Response({
+                'export_id': export.id,
+                'status': export.status,
+                'status_url': reverse('api_export_status', args=[export.id]),
+            }, status=status.HTTP_202_ACCEPTED)
+
+        response = StreamingHttpResponse(ExportService.stream_csv(tender), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="tender_{tender.id}_results.csv"'
+        return response
+
+
+class TenderExportStatusAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        try:
+            export = ExportService.get_export(request.user, pk)
+        except PermissionError as e:
+            return Response({'error': str(e)}, status=status.HTTP_403_FORBIDDEN)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({
+            'export_id': export.id,
+            'tender_id': export.tender_id,
+            'file_format': export.file_format,
+            'status': export.status,
+            'error': export.error,
+            'download_url': reverse('api_export_download', args=[export.id]) if export.status == 'Готов' else None,
+        })
+
+
+class TenderExportDownloadAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        try:
+            export = ExportService.get_export(request.user, pk)
+        except PermissionError as e:
+            return Response({'error': str(e)}, status=status.HTTP_403_FORBIDDEN)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_404_NOT_FOUND)
+
+        if export.status != 'Готов':
+            return Response({'error': 'Выгрузка ещё не готова'}, status=status.HTTP_409_CONFLICT)
+        return FileDeliveryService.serve(request, export.file, export.file.name.rsplit('/', 1)[-1])
+
+
+class DocumentDownloadAPIView(APIView):
+    """Скачивание документа с проверкой прав (X-Accel-Redirect / X-Sendfile / поток с Range)"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        try:
+            document = FileDeliveryService.get_document_for_user(request.user, pk)
+        except PermissionError as e:
+            return Response({'error': str(e)}, status=status.HTTP_403_FORBIDDEN)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_404_NOT_FOUND)
+        return FileDeliveryService.serve_document(request, document)
+
 
 # ===== ПРЕДЛОЖЕНИЯ API =====
 
@@ -360,16 +637,58 @@ class ProposalCreateAPIView(APIView):
         except (PermissionError, ValueError) as e:
             return Response({"error": str(e)}, status=400)
         
+class ProposalImportAPIView(APIView):
+    """Массовый импорт заявок в тендер одним запросом"""
+    permission_classes = [ManagerPermission]
+
+    def post(self, request, tender_id):
+        serializer = ProposalImportSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            proposals = ProposalService.import_proposals(
+                request.user, tender_id, serializer.validated_data['proposals']
+            )
+        except PermissionDenied as e:
+            return Response({'error': str(e)}, status=status.HTTP_403_FORBIDDEN)
+        except DjangoValidationError as e:
+            return Response({'errors': e.messages}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'message': f'Импортировано заявок: {len(proposals)}',
+            'ids': [proposal.id for proposal in proposals]
+        }, status=status.HTTP_201_CREATED)
+
+
+class ContractGenerateAPIView(APIView):
+    """Постановка договоров с победителями закрытых тендеров в очередь рендера"""
+    permission_classes = [ManagerPermission]
+
+    def post(self, request):
+        serializer = ContractGenerateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        queued, stale = ContractService.queue_winner_contracts(serializer.validated_data.get('tender_ids'))
+        message = f'Поставлено в очередь договоров: {queued}'
+        if stale:
+            message += f'; оценки устарели, поставлен пересчёт тендеров: {stale}'
+        return Response({'message': message, 'queued': queued, 'stale_tender_ids': stale},
+                        status=status.HTTP_202_ACCEPTED)
+
+
 class ProposalDetailAPIView(generics.RetrieveAPIView):
     permission_classes = [ManagerPermission]
     serializer_class = ProposalDetailSerializer
-    queryset = Proposal.objects.all()
+    queryset = Proposal.objects.select_related('supplier', 'tender')
 
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
-        EvaluationService.recalculate_quantitative_scores(instance.tender)
+        # Пересчёт на чтении не выполняется: устаревшие оценки помечаются is_current=False
+        is_current = EvaluationService.scores_current(instance.tender)
         serializer = self.get_serializer(instance)
-        return Response(serializer.data)
+        return Response({**serializer.data, 'is_current': is_current})
 
 class EvaluationUpdateAPIView(generics.UpdateAPIView):
     permission_classes = [ManagerPermission]
@@ -378,7 +697,7 @@ class EvaluationUpdateAPIView(generics.UpdateAPIView):
 
     def perform_update(self, serializer):
         evaluation = self.get_object()
-        manager = Manager.objects.get_or_create(user=self.request.user)[0]
+        manager = UserContextService.get_manager_profile(self.request.user)
         EvaluationService.set_manual_score(
         evaluation,
         serializer.validated_data['score'],
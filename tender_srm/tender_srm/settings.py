@@ -25,6 +25,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.humanize',
+    'django.contrib.postgres',
     'drf_yasg',
    
     'rest_framework',
@@ -39,6 +40,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'tenders.middleware.RequestProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -53,7 +55,8 @@ ROOT_URLCONF = 'tender_srm.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates + замер рендера для Server-Timing
+        'BACKEND': 'tenders.profiling.ProfiledDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -67,6 +70,8 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'tender_srm.wsgi.application'
+# api/async/*: gunicorn tender_srm.asgi:application -k uvicorn.workers.UvicornWorker
+ASGI_APPLICATION = 'tender_srm.asgi.application'
 
 
 DATABASES = {
@@ -80,9 +85,25 @@ DATABASES = {
     }
 }
 
+# DB_ENGINE=sqlite — локальный запуск без PostgreSQL: поиск работает через icontains (tenders/search.py),
+# pg_trgm и GIN-индексы миграция 0011 создаёт только на PostgreSQL
+if os.environ.get('DB_ENGINE') == 'sqlite':
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('DB_NAME') or BASE_DIR / 'db.sqlite3',
+    }
+
 # Кастомный юзер
 AUTH_USER_MODEL = 'tenders.User'
 
+# Пользователь грузится одним JOIN с organization и manager_profile и кратко кешируется.
+# ModelBackend оставлен для сессий, созданных до перехода на UserContextBackend
+AUTHENTICATION_BACKENDS = [
+    'tenders.backends.UserContextBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+USER_CONTEXT_TTL = 60
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -112,6 +133,19 @@ STATICFILES_DIRS = [BASE_DIR / "static"]
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Отдача защищённых файлов после проверки прав:
+# 'python' — потоком из Django (с Range), 'nginx' — X-Accel-Redirect, 'apache' — X-Sendfile.
+# Для nginx: location /protected-media/ { internal; alias <MEDIA_ROOT>/; }
+PROTECTED_MEDIA_BACKEND = os.environ.get('PROTECTED_MEDIA_BACKEND', 'python')
+PROTECTED_MEDIA_PREFIX = '/protected-media/'
+PROTECTED_MEDIA_BUFFER_SIZE = 64 * 1024
+
+# SHA-256 загружаемых файлов считается на лету (дедупликация документов)
+FILE_UPLOAD_HANDLERS = [
+    'tenders.uploads.HashingMemoryFileUploadHandler',
+    'tenders.uploads.HashingTemporaryFileUploadHandler',
+]
+
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -122,11 +156,17 @@ LOGOUT_REDIRECT_URL = '/login/'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.UserContextJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.ProfiledJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.KeysetPagination',
+    'PAGE_SIZE': 50,
     'DEFAULT_THROTTLE_CLASSES': [
         'rest_framework.throttling.AnonRateThrottle',
         'rest_framework.throttling.UserRateThrottle'
@@ -149,11 +189,24 @@ SIMPLE_JWT = {
 }
 
 
+# Общий кеш всех процессов (веб-воркеры, ASGI, Celery): версии тегов и ответы API, контекст пользователя,
+# версия каталога критериев, флаги фоновых задач. В проде — Redis (REDIS_CACHE_URL),
+# локально — таблица в БД (manage.py createcachetable)
+REDIS_CACHE_URL = os.environ.get('REDIS_CACHE_URL')
+
 CACHES = {
+    # Только то, что безопасно держать в памяти процесса (веса AHP по ревизии матрицы и т.п.)
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         'LOCATION': 'tender-srm-cache',
-    }
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_CACHE_URL,
+    } if REDIS_CACHE_URL else {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'tender_srm_shared_cache',
+    },
 }
 
 
@@ -215,8 +268,44 @@ CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60
 CELERY_TASK_SOFT_TIME_LIMIT = 60 * 60
 
+# Пересчёт оценок тендеров фоном; триггеры в пределах окна сливаются в один запуск
+SCORING_ASYNC = True
+SCORING_COALESCE_SECONDS = 5
+
+# Договоры рендерятся WeasyPrint в отдельной очереди:
+# celery -A tender_srm worker -Q contracts --concurrency=2
+CONTRACTS_QUEUE = 'contracts'
+CONTRACT_BATCH_SIZE = 25
+# Временные сбои рендера (БД, хранилище) повторяются с экспоненциальной задержкой
+CONTRACT_MAX_RETRIES = 3
+CONTRACT_RETRY_BACKOFF_SECONDS = 60
+CELERY_TASK_ROUTES = {
+    'api.tasks.render_contract': {'queue': CONTRACTS_QUEUE},
+    'api.tasks.render_contracts_batch': {'queue': CONTRACTS_QUEUE},
+}
+
+# Анализ чувствительности: не больше SENSITIVITY_MAX_CELLS пар «заявка × выборка» за запрос
+# (на крупных тендерах число выборок уменьшается), распределение мест — только по первым местам
+SENSITIVITY_MAX_CELLS = 5_000_000
+SENSITIVITY_TOP_RANKS = 10
 
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# CSV до этого числа заявок отдаётся потоком, больше — фоновым файлом
+EXPORT_STREAM_MAX_PROPOSALS = 20000
+
+# Сверка счётчиков главной страницы и дашборда (celery beat)
+CELERY_BEAT_SCHEDULE = {
+    'reconcile-platform-counters': {
+        'task': 'api.tasks.reconcile_platform_counters',
+        'schedule': 15 * 60,
+    },
+}
+
+
+# Локально: EMAIL_BACKEND=django.core.mail.backends.filebased.EmailBackend (письма в EMAIL_FILE_PATH)
+# или ...console.EmailBackend; тесты Django подменяют backend на locmem
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
+EMAIL_TIMEOUT = 30
 EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
@@ -224,3 +313,44 @@ EMAIL_HOST_USER = 'email'
 EMAIL_HOST_PASSWORD = 'app_password'  
 DEFAULT_FROM_EMAIL = 'your-email@gmail.com'
 
+# Пакетная отправка писем: одобрения в пределах окна уходят одной пачкой через одно соединение
+MAIL_BATCH_SIZE = 100
+MAIL_BATCH_DELAY_SECONDS = 10
+MAIL_MAX_RETRIES = 5
+MAIL_RETRY_BACKOFF_SECONDS = 30
+# Временные отказы по одному адресу, после которых письмо помечается недоставленным
+MAIL_MAX_ATTEMPTS = 3
+# Захват пачки отправителем; по истечении (упавший воркер) строки снова берутся в работу
+MAIL_CLAIM_TIMEOUT_SECONDS = MAIL_BATCH_SIZE * EMAIL_TIMEOUT
+
+# Профилирование запросов (tenders.middleware.RequestProfilingMiddleware): заголовок Server-Timing,
+# выборочный JSON-лог tenders.profiling и бюджет SQL-запросов на представление.
+# Превышение бюджета пишется в лог WARNING, а при QUERY_BUDGET_STRICT (tender_srm.test_settings) —
+# исключение QueryBudgetExceeded. Server-Timing раскрывает время БД и число запросов — по умолчанию выключен
+SERVER_TIMING_HEADER = os.environ.get('SERVER_TIMING_HEADER', '0') == '1'
+REQUEST_PROFILE_SAMPLE_RATE = float(os.environ.get('REQUEST_PROFILE_SAMPLE_RATE', '0.01'))
+QUERY_BUDGET_STRICT = os.environ.get('QUERY_BUDGET_STRICT', '0') == '1'
+# Запросов на представление с учётом аутентификации на холодном кеше
+QUERY_BUDGETS = {
+    'api.views.TenderListAPIView': 2,
+    'api.views.TenderSearchAPIView': 2,
+    'api.views.TenderDetailAPIView': 4,
+    'api.views.PendingProposalsAPIView': 2,
+    'api.views.PendingOrganizationsAPIView': 3,
+    'api.views.OrganizationDetailAPIView': 3,
+    'api.views.UserProfileAPIView': 1,
+    'api.views.TenderLeaderboardAPIView': 3,
+    # Пакетная проверка: постоянное число запросов на любой размер пачки (вместе с точками сохранения)
+    'api.views.BulkVerifyOrganizationsAPIView': 16,
+    # Отклонение заявок добавляет одну пересборку рейтингов всех затронутых тендеров
+    'api.views.BulkVerifyProposalsAPIView': 18,
+    # Вместе с запросами при чтении потока CSV; строки идут одним итератором
+    'api.views.TenderExportAPIView': 5,
+    'api.async_views.AsyncTenderListView': 2,
+    'api.async_views.AsyncTenderDetailView': 4,
+    'api.async_views.AsyncPendingProposalsView': 2,
+    'api.async_views.AsyncPendingOrganizationsView': 3,
+    'tenders.views.home': 2,
+    'tenders.views.tender_list': 3,
+    'tenders.views.manager_requests': 6,
+}
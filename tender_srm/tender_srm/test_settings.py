@@ -0,0 +1,16 @@
+"""
+Настройки прогона тестов: manage.py test --settings=tender_srm.test_settings
+Превышение бюджета SQL-запросов представления роняет тест, а не только пишется в лог.
+"""
+from .settings import *  # noqa: F401,F403
+
+QUERY_BUDGET_STRICT = True
+
+# Тесты идут в одном процессе: общий кеш в памяти, чтобы его запросы не искажали счётчики SQL
+CACHES = {
+    **CACHES,  # noqa: F405
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tender-srm-shared-test',
+    },
+}
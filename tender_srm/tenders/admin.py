@@ -1,7 +1,16 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.http import StreamingHttpResponse
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User, Organization, Manager, Tender, TenderCriterion, Proposal, Document, Evaluation, Contract, Criterion
+from .models import User, Organization, Manager, Tender, TenderCriterion, Proposal, Document, Evaluation, Contract, Criterion, AhpComparisonMatrix
 from tenders.services.tender_service import TenderService
+from tenders.services.evaluation_service import EvaluationService
+from tenders.services.ahp_service import AhpService
+from tenders.services.export_service import ExportService
+from tenders.services.contract_service import ContractService
+from tenders.services.organization_service import OrganizationService
+from tenders.services.counter_service import PlatformCounterService
+from tenders.repositories.tender_repository import TenderRepository
 
 # === ИНЛАЙНЫ ===
 class OrganizationInline(admin.StackedInline):
@@ -40,6 +49,29 @@ class EvaluationInline(admin.TabularInline):
 
 
 # === АДМИНКИ ===
+class CountedAdminMixin:
+    """
+    Счётчики платформы при правке и удалении через админку.
+    Каскадные удаления и inline-формы не учитываются — их поправит reconcile.
+    """
+
+    def save_model(self, request, obj, form, change):
+        field = PlatformCounterService.tracked_field(self.model)
+        old_status = None
+        if change:
+            old_status = self.model.objects.filter(pk=obj.pk).values_list(field, flat=True).first() if field else ''
+        super().save_model(request, obj, form, change)
+        PlatformCounterService.status_changed(self.model, old_status, getattr(obj, field) if field else '')
+
+    def delete_model(self, request, obj):
+        PlatformCounterService.deleted(self.model.objects.filter(pk=obj.pk))
+        super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        PlatformCounterService.deleted(queryset)
+        super().delete_queryset(request, queryset)
+
+
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
     list_display = ('username', 'email', 'role', 'is_active', 'created_at')
@@ -56,7 +88,7 @@ class UserAdmin(BaseUserAdmin):
 
 
 @admin.register(Organization)
-class OrganizationAdmin(admin.ModelAdmin):
+class OrganizationAdmin(CountedAdminMixin, admin.ModelAdmin):
     list_display = ('name', 'registration_number', 'org_type', 'verification_status', 'user')
     list_filter = ('verification_status', 'org_type')
     search_fields = ('name', 'registration_number', 'fio')
@@ -65,46 +97,96 @@ class OrganizationAdmin(admin.ModelAdmin):
 
     actions = ['approve_organizations', 'reject_organizations']
 
+    @staticmethod
+    def _manager(request):
+        # Суперпользователь без профиля менеджера — verified_by остаётся пустым
+        return Manager.objects.filter(user=request.user).first()
+
     def approve_organizations(self, request, queryset):
-        updated = queryset.update(verification_status='Подтверждено')
-        # Активация пользователей подтвержденных организаций
-        for org in queryset:
-            org.user.is_active = True
-            org.user.save()
-        self.message_user(request, f"Подтверждено организаций: {updated}")
+        # Статус, пользователи и документы — по одному UPDATE на всю выборку, письма — одной задачей
+        result = OrganizationService.apply_bulk_verification(
+            list(queryset.values_list('id', flat=True)), 'Подтверждено', self._manager(request)
+        )
+        self.message_user(request, f"Подтверждено организаций: {len(result['updated'])}")
 
     def reject_organizations(self, request, queryset):
-        updated = queryset.update(verification_status='Отклонено')
-        # Деакцивация пользователей отклоненных организаций
-        for org in queryset:
-            org.user.is_active = False
-            org.user.save()
-        self.message_user(request, f"Отклонено организаций: {updated}")
+        result = OrganizationService.apply_bulk_verification(
+            list(queryset.values_list('id', flat=True)), 'Отклонено', self._manager(request)
+        )
+        self.message_user(request, f"Отклонено организаций: {len(result['updated'])}")
 
     approve_organizations.short_description = "Подтвердить выбранные организации"
     reject_organizations.short_description = "Отклонить выбранные организации"
 
 
 @admin.register(Tender)
-class TenderAdmin(admin.ModelAdmin):
+class TenderAdmin(CountedAdminMixin, admin.ModelAdmin):
     list_display = ('title', 'organization', 'status', 'method', 'start_date', 'end_date', 'budget')
     list_filter = ('status', 'method', 'start_date')
     search_fields = ('title', 'description', 'organization__name')
     readonly_fields = ('created_at',)
     inlines = [TenderCriterionInline, ProposalInline]
+    actions = ['export_results_csv', 'generate_winner_contracts']
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        # Веса критериев и состав заявок могли измениться
+        EvaluationService.invalidate_scores([form.instance.id])
+
+    def export_results_csv(self, request, queryset):
+        # Поток строк из серверного курсора — память не зависит от размера тендера
+        if queryset.count() != 1:
+            self.message_user(request, "Выберите один тендер для выгрузки", level=messages.WARNING)
+            return None
+        tender = queryset.first()
+        if not ExportService.has_current_scores(tender):
+            EvaluationService.scores_current(tender)
+            self.message_user(
+                request, "Оценки тендера устарели, поставлен пересчёт. Повторите выгрузку позже", level=messages.WARNING
+            )
+            return None
+        response = StreamingHttpResponse(ExportService.stream_csv(tender), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="tender_{tender.id}_results.csv"'
+        return response
+
+    export_results_csv.short_description = "Выгрузить результаты (CSV)"
+
+    def generate_winner_contracts(self, request, queryset):
+        queued, stale = ContractService.queue_winner_contracts(list(queryset.values_list('id', flat=True)))
+        self.message_user(request, f"Поставлено в очередь договоров: {queued}")
+        if stale:
+            self.message_user(
+                request, f"Оценки устарели, поставлен пересчёт тендеров: {stale}. Повторите позже", level=messages.WARNING
+            )
+
+    generate_winner_contracts.short_description = "Сформировать договоры с победителями"
 
 
 @admin.register(Proposal)
-class ProposalAdmin(admin.ModelAdmin):
+class ProposalAdmin(CountedAdminMixin, admin.ModelAdmin):
     list_display = ('tender', 'supplier', 'status', 'final_score', 'submitted_at')
     list_filter = ('status', 'submitted_at')
     search_fields = ('tender__title', 'supplier__name')
     readonly_fields = ('submitted_at',)
     inlines = [DocumentInline, EvaluationInline]
 
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        EvaluationService.invalidate_scores([form.instance.tender_id])
+
+    def delete_model(self, request, obj):
+        tender_id = obj.tender_id
+        super().delete_model(request, obj)
+        EvaluationService.invalidate_scores([tender_id])
+
+    def delete_queryset(self, request, queryset):
+        tender_ids = list(queryset.values_list('tender_id', flat=True).distinct())
+        super().delete_queryset(request, queryset)
+        EvaluationService.invalidate_scores(tender_ids)
+
 
 @admin.register(Criterion)
-class CriterionAdmin(admin.ModelAdmin):
+class CriterionAdmin(CountedAdminMixin, admin.ModelAdmin):
     list_display = ('name', 'criterion_type', 'direction', 'max_value')
     list_filter = ('criterion_type', 'direction')
     search_fields = ('name', 'description')
@@ -113,13 +195,18 @@ class CriterionAdmin(admin.ModelAdmin):
         super().save_model(request, obj, form, change)
         # Очистка кеша при изменении критериев
         TenderService.clear_criteria_cache()
+        if change:
+            TenderRepository.mark_scores_dirty_for_criterion(obj.id)
     
     def delete_model(self, request, obj):
+        TenderRepository.mark_scores_dirty_for_criterion(obj.id)
         super().delete_model(request, obj)
         # Очистка кеша при удалении критериев
         TenderService.clear_criteria_cache()
     
     def delete_queryset(self, request, queryset):
+        for criterion_id in queryset.values_list('id', flat=True):
+            TenderRepository.mark_scores_dirty_for_criterion(criterion_id)
         # Очистка кеша при массовом удалении
         super().delete_queryset(request, queryset)
         TenderService.clear_criteria_cache()
@@ -145,6 +232,15 @@ class TenderCriterionAdmin(admin.ModelAdmin):
     list_filter = ('tender',)
     search_fields = ('tender__title', 'criterion__name')
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        EvaluationService.invalidate_scores([obj.tender_id])
+
+    def delete_model(self, request, obj):
+        tender_id = obj.tender_id
+        super().delete_model(request, obj)
+        EvaluationService.invalidate_scores([tender_id])
+
 
 @admin.register(Evaluation)
 class EvaluationAdmin(admin.ModelAdmin):
@@ -152,6 +248,40 @@ class EvaluationAdmin(admin.ModelAdmin):
     list_filter = ('evaluated_at',)
     readonly_fields = ('evaluated_at',)
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        EvaluationService.invalidate_scores([obj.tender_criterion.tender_id])
+
+
+class AhpComparisonMatrixForm(forms.ModelForm):
+    class Meta:
+        model = AhpComparisonMatrix
+        fields = ('tender', 'matrix')
+
+    def clean(self):
+        cleaned_data = super().clean()
+        tender = cleaned_data.get('tender')
+        if tender is not None and 'matrix' in cleaned_data:
+            try:
+                AhpService.check_matrix(tender, cleaned_data['matrix'])
+            except ValueError as e:
+                raise forms.ValidationError(str(e))
+        return cleaned_data
+
+
+@admin.register(AhpComparisonMatrix)
+class AhpComparisonMatrixAdmin(admin.ModelAdmin):
+    form = AhpComparisonMatrixForm
+    list_display = ('tender', 'revision', 'updated_at')
+    readonly_fields = ('criteria_order', 'revision', 'updated_at')
+
+    def save_model(self, request, obj, form, change):
+        # Тот же путь, что и в API: новая ревизия, итоговые оценки, рейтинг и кеш ответов
+        saved = AhpService.apply_matrix(obj.tender, obj.matrix)
+        obj.pk = saved.pk
+        obj.criteria_order = saved.criteria_order
+        obj.revision = saved.revision
+
 
 @admin.register(Contract)
 class ContractAdmin(admin.ModelAdmin):
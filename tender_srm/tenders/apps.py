@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class TendersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tenders'
+
+    def ready(self):
+        from tenders import signals  # noqa: F401
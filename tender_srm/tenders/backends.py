@@ -0,0 +1,27 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from tenders.services.user_context_service import UserContextService
+
+
+class UserContextBackend(ModelBackend):
+    """ModelBackend, который загружает пользователя сразу с организацией и профилем менеджера"""
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        UserModel = get_user_model()
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserContextService.queryset().get(**{UserModel.USERNAME_FIELD: username})
+        except UserModel.DoesNotExist:
+            # Хешируем впустую, чтобы время ответа не выдавало существование пользователя
+            UserModel().set_password(password)
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
+
+    def get_user(self, user_id):
+        user = UserContextService.get_user(user_id)
+        return user if user is not None and self.user_can_authenticate(user) else None
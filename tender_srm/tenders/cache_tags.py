@@ -0,0 +1,86 @@
+import time
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.connection import ConnectionProxy
+
+# Общий для всех процессов кеш (веб-воркеры, ASGI, Celery): версия, сдвинутая в одном процессе,
+# сразу видна остальным. Ответы API и контекст пользователя, собранные по версиям, лежат там же
+shared_cache = ConnectionProxy(caches, "shared")
+
+# Версии тегов живут без срока: при вытеснении ключа версия начинается с текущего времени,
+# поэтому старые записи кеша не «оживают»
+TAG_VERSION_TIMEOUT = None
+
+
+def _version_key(tag: str) -> str:
+    return f"tag_version:{tag}"
+
+
+def _fresh_version() -> int:
+    return int(time.time() * 1000)
+
+
+def get_tag_versions(tags) -> dict:
+    """{тег: версия} для построения ключа кеша"""
+    keys = {_version_key(tag): tag for tag in tags}
+    versions = shared_cache.get_many(list(keys))
+
+    for key, tag in keys.items():
+        if key not in versions:
+            shared_cache.add(key, _fresh_version(), TAG_VERSION_TIMEOUT)
+            versions[key] = shared_cache.get(key)
+
+    return {tag: versions[key] for key, tag in keys.items()}
+
+
+async def aget_tag_versions(tags) -> dict:
+    """get_tag_versions для async-представлений"""
+    keys = {_version_key(tag): tag for tag in tags}
+    versions = await shared_cache.aget_many(list(keys))
+
+    for key, tag in keys.items():
+        if key not in versions:
+            await shared_cache.aadd(key, _fresh_version(), TAG_VERSION_TIMEOUT)
+            versions[key] = await shared_cache.aget(key)
+
+    return {tag: versions[key] for key, tag in keys.items()}
+
+
+def _bump(tags) -> None:
+    # Не incr: в DatabaseCache он не атомарен. Версия от времени и всегда больше прежней
+    current = shared_cache.get_many([_version_key(tag) for tag in tags])
+    shared_cache.set_many({
+        _version_key(tag): max(_fresh_version(), current.get(_version_key(tag), 0) + 1)
+        for tag in tags
+    }, TAG_VERSION_TIMEOUT)
+
+
+def invalidate_tags(*tags) -> None:
+    """
+    Сдвигает версии тегов: все записи, собранные на старых версиях, становятся недостижимы.
+    Внутри транзакции версия сдвигается ещё раз после коммита: параллельный GET мог успеть
+    закешировать незакоммиченное состояние под первой новой версией.
+    """
+    if not tags:
+        return
+    _bump(tags)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _bump(tags))
+
+
+def tender_tag(tender_id) -> str:
+    return f"tender:{tender_id}"
+
+
+def organization_tag(organization_id) -> str:
+    return f"organization:{organization_id}"
+
+
+def user_tag(user_id) -> str:
+    return f"user:{user_id}"
+
+
+TENDERS_TAG = "tenders"
+ORGANIZATIONS_TAG = "organizations"
+PROPOSALS_TAG = "proposals"
+CRITERIA_TAG = "criteria"
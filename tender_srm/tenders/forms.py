@@ -1,6 +1,7 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from .models import User, Organization
+from tenders.services.organization_service import OrganizationService
 
 class CustomUserCreationForm(UserCreationForm):
     role = forms.ChoiceField(choices=[choice for choice in User.ROLE_CHOICES if choice[0] != 'Менеджер'], label="Роль")  
@@ -84,7 +85,7 @@ class CustomUserCreationForm(UserCreationForm):
             user.save()
             
             if user.role in ['Фирма', 'Поставщик']:
-                organization = Organization(
+                OrganizationService.register_organization(
                     user=user,
                     name=self.cleaned_data['name'],
                     fio=self.cleaned_data['fio'],
@@ -94,7 +95,6 @@ class CustomUserCreationForm(UserCreationForm):
                     phone=self.cleaned_data['phone'],
                     description=f"Автоматически создана при регистрации {user.role}"
                 )
-                organization.save()
         
         return user
     
@@ -0,0 +1,199 @@
+import json
+import statistics
+import time
+from contextlib import contextmanager
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from tenders.models import User, Organization, Tender, Proposal, Evaluation
+from tenders.services.evaluation_service import EvaluationService
+from tenders.services.proposal_service import ProposalService
+from tenders.services.user_context_service import UserContextService
+from tenders.cache_tags import invalidate_tags, tender_tag, TENDERS_TAG
+
+BENCHMARKS = (
+    'recalculate_quantitative_scores',
+    'submit_proposal_with_criteria',
+    'manager_requests',
+    'tender_list_api',
+    'tender_detail_api',
+)
+
+
+@contextmanager
+def rolled_back():
+    """Замер пишущих путей без следов в БД"""
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+class Command(BaseCommand):
+    help = (
+        "Замеры горячих путей на текущей базе (обычно после generate_synthetic_data): "
+        "пересчёт автооценок, подача заявки, очередь менеджера, список и карточка тендера в API. "
+        "Пишущие пути выполняются в откатываемой транзакции, кеш ответов API перед каждым замером сбрасывается. "
+        "Результаты — JSON (--json / --output) для сравнения релизов, --compare печатает изменение медиан."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--benchmark', choices=BENCHMARKS, action='append', help='По умолчанию все')
+        parser.add_argument('--iterations', type=int, default=10)
+        parser.add_argument('--warmup', type=int, default=1)
+        parser.add_argument('--tender-id', type=int, help='По умолчанию открытый тендер с наибольшим числом заявок')
+        parser.add_argument('--label', default='', help='Метка прогона, например версия релиза')
+        parser.add_argument('--output', help='Сохранить JSON-отчёт в файл')
+        parser.add_argument('--compare', help='JSON-отчёт прошлого прогона для сравнения медиан')
+        parser.add_argument('--json', action='store_true', help='Печатать JSON-отчёт вместо таблицы')
+
+    def handle(self, *args, **options):
+        # Тестовые клиенты ходят с Host: testserver
+        with override_settings(ALLOWED_HOSTS=['*']):
+            self.prepare(options)
+            results = [
+                self.measure(name, options['iterations'], options['warmup'])
+                for name in options['benchmark'] or BENCHMARKS
+            ]
+
+        report = {
+            'suite': 'hot_paths',
+            'label': options['label'],
+            'created_at': timezone.now().isoformat(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'scoring_async': settings.SCORING_ASYNC,
+            'dataset': {
+                'organizations': Organization.objects.count(),
+                'tenders': Tender.objects.count(),
+                'proposals': Proposal.objects.count(),
+                'evaluations': Evaluation.objects.count(),
+                'benchmark_tender': {'id': self.tender.id, 'proposals': self.tender.proposals_total},
+            },
+            'results': results,
+        }
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+        if options['json']:
+            self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
+        else:
+            self.print_table(results, self.load_baseline(options['compare']))
+
+    def prepare(self, options):
+        tenders = Tender.objects.annotate(proposals_total=Count('proposals'))
+        if options['tender_id']:
+            self.tender = tenders.filter(pk=options['tender_id']).first()
+        else:
+            self.tender = tenders.filter(status='Открыт').order_by('-proposals_total', 'id').first()
+        if self.tender is None:
+            raise CommandError("Нет открытого тендера для замеров — запустите generate_synthetic_data")
+
+        manager = User.objects.filter(role='Менеджер', is_active=True).order_by('id').first()
+        if manager is None:
+            raise CommandError("Нет активного менеджера")
+        supplier = Organization.objects.filter(verification_status='Подтверждено', user__role='Поставщик') \
+            .exclude(proposals__tender=self.tender) \
+            .order_by('id').first()
+        if supplier is None:
+            raise CommandError(f"У всех поставщиков уже есть заявка на тендер {self.tender.id}")
+        self.supplier_user = UserContextService.get_user(supplier.user_id)
+
+        self.criteria_values = {
+            str(tc.criterion_id): '1000'
+            for tc in self.tender.criteria.select_related('criterion')
+            if tc.criterion.criterion_type == 'Количественный'
+        }
+
+        self.client = Client()
+        self.client.force_login(manager)
+        self.api_client = APIClient()
+        self.api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(manager)}')
+
+    # ===== Замеры: (подготовка вне замера, замеряемое действие) =====
+
+    def bench_recalculate_quantitative_scores(self):
+        def run():
+            with rolled_back():
+                EvaluationService.recalculate_quantitative_scores(self.tender)
+        return None, run
+
+    def bench_submit_proposal_with_criteria(self):
+        def run():
+            with rolled_back():
+                ProposalService.submit_proposal_with_criteria(self.supplier_user, self.tender.id, self.criteria_values)
+        return None, run
+
+    def bench_manager_requests(self):
+        url = reverse('manager_requests')
+        return None, lambda: self.get(self.client, url)
+
+    def bench_tender_list_api(self):
+        url = reverse('api_tender_list')
+        return lambda: invalidate_tags(TENDERS_TAG), lambda: self.get(self.api_client, url)
+
+    def bench_tender_detail_api(self):
+        url = reverse('api_tender_detail', kwargs={'pk': self.tender.id})
+        return lambda: invalidate_tags(tender_tag(self.tender.id)), lambda: self.get(self.api_client, url)
+
+    @staticmethod
+    def get(client, url):
+        response = client.get(url)
+        if response.status_code != 200:
+            raise CommandError(f"{url}: ответ {response.status_code}")
+
+    def measure(self, name, iterations, warmup) -> dict:
+        setup, run = getattr(self, f"bench_{name}")()
+        for _ in range(warmup):
+            if setup:
+                setup()
+            run()
+
+        timings, queries = [], []
+        for _ in range(iterations):
+            if setup:
+                setup()
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                run()
+                timings.append((time.perf_counter() - started) * 1000)
+            queries.append(len(captured))
+
+        timings.sort()
+        return {
+            'name': name,
+            'iterations': iterations,
+            'min_ms': round(timings[0], 2),
+            'median_ms': round(statistics.median(timings), 2),
+            'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2),
+            'max_ms': round(timings[-1], 2),
+            'mean_ms': round(statistics.fmean(timings), 2),
+            'queries': max(queries),
+        }
+
+    @staticmethod
+    def load_baseline(path) -> dict:
+        if not path:
+            return {}
+        with open(path, encoding='utf-8') as f:
+            return {result['name']: result for result in json.load(f)['results']}
+
+    def print_table(self, results, baseline):
+        self.stdout.write(f"Тендер {self.tender.id}: {self.tender.proposals_total} заявок")
+        for result in results:
+            line = (
+                f"{result['name']:<34} median {result['median_ms']:>9} ms  p95 {result['p95_ms']:>9} ms  "
+                f"SQL {result['queries']:>4}"
+            )
+            previous = baseline.get(result['name'])
+            if previous and previous['median_ms']:
+                line += f"  {result['median_ms'] / previous['median_ms'] - 1:+.0%} к базовому"
+            self.stdout.write(line)
@@ -0,0 +1,237 @@
+import datetime
+import time
+from decimal import Decimal
+import numpy as np
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from tenders.models import User, Organization, Manager, Tender, Criterion, TenderCriterion, Proposal, Evaluation
+from tenders.services.counter_service import PlatformCounterService
+from tenders.services.tender_service import TenderService
+from tenders.cache_tags import invalidate_tags, TENDERS_TAG, ORGANIZATIONS_TAG, PROPOSALS_TAG, CRITERIA_TAG
+
+# (название, тип, направление, типичное значение для количественных)
+CRITERIA = (
+    ('Цена', 'Количественный', 'Минимизирующий', 1_000_000),
+    ('Срок поставки, дней', 'Количественный', 'Минимизирующий', 30),
+    ('Гарантия, месяцев', 'Количественный', 'Максимизирующий', 24),
+    ('Опыт работы, лет', 'Количественный', 'Максимизирующий', 10),
+    ('Предоплата, %', 'Количественный', 'Минимизирующий', 30),
+    ('Штат специалистов', 'Количественный', 'Максимизирующий', 50),
+    ('Качество продукции', 'Качественный', 'Максимизирующий', None),
+    ('Деловая репутация', 'Качественный', 'Максимизирующий', None),
+    ('Сервисное обслуживание', 'Качественный', 'Максимизирующий', None),
+    ('Техническое предложение', 'Качественный', 'Максимизирующий', None),
+    ('Логистика', 'Качественный', 'Максимизирующий', None),
+    ('Соответствие ТЗ', 'Качественный', 'Максимизирующий', None),
+)
+
+ORG_TYPES = ('ООО', 'ОАО', 'ЗАО', 'ИП', 'УП')
+NAME_WORDS = ('Строй', 'Тех', 'Пром', 'Снаб', 'Инвест', 'Торг', 'Энерго', 'Мед', 'Агро', 'Транс', 'Сервис', 'Ресурс')
+SUBJECTS = (
+    'Поставка офисной техники', 'Ремонт кровли', 'Закупка медикаментов', 'Поставка топлива',
+    'Строительство склада', 'Разработка информационной системы', 'Поставка продуктов питания',
+    'Уборка территории', 'Поставка спецодежды', 'Техническое обслуживание лифтов',
+)
+TENDER_STATUSES = (('Открыт', 0.3), ('В оценке', 0.2), ('Закрыт', 0.5))
+ORG_STATUSES = (('Подтверждено', 0.95), ('На проверке', 0.03), ('Отклонено', 0.02))
+OPEN_PROPOSAL_STATUSES = (('Подана', 0.6), ('Проверяется', 0.2), ('Подтверждена', 0.2))
+CLOSED_PROPOSAL_STATUSES = (('Подтверждена', 0.8), ('Отклонена', 0.2))
+# Доля фирм-заказчиков среди организаций, остальные — поставщики
+FIRM_SHARE = 0.2
+BASE_DATE = datetime.date(2024, 1, 1)
+
+
+class Command(BaseCommand):
+    help = (
+        "Заполняет модели tenders синтетическими данными для нагрузочных замеров. "
+        "По умолчанию — полный объём: 50k организаций, 100k тендеров, 2M заявок и 20M оценок "
+        "(--scale 0.01 — сотая часть). Один и тот же --seed даёт одни и те же данные; "
+        "строки пишутся bulk_create пачками по --batch-size, каждая порция тендеров — своей транзакцией."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--organizations', type=int, default=50_000)
+        parser.add_argument('--tenders', type=int, default=100_000)
+        parser.add_argument('--proposals', type=int, default=2_000_000)
+        parser.add_argument('--criteria-per-tender', type=int, default=10, help='Оценок на заявку')
+        parser.add_argument('--scale', type=float, default=1.0, help='Множитель объёмов')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=5000, help='Строк в одном INSERT')
+        parser.add_argument('--tenders-per-chunk', type=int, default=250, help='Тендеров на транзакцию')
+        parser.add_argument('--prefix', default='syn', help='Префикс логинов, УНП и названий критериев')
+
+    def handle(self, *args, **options):
+        n_organizations = max(2, int(options['organizations'] * options['scale']))
+        n_tenders = max(1, int(options['tenders'] * options['scale']))
+        n_proposals = int(options['proposals'] * options['scale'])
+        per_tender = options['criteria_per_tender']
+        if not 1 <= per_tender <= len(CRITERIA):
+            raise CommandError(f"--criteria-per-tender должен быть от 1 до {len(CRITERIA)}")
+
+        self.prefix = options['prefix']
+        self.batch_size = options['batch_size']
+        if User.objects.filter(username__startswith=f"{self.prefix}_").exists():
+            raise CommandError(f"Данные с префиксом {self.prefix} уже есть — укажите другой --prefix")
+
+        self.rng = np.random.default_rng(options['seed'])
+        started = time.perf_counter()
+
+        criteria = self.create_criteria()
+        firms, suppliers = self.create_organizations(n_organizations)
+        self.create_manager()
+
+        totals = {'tenders': 0, 'proposals': 0, 'evaluations': 0}
+        # Заявки по тендерам: случайно, но ровно n_proposals в сумме (с поправкой на число поставщиков)
+        proposal_counts = np.minimum(self.rng.multinomial(n_proposals, [1 / n_tenders] * n_tenders), len(suppliers))
+        chunk = options['tenders_per_chunk']
+        for start in range(0, n_tenders, chunk):
+            with transaction.atomic():
+                created = self.create_tender_chunk(
+                    start, proposal_counts[start:start + chunk], firms, suppliers, criteria, per_tender
+                )
+            for name, value in created.items():
+                totals[name] += value
+            self.stdout.write(
+                f"  тендеров {totals['tenders']}/{n_tenders}, заявок {totals['proposals']}, "
+                f"оценок {totals['evaluations']}"
+            )
+
+        PlatformCounterService.reconcile()
+        TenderService.clear_criteria_cache()
+        invalidate_tags(TENDERS_TAG, ORGANIZATIONS_TAG, PROPOSALS_TAG, CRITERIA_TAG)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Готово за {time.perf_counter() - started:.0f} с: организаций {n_organizations}, "
+            f"тендеров {totals['tenders']}, заявок {totals['proposals']}, оценок {totals['evaluations']}. "
+            f"Оценки помечены устаревшими и пересчитаются при первом обращении."
+        ))
+
+    def choice(self, options, size):
+        values, weights = zip(*options)
+        return [values[i] for i in self.rng.choice(len(values), size=size, p=weights)]
+
+    def create_criteria(self) -> list:
+        criteria = []
+        for name, criterion_type, direction, typical in CRITERIA:
+            criterion, _ = Criterion.objects.get_or_create(
+                name=f"{name} ({self.prefix})",
+                defaults={'criterion_type': criterion_type, 'direction': direction},
+            )
+            criteria.append((criterion, typical))
+        return criteria
+
+    def create_organizations(self, count: int):
+        """Пользователи и организации; возвращает id подтверждённых фирм и поставщиков"""
+        n_firms = max(1, int(count * FIRM_SHARE))
+        statuses = self.choice(ORG_STATUSES, size=count)
+        # Хотя бы по одной подтверждённой фирме и поставщику
+        statuses[0] = statuses[n_firms] = 'Подтверждено'
+        words = self.rng.integers(0, len(NAME_WORDS), size=(count, 2))
+        org_types = self.rng.integers(0, len(ORG_TYPES), size=count)
+        password = make_password(None)
+
+        firms, suppliers = [], []
+        for start in range(0, count, self.batch_size):
+            indexes = range(start, min(start + self.batch_size, count))
+            users = User.objects.bulk_create([
+                User(
+                    username=f"{self.prefix}_org_{i}",
+                    email=f"{self.prefix}_org_{i}@example.com",
+                    password=password,
+                    role='Фирма' if i < n_firms else 'Поставщик',
+                )
+                for i in indexes
+            ])
+            organizations = Organization.objects.bulk_create([
+                Organization(
+                    user=user,
+                    name=f"{ORG_TYPES[org_types[i]]} «{NAME_WORDS[words[i, 0]]}{NAME_WORDS[words[i, 1]].lower()} {i}»",
+                    fio=f"Руководитель {i}",
+                    registration_number=f"{self.prefix}-{i:08d}",
+                    org_type=ORG_TYPES[org_types[i]],
+                    verification_status=statuses[i],
+                    approval_email_sent=statuses[i] == 'Подтверждено',
+                )
+                for i, user in zip(indexes, users)
+            ])
+            for i, organization in zip(indexes, organizations):
+                if statuses[i] == 'Подтверждено':
+                    (firms if i < n_firms else suppliers).append(organization.id)
+
+        self.stdout.write(f"  организаций {count}: фирм {len(firms)}, поставщиков {len(suppliers)} подтверждено")
+        return np.array(firms), np.array(suppliers)
+
+    def create_manager(self):
+        user = User.objects.create(
+            username=f"{self.prefix}_manager", email=f"{self.prefix}_manager@example.com",
+            password=make_password(None), role='Менеджер',
+        )
+        Manager.objects.create(user=user, fio='Синтетический менеджер')
+
+    def create_tender_chunk(self, start, proposal_counts, firms, suppliers, criteria, per_tender) -> dict:
+        size = len(proposal_counts)
+        statuses = self.choice(TENDER_STATUSES, size=size)
+        starts = self.rng.integers(0, 700, size=size)
+        tenders = Tender.objects.bulk_create([
+            Tender(
+                title=f"{SUBJECTS[(start + i) % len(SUBJECTS)]} №{start + i}",
+                description=f"Синтетический тендер {self.prefix} №{start + i}",
+                status=statuses[i],
+                method='AHP' if self.rng.random() < 0.5 else 'TOPSIS',
+                start_date=BASE_DATE + datetime.timedelta(days=int(starts[i])),
+                end_date=BASE_DATE + datetime.timedelta(days=int(starts[i] + self.rng.integers(14, 90))),
+                budget=Decimal(int(self.rng.integers(10_000, 50_000_000))),
+                organization_id=int(self.rng.choice(firms)),
+                # Оценки пересчитает rescore_tender: её ставит чтение устаревших оценок (EvaluationService.scores_current)
+                inputs_version=1,
+            )
+            for i in range(size)
+        ], batch_size=self.batch_size)
+
+        tender_criteria = []
+        for tender in tenders:
+            # Цена есть всегда, остальные критерии — случайные
+            picked = [0] + sorted(self.rng.choice(np.arange(1, len(criteria)), size=per_tender - 1, replace=False))
+            weights = self.rng.dirichlet(np.ones(per_tender))
+            tender_criteria.append([
+                TenderCriterion(tender=tender, criterion=criteria[index][0], weight=Decimal(f"{weight:.2f}"))
+                for index, weight in zip(picked, weights)
+            ])
+        TenderCriterion.objects.bulk_create(
+            [tc for row in tender_criteria for tc in row], batch_size=self.batch_size
+        )
+
+        proposals = []
+        for tender, count in zip(tenders, proposal_counts):
+            statuses = OPEN_PROPOSAL_STATUSES if tender.status == 'Открыт' else CLOSED_PROPOSAL_STATUSES
+            for supplier_id, status in zip(
+                self.rng.choice(suppliers, size=int(count), replace=False), self.choice(statuses, size=int(count))
+            ):
+                proposals.append(Proposal(tender=tender, supplier_id=int(supplier_id), status=status))
+        Proposal.objects.bulk_create(proposals, batch_size=self.batch_size)
+
+        typical = {criterion.id: value for criterion, value in criteria}
+        evaluations = []
+        evaluation_count = 0
+        criteria_by_tender = {row[0].tender_id: row for row in tender_criteria}
+        for proposal in proposals:
+            for tc in criteria_by_tender[proposal.tender_id]:
+                if tc.criterion.criterion_type == 'Количественный':
+                    value = typical[tc.criterion_id] * self.rng.lognormal(0, 0.25)
+                    evaluations.append(Evaluation(
+                        proposal=proposal, tender_criterion=tc, proposed_value=Decimal(f"{value:.2f}"),
+                        score=Decimal('0.0'), is_auto_calculated=True,
+                    ))
+                else:
+                    evaluations.append(Evaluation(
+                        proposal=proposal, tender_criterion=tc, score=Decimal(int(self.rng.integers(1, 11))),
+                    ))
+            if len(evaluations) >= self.batch_size:
+                Evaluation.objects.bulk_create(evaluations)
+                evaluation_count += len(evaluations)
+                evaluations = []
+        Evaluation.objects.bulk_create(evaluations)
+        evaluation_count += len(evaluations)
+
+        return {'tenders': size, 'proposals': len(proposals), 'evaluations': evaluation_count}
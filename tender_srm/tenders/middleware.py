@@ -0,0 +1,120 @@
+import json
+import logging
+import random
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from tenders.profiling import QueryBudgetExceeded, profile_request, resume_profile
+
+logger = logging.getLogger('tenders.profiling')
+
+
+class RequestProfilingMiddleware:
+    """
+    SQL-запросы и время каждого запроса с разбивкой db / serialize / template / app:
+    заголовок Server-Timing, выборочный JSON-лог с именем представления
+    и бюджет запросов на представление (QUERY_BUDGETS).
+    Стоит первым в MIDDLEWARE, чтобы учитывать запросы сессий и аутентификации.
+
+    У потоковых ответов (выгрузка CSV, отдача файлов) запросы идут при чтении тела,
+    уже после выхода из представления: профиль продолжается на время потока, лог и
+    проверка бюджета — после последнего чанка. Server-Timing в этом случае
+    отражает только время до начала потока.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        with profile_request() as profile:
+            response = self.get_response(request)
+        return self.finish(request, response, profile)
+
+    async def __acall__(self, request):
+        with profile_request() as profile:
+            response = await self.get_response(request)
+        return self.finish(request, response, profile)
+
+    @staticmethod
+    def view_name(request):
+        """'api.views.TenderListAPIView', 'tenders.views.manager_requests'; None, если URL не найден"""
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return None
+        view = getattr(match.func, 'view_class', match.func)
+        return f"{view.__module__}.{view.__qualname__}"
+
+    @staticmethod
+    def server_timing(profile, timings) -> str:
+        metrics = []
+        for name, seconds in timings.items():
+            metric = f"{name};dur={seconds * 1000:.2f}"
+            if name == 'db':
+                metric += f';desc="{profile.queries} queries"'
+            metrics.append(metric)
+        return ", ".join(metrics)
+
+    def finish(self, request, response, profile):
+        if settings.SERVER_TIMING_HEADER:
+            response['Server-Timing'] = self.server_timing(profile, profile.timings())
+        if response.streaming:
+            # Исходный итератор берётся до подмены streaming_content
+            content = response.streaming_content
+            if response.is_async:
+                response.streaming_content = self.aprofile_stream(request, response, profile, content)
+            else:
+                response.streaming_content = self.profile_stream(request, response, profile, content)
+            return response
+        self.report(request, response, profile)
+        return response
+
+    def profile_stream(self, request, response, profile, content):
+        iterator = iter(content)
+        while True:
+            # Контекст ставится на каждый чанк: генератор продолжает сервер, а не middleware
+            with resume_profile(profile):
+                try:
+                    chunk = next(iterator)
+                except StopIteration:
+                    break
+            yield chunk
+        self.report(request, response, profile)
+
+    async def aprofile_stream(self, request, response, profile, content):
+        iterator = content.__aiter__()
+        while True:
+            with resume_profile(profile):
+                try:
+                    chunk = await iterator.__anext__()
+                except StopAsyncIteration:
+                    break
+            yield chunk
+        self.report(request, response, profile)
+
+    def report(self, request, response, profile):
+        """Выборочный лог и проверка бюджета запросов"""
+        view_name = self.view_name(request)
+        timings = profile.timings()
+        budget = settings.QUERY_BUDGETS.get(view_name)
+        over_budget = budget is not None and profile.queries > budget
+        if over_budget or random.random() < settings.REQUEST_PROFILE_SAMPLE_RATE:
+            logger.log(logging.WARNING if over_budget else logging.INFO, json.dumps({
+                'event': 'request_profile',
+                'view': view_name,
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'queries': profile.queries,
+                'query_budget': budget,
+                **{f"{name}_ms": round(seconds * 1000, 2) for name, seconds in timings.items()},
+            }, ensure_ascii=False))
+
+        if over_budget and settings.QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded(f"{view_name}: {profile.queries} SQL-запросов при бюджете {budget}")
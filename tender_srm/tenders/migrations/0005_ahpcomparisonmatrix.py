@@ -0,0 +1,29 @@
+# Generated by Django 4.2.16 on 2026-10-17 03:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenders', '0004_evaluation_is_auto_calculated'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AhpComparisonMatrix',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('criteria_order', models.JSONField(default=list, verbose_name='Порядок критериев')),
+                ('matrix', models.JSONField(default=list, verbose_name='Матрица парных сравнений')),
+                ('revision', models.PositiveIntegerField(default=1, verbose_name='Ревизия')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('tender', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='ahp_matrix', to='tenders.tender')),
+            ],
+            options={
+                'verbose_name': 'Матрица AHP',
+                'verbose_name_plural': 'Матрицы AHP',
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.16 on 2026-10-17 03:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenders', '0005_ahpcomparisonmatrix'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CriterionBounds',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('min_value', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('max_value', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('tender_criterion', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='bounds', to='tenders.tendercriterion')),
+            ],
+        ),
+    ]
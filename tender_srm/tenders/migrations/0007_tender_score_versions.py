@@ -0,0 +1,23 @@
+# Generated by Django 4.2.16 on 2026-10-17 03:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenders', '0006_criterionbounds'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tender',
+            name='inputs_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='tender',
+            name='scored_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
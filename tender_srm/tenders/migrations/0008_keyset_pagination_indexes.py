@@ -0,0 +1,21 @@
+# Generated by Django 4.2.16 on 2026-10-17 03:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenders', '0007_tender_score_versions'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='proposal',
+            index=models.Index(fields=['submitted_at', 'id'], name='proposal_submitted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tender',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='tender_status_created_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.16 on 2026-10-17 03:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenders', '0008_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='evaluation',
+            index=models.Index(fields=['tender_criterion', 'proposal'], name='evaluation_tc_proposal_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='organization',
+            index=models.Index(fields=['verification_status'], name='org_verification_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='organization',
+            index=models.Index(condition=models.Q(('verification_status', 'На проверке')), fields=['id'], name='org_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='proposal',
+            index=models.Index(fields=['status', 'submitted_at', 'id'], name='proposal_status_submitted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='proposal',
+            index=models.Index(fields=['tender', 'supplier'], name='proposal_tender_supplier_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.16 on 2026-10-17 03:31
+
+from django.db import migrations, models
+
+
+def seed_counters(apps, schema_editor):
+    """Начальные значения счётчиков по текущим таблицам"""
+    PlatformCounter = apps.get_model('tenders', 'PlatformCounter')
+    Tender = apps.get_model('tenders', 'Tender')
+    Organization = apps.get_model('tenders', 'Organization')
+    Proposal = apps.get_model('tenders', 'Proposal')
+    Criterion = apps.get_model('tenders', 'Criterion')
+
+    counters = {
+        'open_tenders': Tender.objects.filter(status='Открыт').count(),
+        'verified_organizations': Organization.objects.filter(verification_status='Подтверждено').count(),
+        'pending_organizations': Organization.objects.filter(verification_status='На проверке').count(),
+        'proposals_total': Proposal.objects.count(),
+        'pending_proposals': Proposal.objects.filter(status__in=['Подана', 'Проверяется']).count(),
+        'criteria': Criterion.objects.count(),
+    }
+    PlatformCounter.objects.bulk_create([
+        PlatformCounter(name=name, value=value) for name, value in counters.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenders', '0009_hot_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlatformCounter',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
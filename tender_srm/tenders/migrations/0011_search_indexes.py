@@ -0,0 +1,86 @@
+# Generated by Django 4.2.16 on 2026-10-17 03:34
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+TENDER_SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('russian', coalesce({row}title, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce({row}description, '')), 'B')"
+)
+
+
+class PostgresOnlyAddIndex(migrations.AddIndex):
+    """GIN-индекс только на PostgreSQL; на SQLite состояние модели то же, индекса нет"""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+def create_search_trigger(apps, schema_editor):
+    """Триггер поддерживает search_vector при любой записи, включая bulk_create и update()"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f"""
+        CREATE OR REPLACE FUNCTION tenders_tender_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {TENDER_SEARCH_VECTOR_SQL.format(row='NEW.')};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER tenders_tender_search_vector_trigger
+            BEFORE INSERT OR UPDATE OF title, description ON tenders_tender
+            FOR EACH ROW EXECUTE PROCEDURE tenders_tender_search_vector_update();
+    """)
+    schema_editor.execute(f"UPDATE tenders_tender SET search_vector = {TENDER_SEARCH_VECTOR_SQL.format(row='')}")
+
+
+def drop_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("""
+        DROP TRIGGER IF EXISTS tenders_tender_search_vector_trigger ON tenders_tender;
+        DROP FUNCTION IF EXISTS tenders_tender_search_vector_update();
+    """)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenders', '0010_platform_counter'),
+    ]
+
+    operations = [
+        # CreateExtension сам пропускает не-PostgreSQL базы
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='tender',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        PostgresOnlyAddIndex(
+            model_name='criterion',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='criterion_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        PostgresOnlyAddIndex(
+            model_name='organization',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='org_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        PostgresOnlyAddIndex(
+            model_name='organization',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['registration_number'], name='org_regnum_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        PostgresOnlyAddIndex(
+            model_name='tender',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='tender_search_vector_idx'),
+        ),
+        migrations.RunPython(create_search_trigger, drop_search_trigger),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.16 on 2026-10-17 03:36
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenders', '0011_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TenderExport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_format', models.CharField(choices=[('csv', 'CSV'), ('xlsx', 'XLSX')], default='csv', max_length=10)),
+                ('status', models.CharField(choices=[('В очереди', 'В очереди'), ('Готов', 'Готов'), ('Ошибка', 'Ошибка')], default='В очереди', max_length=20)),
+                ('file', models.FileField(blank=True, upload_to='exports/')),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('requested_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tender_exports', to=settings.AUTH_USER_MODEL)),
+                ('tender', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exports', to='tenders.tender')),
+            ],
+        ),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+def mark_existing_approvals(apps, schema_editor):
+    """
+    Неотправленные письма теперь досылает пакетная очередь.
+    Организации, одобренные до неё (в т.ч. через админку без писем), задним числом не уведомляем.
+    """
+    Organization = apps.get_model('tenders', 'Organization')
+    Organization.objects.filter(verification_status='Подтверждено', approval_email_sent=False) \
+        .update(approval_email_sent=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenders', '0013_document_blobs'),
+    ]
+
+    operations = [
+        migrations.RunPython(mark_existing_approvals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.16 on 2026-10-17 04:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Рейтинг по уже посчитанным оценкам без отклонённых заявок;
+# дальше его поддерживает LeaderboardService.refresh
+BACKFILL_RANKS = """
+INSERT INTO "tenders_proposalrank" ("proposal_id", "tender_id", "supplier_id", "rank", "final_score", "gap_to_leader")
+SELECT "id", "tender_id", "supplier_id",
+       RANK() OVER (PARTITION BY "tender_id" ORDER BY "final_score" DESC),
+       "final_score",
+       MAX("final_score") OVER (PARTITION BY "tender_id") - "final_score"
+FROM "tenders_proposal"
+WHERE "status" <> 'Отклонена'
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenders', '0014_mark_existing_approvals_notified'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProposalRank',
+            fields=[
+                ('proposal', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rank_entry', serialize=False, to='tenders.proposal')),
+                ('rank', models.PositiveIntegerField()),
+                ('final_score', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('gap_to_leader', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('supplier', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='proposal_ranks', to='tenders.organization')),
+                ('tender', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ranks', to='tenders.tender')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['tender', 'rank', 'proposal'], name='proposal_rank_tender_idx')],
+            },
+        ),
+        migrations.RunSQL(BACKFILL_RANKS, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.16 on 2026-10-17 04:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenders', '0015_proposal_rank'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='organization',
+            name='approval_email_attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='organization',
+            name='approval_email_claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='organization',
+            name='approval_email_failed',
+            field=models.BooleanField(default=False),
+        ),
+    ]
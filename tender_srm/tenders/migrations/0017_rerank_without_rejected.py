@@ -0,0 +1,27 @@
+from django.db import migrations
+
+
+# 0015 на уже развёрнутых базах включил в рейтинг отклонённые заявки:
+# перестраиваем рейтинг всех тендеров без них
+DELETE_RANKS = 'DELETE FROM "tenders_proposalrank"'
+
+RERANK = """
+INSERT INTO "tenders_proposalrank" ("proposal_id", "tender_id", "supplier_id", "rank", "final_score", "gap_to_leader")
+SELECT "id", "tender_id", "supplier_id",
+       RANK() OVER (PARTITION BY "tender_id" ORDER BY "final_score" DESC),
+       "final_score",
+       MAX("final_score") OVER (PARTITION BY "tender_id") - "final_score"
+FROM "tenders_proposal"
+WHERE "status" <> 'Отклонена'
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenders', '0016_organization_approval_email_claim'),
+    ]
+
+    operations = [
+        migrations.RunSQL([DELETE_RANKS, RERANK], migrations.RunSQL.noop),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from decimal import Decimal
 
 
@@ -45,6 +47,10 @@ class Organization(models.Model):
     address = models.CharField(max_length=200, blank=True)
     phone = models.CharField(max_length=20, blank=True)
     approval_email_sent = models.BooleanField(default=False)
+    # Очередь писем об одобрении (MailService): захват строки отправителем, попытки и отказ доставки
+    approval_email_claimed_at = models.DateTimeField(null=True, blank=True)
+    approval_email_attempts = models.PositiveSmallIntegerField(default=0)
+    approval_email_failed = models.BooleanField(default=False)
 
     STATUS_CHOICES = (
         ('На проверке', 'На проверке'),
@@ -61,6 +67,19 @@ class Organization(models.Model):
     class Meta:
         verbose_name = "Организация"
         verbose_name_plural = "Организации"
+        indexes = [
+            # Счётчики подтверждённых/отклонённых организаций
+            models.Index(fields=['verification_status'], name='org_verification_status_idx'),
+            # Очередь менеджера: малая частичная выборка «На проверке» в порядке id
+            models.Index(
+                fields=['id'],
+                condition=models.Q(verification_status='На проверке'),
+                name='org_pending_idx'
+            ),
+            # Нечёткий поиск по названию и УНП (pg_trgm)
+            GinIndex(fields=['name'], opclasses=['gin_trgm_ops'], name='org_name_trgm_idx'),
+            GinIndex(fields=['registration_number'], opclasses=['gin_trgm_ops'], name='org_regnum_trgm_idx'),
+        ]
 
 
 class Manager(models.Model):
@@ -85,6 +104,18 @@ class Tender(models.Model):
     budget = models.DecimalField(max_digits=15, decimal_places=2, validators=[MinValueValidator(0)])
     organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name='tenders')
     created_at = models.DateTimeField(auto_now_add=True)
+    # Версия входных данных оценки и версия, на которой оценки последний раз пересчитаны
+    inputs_version = models.PositiveIntegerField(default=0)
+    scored_version = models.PositiveIntegerField(default=0)
+    # tsvector по title (вес A) и description (вес B); заполняется триггером PostgreSQL
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # Keyset-пагинация открытых тендеров по (created_at, id)
+            models.Index(fields=['status', 'created_at', 'id'], name='tender_status_created_idx'),
+            GinIndex(fields=['search_vector'], name='tender_search_vector_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -100,6 +131,11 @@ class Criterion(models.Model):
     max_value = models.DecimalField(max_digits=5, decimal_places=2, default=10.00)
     direction = models.CharField(max_length=20, choices=DIRECTION_CHOICES)
 
+    class Meta:
+        indexes = [
+            GinIndex(fields=['name'], opclasses=['gin_trgm_ops'], name='criterion_name_trgm_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -116,6 +152,33 @@ class TenderCriterion(models.Model):
         return f"{self.criterion.name} — {self.weight}"
 
 
+class CriterionBounds(models.Model):
+    """Минимум и максимум proposed_value по количественному критерию тендера"""
+    tender_criterion = models.OneToOneField(TenderCriterion, on_delete=models.CASCADE, related_name='bounds')
+    min_value = models.DecimalField(max_digits=15, decimal_places=2)
+    max_value = models.DecimalField(max_digits=15, decimal_places=2)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.tender_criterion}: {self.min_value}–{self.max_value}"
+
+
+class AhpComparisonMatrix(models.Model):
+    """Матрица парных сравнений критериев тендера (метод AHP)"""
+    tender = models.OneToOneField(Tender, on_delete=models.CASCADE, related_name='ahp_matrix')
+    criteria_order = models.JSONField("Порядок критериев", default=list)
+    matrix = models.JSONField("Матрица парных сравнений", default=list)
+    revision = models.PositiveIntegerField("Ревизия", default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Матрица AHP"
+        verbose_name_plural = "Матрицы AHP"
+
+    def __str__(self):
+        return f"AHP {self.tender} (ревизия {self.revision})"
+
+
 class Proposal(models.Model):
     STATUS_CHOICES = (
         ('Подана', 'Подана'),
@@ -131,10 +194,33 @@ class Proposal(models.Model):
     final_score = models.DecimalField(max_digits=5, decimal_places=2, default=0.0)
     submitted_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Keyset-пагинация очереди заявок по (submitted_at, id)
+            models.Index(fields=['submitted_at', 'id'], name='proposal_submitted_idx'),
+            # status='Подана' / status__in=[...] в очереди менеджера и на дашборде
+            models.Index(fields=['status', 'submitted_at', 'id'], name='proposal_status_submitted_idx'),
+            # Проверка «уже подавал заявку» по (tender, supplier)
+            models.Index(fields=['tender', 'supplier'], name='proposal_tender_supplier_idx'),
+        ]
+
     def __str__(self):
         return f"Заявка #{self.pk} от {self.supplier}"
 
 
+class DocumentBlob(models.Model):
+    """Содержимое файла, адресуемое SHA-256: одинаковые файлы хранятся на диске один раз"""
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    file = models.FileField(upload_to='blobs/', max_length=255)
+    size = models.BigIntegerField()
+    # Число документов, ссылающихся на blob; при нуле файл удаляется
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.sha256[:12]}… ({self.ref_count})"
+
+
 class Document(models.Model):
     DOCUMENT_TYPE_CHOICES = (
         ('verification', 'Для верификации организации'),
@@ -159,7 +245,9 @@ class Document(models.Model):
     document_type = models.CharField(max_length=20, choices=DOCUMENT_TYPE_CHOICES, default='proposal')
 
     name = models.CharField("Название документа", max_length=100)
-    file = models.FileField("Файл", upload_to='documents/')
+    file = models.FileField("Файл", upload_to='documents/', max_length=255)
+    # Новые документы ссылаются на общий blob; file указывает на тот же путь
+    blob = models.ForeignKey(DocumentBlob, on_delete=models.PROTECT, null=True, blank=True, related_name='documents')
     uploaded_at = models.DateTimeField(auto_now_add=True)
     verification_status = models.CharField(
         max_length=20,
@@ -201,7 +289,11 @@ class Evaluation(models.Model):
     is_auto_calculated = models.BooleanField("Автоматически рассчитана", default=False)
     class Meta:
         unique_together = ('proposal', 'tender_criterion')
-        
+        indexes = [
+            # Выборки оценок по критерию тендера (автооценки, границы критериев)
+            models.Index(fields=['tender_criterion', 'proposal'], name='evaluation_tc_proposal_idx'),
+        ]
+
 
 
 class Contract(models.Model):
@@ -212,4 +304,55 @@ class Contract(models.Model):
     status = models.CharField(max_length=20, choices=[('Подписан', 'Подписан'), ('Расторгнут', 'Расторгнут')], default='Подписан')
 
     def __str__(self):
-        return self.contract_number
\ No newline at end of file
+        return self.contract_number
+
+
+class PlatformCounter(models.Model):
+    """Материализованные счётчики для главной и дашборда (поддерживает PlatformCounterService)"""
+    name = models.CharField(max_length=50, primary_key=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
+
+
+class TenderExport(models.Model):
+    """Фоновая выгрузка результатов тендера в файл"""
+    STATUS_CHOICES = (('В очереди', 'В очереди'), ('Готов', 'Готов'), ('Ошибка', 'Ошибка'))
+    FORMAT_CHOICES = (('csv', 'CSV'), ('xlsx', 'XLSX'))
+
+    tender = models.ForeignKey(Tender, on_delete=models.CASCADE, related_name='exports')
+    requested_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tender_exports')
+    file_format = models.CharField(max_length=10, choices=FORMAT_CHOICES, default='csv')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='В очереди')
+    file = models.FileField(upload_to='exports/', blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Выгрузка {self.tender} ({self.file_format}, {self.status})"
+
+
+class ProposalRank(models.Model):
+    """
+    Рейтинг заявок тендера: место (RANK() в БД), итоговая оценка и отставание от лидера.
+    Перестраивается LeaderboardService.refresh после каждого пересчёта итоговых оценок
+    и при отклонении заявки: отклонённые заявки в рейтинг не входят.
+    """
+    proposal = models.OneToOneField(Proposal, on_delete=models.CASCADE, primary_key=True, related_name='rank_entry')
+    tender = models.ForeignKey(Tender, on_delete=models.CASCADE, related_name='ranks')
+    supplier = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name='proposal_ranks')
+    rank = models.PositiveIntegerField()
+    final_score = models.DecimalField(max_digits=5, decimal_places=2)
+    gap_to_leader = models.DecimalField(max_digits=5, decimal_places=2)
+
+    class Meta:
+        indexes = [
+            # Таблица лидеров тендера — одно диапазонное чтение по (tender, rank, proposal)
+            models.Index(fields=['tender', 'rank', 'proposal'], name='proposal_rank_tender_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.rank}. {self.proposal}"
@@ -0,0 +1,93 @@
+import base64
+import binascii
+import datetime
+import json
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+
+class KeysetPaginator:
+    """
+    Keyset-пагинация: следующая страница выбирается условием «после последней строки»,
+    а не OFFSET, поэтому глубина страницы не влияет на время ответа.
+    ordering — поля сортировки, последнее должно быть уникальным (обычно id).
+    """
+
+    def __init__(self, queryset, ordering, page_size):
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.page_size = page_size
+
+    @staticmethod
+    def encode_cursor(values) -> str:
+        # isoformat() вручную: DjangoJSONEncoder обрезает микросекунды, и ключ перестаёт быть точным
+        values = [value.isoformat() if isinstance(value, datetime.datetime) else value for value in values]
+        raw = json.dumps(values, cls=DjangoJSONEncoder).encode()
+        return base64.urlsafe_b64encode(raw).decode()
+
+    def decode_cursor(self, cursor: str) -> list:
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (binascii.Error, ValueError, UnicodeDecodeError):
+            raise ValueError("Некорректный курсор")
+        if not isinstance(values, list) or len(values) != len(self.ordering) or None in values:
+            raise ValueError("Некорректный курсор")
+        # Приводим значения к типам полей сортировки: подделанный или устаревший
+        # курсор (например, от другой сортировки) не должен доходить до SQL
+        try:
+            return [
+                self._output_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except (ValidationError, TypeError):
+            raise ValueError("Некорректный курсор")
+
+    def _output_field(self, name):
+        """Поле модели или аннотации (например, rank полнотекстового поиска)"""
+        annotation = self.queryset.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field
+        try:
+            return self.queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            raise ValueError("Некорректный курсор")
+
+    def _after(self, values) -> Q:
+        """(f1, f2, ...) строго после values в порядке ordering"""
+        condition = Q()
+        equal = Q()
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal & Q(**{f"{name}__{lookup}": value})
+            equal &= Q(**{name: value})
+
+        # Граница по первому полю даёт диапазонное сканирование индекса
+        first = self.ordering[0]
+        bound = 'lte' if first.startswith('-') else 'gte'
+        return Q(**{f"{first.lstrip('-')}__{bound}": values[0]}) & condition
+
+    def _page_queryset(self, cursor):
+        queryset = self.queryset.order_by(*self.ordering)
+        if cursor:
+            queryset = queryset.filter(self._after(self.decode_cursor(cursor)))
+        return queryset[:self.page_size + 1]
+
+    def _split_page(self, items):
+        has_next = len(items) > self.page_size
+        items = items[:self.page_size]
+
+        next_cursor = None
+        if has_next:
+            last = items[-1]
+            next_cursor = self.encode_cursor([getattr(last, field.lstrip('-')) for field in self.ordering])
+        return items, next_cursor
+
+    def get_page(self, cursor=None):
+        """Возвращает (объекты страницы, курсор следующей страницы или None)"""
+        return self._split_page(list(self._page_queryset(cursor)))
+
+    async def aget_page(self, cursor=None):
+        """То же для async-представлений: выборка через асинхронный ORM"""
+        return self._split_page([item async for item in self._page_queryset(cursor)])
@@ -0,0 +1,126 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.template.backends.django import DjangoTemplates
+
+
+class QueryBudgetExceeded(Exception):
+    """Представление сделало больше SQL-запросов, чем разрешено в QUERY_BUDGETS"""
+
+
+class RequestProfile:
+    """
+    Время и SQL-запросы одного запроса. Секции считаются без времени БД внутри них:
+    ленивый queryset в шаблоне попадает в db, а не в template.
+    """
+
+    SECTIONS = ('serialize', 'template')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.sections = dict.fromkeys(self.SECTIONS, 0.0)
+
+    def record_query(self, duration: float) -> None:
+        self.queries += 1
+        self.db_time += duration
+
+    @contextmanager
+    def section(self, name: str):
+        started, db_before = time.perf_counter(), self.db_time
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started - (self.db_time - db_before)
+            self.sections[name] += max(elapsed, 0.0)
+
+    def timings(self) -> dict:
+        """{секция: секунды}; app — всё, что не БД, сериализация и шаблоны"""
+        total = time.perf_counter() - self.started
+        timings = {'db': self.db_time, **self.sections}
+        timings['app'] = max(total - sum(timings.values()), 0.0)
+        timings['total'] = total
+        return timings
+
+
+_current_profile: ContextVar = ContextVar('request_profile', default=None)
+
+
+def current_profile():
+    return _current_profile.get()
+
+
+@contextmanager
+def profile_request():
+    profile = RequestProfile()
+    token = _current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _current_profile.reset(token)
+
+
+@contextmanager
+def resume_profile(profile: RequestProfile):
+    """Продолжает профиль уже отданного ответа: тело StreamingHttpResponse читается после middleware"""
+    token = _current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _current_profile.reset(token)
+
+
+@contextmanager
+def profile_section(name: str):
+    """Замер секции текущего запроса; вне запроса ничего не делает"""
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+    with profile.section(name):
+        yield
+
+
+def _execute_wrapper(execute, sql, params, many, context):
+    profile = _current_profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.record_query(time.perf_counter() - started)
+
+
+def instrument_connection(connection) -> None:
+    """
+    Обёртка ставится на соединение один раз и читает профиль из contextvar,
+    поэтому считает и запросы async ORM, выполняемые в потоке sync_to_async
+    """
+    if _execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute_wrapper)
+
+
+class ProfiledTemplate:
+    def __init__(self, template):
+        self.template = template
+
+    @property
+    def origin(self):
+        return self.template.origin
+
+    def render(self, context=None, request=None):
+        with profile_section('template'):
+            return self.template.render(context, request)
+
+
+class ProfiledDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates с замером времени рендера в секцию template"""
+
+    def from_string(self, template_code):
+        return ProfiledTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return ProfiledTemplate(super().get_template(template_name))
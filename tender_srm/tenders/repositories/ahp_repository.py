@@ -0,0 +1,29 @@
+from typing import Optional
+from django.db import transaction
+from django.db.models import F
+from tenders.models import AhpComparisonMatrix, Tender
+
+
+class AhpRepository:
+    @staticmethod
+    def get_for_tender(tender: Tender) -> Optional[AhpComparisonMatrix]:
+        try:
+            return AhpComparisonMatrix.objects.get(tender=tender)
+        except AhpComparisonMatrix.DoesNotExist:
+            return None
+
+    @staticmethod
+    @transaction.atomic
+    def save_matrix(tender: Tender, criteria_order: list, matrix: list) -> AhpComparisonMatrix:
+        """Каждое сохранение увеличивает ревизию — по ней и хешу матрицы строится ключ кеша весов"""
+        ahp_matrix, created = AhpComparisonMatrix.objects.select_for_update().get_or_create(
+            tender=tender,
+            defaults={'criteria_order': criteria_order, 'matrix': matrix}
+        )
+        if not created:
+            ahp_matrix.criteria_order = criteria_order
+            ahp_matrix.matrix = matrix
+            ahp_matrix.revision = F('revision') + 1
+            ahp_matrix.save(update_fields=['criteria_order', 'matrix', 'revision', 'updated_at'])
+            ahp_matrix.refresh_from_db(fields=['revision'])
+        return ahp_matrix
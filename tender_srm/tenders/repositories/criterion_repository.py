@@ -1,6 +1,8 @@
 from django.db import transaction
 from typing import List, Optional
 from tenders.models import Criterion
+from tenders.services.counter_service import PlatformCounterService
+from tenders.search import search_similar
 
 
 class CriterionRepository:
@@ -10,7 +12,7 @@ class CriterionRepository:
 
     @staticmethod
     def filter_by_name(search: str) -> List[Criterion]:
-        return Criterion.objects.filter(name__icontains=search)
+        return search_similar(Criterion.objects.all(), search, ['name']).order_by('-similarity', 'name')
 
     @staticmethod
     def filter_by_type(criterion_type: str) -> List[Criterion]:
@@ -30,7 +32,9 @@ class CriterionRepository:
     @staticmethod
     @transaction.atomic
     def create(validated_data: dict) -> Criterion:
-        return Criterion.objects.create(**validated_data)
+        criterion = Criterion.objects.create(**validated_data)
+        PlatformCounterService.status_changed(Criterion, None, '')
+        return criterion
 
     @staticmethod
     @transaction.atomic
@@ -43,4 +47,5 @@ class CriterionRepository:
     @staticmethod
     @transaction.atomic
     def delete(instance: Criterion) -> None:
-        instance.delete()
\ No newline at end of file
+        instance.delete()
+        PlatformCounterService.status_changed(Criterion, '', None)
\ No newline at end of file
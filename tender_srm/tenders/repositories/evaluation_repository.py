@@ -1,6 +1,7 @@
 from django.db import transaction
 from django.db.models import QuerySet
-from tenders.models import Evaluation, Tender, TenderCriterion
+from django.db.models import Min, Max
+from tenders.models import Evaluation, Tender, TenderCriterion, CriterionBounds
 from decimal import Decimal
 from typing import List
 
@@ -24,11 +25,61 @@ class EvaluationRepository:
     def get_quantitative_criteria_for_tender(tender: Tender) -> QuerySet:
         return tender.criteria.filter(criterion__criterion_type='Количественный').select_related('criterion')
 
+    @staticmethod
+    def get_criteria_rows(tender: Tender) -> list:
+        """(id, weight, direction, criterion_type) критериев тендера в стабильном порядке"""
+        return list(
+            tender.criteria.order_by('id').values_list(
+                'id', 'weight', 'criterion__direction', 'criterion__criterion_type'
+            )
+        )
+
+    @staticmethod
+    def get_matrix_rows(tender: Tender) -> QuerySet:
+        """(proposal_id, tender_criterion_id, proposed_value, score) всех оценок тендера"""
+        return Evaluation.objects.filter(proposal__tender=tender).values_list(
+            'proposal_id', 'tender_criterion_id', 'proposed_value', 'score'
+        )
+
+    @staticmethod
+    def get_proposal_scores(proposal) -> dict:
+        """{tender_criterion_id: score} оценок одной заявки"""
+        return dict(proposal.evaluations.values_list('tender_criterion_id', 'score'))
+
     @staticmethod
     @transaction.atomic
     def create_evaluation(**kwargs) -> Evaluation:
         return Evaluation.objects.create(**kwargs)
 
+    @staticmethod
+    def lock_bounds(tender_criterion_ids: list) -> dict:
+        """Границы критериев под select_for_update: {tender_criterion_id: CriterionBounds}"""
+        return {
+            b.tender_criterion_id: b
+            for b in CriterionBounds.objects.select_for_update().filter(tender_criterion_id__in=tender_criterion_ids)
+        }
+
+    @staticmethod
+    def aggregate_bounds(tender_criterion_id: int):
+        result = Evaluation.objects.filter(
+            tender_criterion_id=tender_criterion_id,
+            proposed_value__isnull=False
+        ).aggregate(min_value=Min('proposed_value'), max_value=Max('proposed_value'))
+        return result['min_value'], result['max_value']
+
+    @staticmethod
+    def save_bounds(tender_criterion_id: int, min_value, max_value) -> CriterionBounds:
+        bounds, _ = CriterionBounds.objects.update_or_create(
+            tender_criterion_id=tender_criterion_id,
+            defaults={'min_value': min_value, 'max_value': max_value}
+        )
+        return bounds
+
+    @staticmethod
+    @transaction.atomic
+    def bulk_create_evaluations(evaluations: List[Evaluation]) -> List[Evaluation]:
+        return Evaluation.objects.bulk_create(evaluations, batch_size=1000)
+
     @staticmethod
     def get_by_id(evaluation_id: int) -> Evaluation | None:
         try:
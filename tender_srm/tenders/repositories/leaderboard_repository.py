@@ -0,0 +1,86 @@
+from django.db import connection, transaction
+from django.db.models import F, Max
+from django.db.models import QuerySet
+from tenders.models import Proposal, ProposalRank, Tender
+
+
+class LeaderboardRepository:
+    # Отклонённые заявки в рейтинге не участвуют
+    EXCLUDED_STATUS = 'Отклонена'
+
+    @staticmethod
+    def rebuild(tender_id: int) -> None:
+        LeaderboardRepository.rebuild_many([tender_id])
+
+    @staticmethod
+    @transaction.atomic
+    def rebuild_many(tender_ids) -> None:
+        """
+        Перестраивает рейтинги тендеров одним INSERT ... SELECT с оконными функциями:
+        места и отставание от лидера считает БД, строки в Python не загружаются.
+        Число запросов не зависит от числа тендеров.
+        """
+        tender_ids = sorted(set(tender_ids))
+        if not tender_ids:
+            return
+        # Параллельные пересчёты одного тендера перестраивают рейтинг по очереди
+        list(Tender.objects.select_for_update().filter(pk__in=tender_ids).order_by('pk').values_list('id'))
+
+        ProposalRank.objects.filter(tender_id__in=tender_ids).delete()
+        qn = connection.ops.quote_name
+        placeholders = ', '.join(['%s'] * len(tender_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {qn(ProposalRank._meta.db_table)} "
+                f"({qn('proposal_id')}, {qn('tender_id')}, {qn('supplier_id')}, "
+                f"{qn('rank')}, {qn('final_score')}, {qn('gap_to_leader')}) "
+                f"SELECT {qn('id')}, {qn('tender_id')}, {qn('supplier_id')}, "
+                f"RANK() OVER (PARTITION BY {qn('tender_id')} ORDER BY {qn('final_score')} DESC), "
+                f"{qn('final_score')}, "
+                f"MAX({qn('final_score')}) OVER (PARTITION BY {qn('tender_id')}) - {qn('final_score')} "
+                f"FROM {qn(Proposal._meta.db_table)} "
+                f"WHERE {qn('tender_id')} IN ({placeholders}) AND {qn('status')} <> %s",
+                [*tender_ids, LeaderboardRepository.EXCLUDED_STATUS],
+            )
+
+    @staticmethod
+    @transaction.atomic
+    def insert(proposal: Proposal) -> None:
+        """
+        Добавляет в рейтинг одну новую заявку без перестроения:
+        сдвигает места ниже неё и, если она новый лидер, отставание остальных
+        """
+        if proposal.status == LeaderboardRepository.EXCLUDED_STATUS:
+            return
+        list(Tender.objects.select_for_update().filter(pk=proposal.tender_id).values_list('id'))
+
+        entries = ProposalRank.objects.filter(tender_id=proposal.tender_id)
+        if entries.filter(proposal_id=proposal.id).exists():
+            LeaderboardRepository.rebuild(proposal.tender_id)
+            return
+
+        score = proposal.final_score
+        leader = entries.aggregate(leader=Max('final_score'))['leader']
+        rank = entries.filter(final_score__gt=score).count() + 1
+        entries.filter(final_score__lt=score).update(rank=F('rank') + 1)
+        if leader is not None and score > leader:
+            entries.update(gap_to_leader=F('gap_to_leader') + (score - leader))
+
+        ProposalRank.objects.create(
+            proposal_id=proposal.id, tender_id=proposal.tender_id, supplier_id=proposal.supplier_id,
+            rank=rank, final_score=score,
+            gap_to_leader=max(leader, score) - score if leader is not None else 0,
+        )
+
+    @staticmethod
+    def get_for_tender(tender_id: int) -> QuerySet:
+        return ProposalRank.objects.filter(tender_id=tender_id).select_related('supplier') \
+            .only('proposal', 'tender', 'supplier__name', 'rank', 'final_score', 'gap_to_leader')
+
+    @staticmethod
+    def get_for_supplier(tender_id: int, supplier_id) -> ProposalRank:
+        return ProposalRank.objects.filter(tender_id=tender_id, supplier_id=supplier_id).first()
+
+    @staticmethod
+    def count_for_tender(tender_id: int) -> int:
+        return ProposalRank.objects.filter(tender_id=tender_id).count()
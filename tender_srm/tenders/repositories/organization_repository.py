@@ -1,6 +1,8 @@
 from django.db import transaction
 from django.utils import timezone
-from tenders.models import Organization, Manager
+from tenders.models import Organization, Manager, User, Document
+from tenders.search import search_similar
+from tenders.services.counter_service import PlatformCounterService
 
 
 class OrganizationRepository:
@@ -9,12 +11,31 @@ class OrganizationRepository:
         return Organization.objects.filter(verification_status="На проверке") \
             .prefetch_related("user", "verification_documents")
 
+    @staticmethod
+    def get_by_ids(org_ids) -> dict:
+        return Organization.objects.in_bulk(org_ids)
+
+    @staticmethod
+    def search(text: str):
+        """Нечёткий поиск по названию и подстроке УНП, самые похожие первыми"""
+        return search_similar(Organization.objects.all(), text, ['name'], ['registration_number']) \
+            .order_by('-similarity', 'id')
+
+    @staticmethod
+    @transaction.atomic
+    def create(**fields) -> Organization:
+        """Организация при регистрации (сайт и API)"""
+        organization = Organization.objects.create(**fields)
+        PlatformCounterService.status_changed(Organization, None, organization.verification_status)
+        return organization
+
     @staticmethod
     @transaction.atomic
     def update_verification_status(org_id: int, status: str, manager=None):
 
         org = Organization.objects.select_for_update().get(id=org_id)
-        
+        old_status = org.verification_status
+
         org.verification_status = status
         org.verified_at = timezone.now()
         org.verified_by = manager
@@ -39,5 +60,33 @@ class OrganizationRepository:
             "verified_at",
             "verified_by"
         ])
+        PlatformCounterService.status_changed(Organization, old_status, status)
+
+        return org
+
+    @staticmethod
+    @transaction.atomic
+    def bulk_update_verification_status(org_ids, status: str, manager=None) -> list:
+        """
+        То же, что update_verification_status, для набора организаций:
+        по одному UPDATE на организации, их пользователей и документы.
+        Возвращает [(org_id, user_id)] найденных организаций.
+        """
+        rows = list(
+            Organization.objects.select_for_update().filter(id__in=org_ids).order_by('id').values_list('id', 'user_id')
+        )
+        if not rows:
+            return rows
+        found_ids = [org_id for org_id, _ in rows]
+        user_ids = [user_id for _, user_id in rows]
 
-        return org
\ No newline at end of file
+        PlatformCounterService.update_status(
+            Organization.objects.filter(id__in=found_ids), status,
+            verified_at=timezone.now(), verified_by=manager
+        )
+        User.objects.filter(id__in=user_ids).update(is_active=status == "Подтверждено")
+        Document.objects.filter(organization_id__in=found_ids).update(
+            verification_status="Подтвержден" if status == "Подтверждено" else "Отклонен",
+            verified_by=manager
+        )
+        return rows
@@ -1,5 +1,7 @@
 from django.db import transaction
-from tenders.models import Proposal, Document  
+from tenders.models import Proposal, Document
+from tenders.services.document_storage_service import DocumentStorageService
+from tenders.services.counter_service import PlatformCounterService
 
 
 class ProposalRepository:
@@ -9,18 +11,74 @@ class ProposalRepository:
             proposal = Proposal.objects.create(
                 tender=tender,
                 supplier=supplier,
-                status='Подана'  
+                status='Подана'
             )
-            for file in files:
-                Document.objects.create(
+            PlatformCounterService.status_changed(Proposal, None, proposal.status)
+            Document.objects.bulk_create([
+                DocumentStorageService.build_document(
+                    file,
                     proposal=proposal,
                     document_type="proposal",
                     name=file.name,
-                    file=file,
                     verification_status="На проверке"
                 )
+                for file in files
+            ])
         return proposal
 
+    @staticmethod
+    @transaction.atomic
+    def bulk_create_proposals(proposals: list) -> list:
+        return Proposal.objects.bulk_create(proposals, batch_size=1000)
+
+    @staticmethod
+    def get_supplier_ids_for_tender(tender, supplier_ids) -> set:
+        return set(
+            Proposal.objects.filter(tender=tender, supplier_id__in=supplier_ids).values_list('supplier_id', flat=True)
+        )
+
+    @staticmethod
+    def get_ids_for_tender(tender) -> list:
+        return list(Proposal.objects.filter(tender=tender).order_by('id').values_list('id', flat=True))
+
+    @staticmethod
+    @transaction.atomic
+    def bulk_update_final_scores(final_scores: dict) -> None:
+        """final_scores: {proposal_id: Decimal}"""
+        proposals = [Proposal(pk=pk, final_score=score) for pk, score in final_scores.items()]
+        Proposal.objects.bulk_update(proposals, ['final_score'], batch_size=1000)
+
     @staticmethod
     def exists_for_tender_and_supplier(tender, supplier) -> bool:
-        return Proposal.objects.filter(tender=tender, supplier=supplier).exists()
\ No newline at end of file
+        return Proposal.objects.filter(tender=tender, supplier=supplier).exists()
+
+    @staticmethod
+    @transaction.atomic
+    def update_status(proposal: Proposal, status: str) -> Proposal:
+        old_status = proposal.status
+        proposal.status = status
+        proposal.save(update_fields=['status'])
+        PlatformCounterService.status_changed(Proposal, old_status, status)
+        return proposal
+
+    @staticmethod
+    @transaction.atomic
+    def bulk_update_status(proposal_ids, status: str, manager=None) -> list:
+        """
+        Статус набора заявок и их документов двумя UPDATE;
+        возвращает [(id, tender_id, supplier_id, прежний статус)] найденных
+        """
+        rows = list(
+            Proposal.objects.select_for_update().filter(id__in=proposal_ids).order_by('id')
+            .values_list('id', 'tender_id', 'supplier_id', 'status')
+        )
+        if not rows:
+            return rows
+        found_ids = [proposal_id for proposal_id, _, _, _ in rows]
+
+        PlatformCounterService.update_status(Proposal.objects.filter(id__in=found_ids), status)
+        Document.objects.filter(proposal_id__in=found_ids).update(
+            verification_status='Подтвержден' if status == 'Подтверждена' else 'Отклонен',
+            verified_by=manager
+        )
+        return rows
@@ -1,6 +1,8 @@
 from typing import List, Optional
-from django.db.models import QuerySet
-from tenders.models import Tender, TenderCriterion, Criterion
+from django.db.models import QuerySet, F, Count, OuterRef, Subquery, IntegerField, FloatField, Value
+from django.db.models.functions import Coalesce
+from tenders.models import Tender, TenderCriterion, Criterion, Proposal, Organization
+from tenders.search import search_tenders, search_similar
 
 
 class TenderRepository:
@@ -24,6 +26,37 @@ class TenderRepository:
             .select_related("organization") \
             .prefetch_related("criteria__criterion")
 
+    @staticmethod
+    def get_open_tenders_for_list() -> QuerySet:
+        """Открытые тендеры для API-списка: только нужные колонки и число заявок подзапросом"""
+        proposals_count = Proposal.objects.filter(tender=OuterRef("pk")) \
+            .order_by() \
+            .values("tender") \
+            .annotate(total=Count("id")) \
+            .values("total")
+
+        return Tender.objects.filter(status="Открыт") \
+            .select_related("organization") \
+            .only(
+                "id", "title", "description", "status", "method", "start_date", "end_date",
+                "budget", "created_at", "organization__name"
+            ) \
+            .annotate(proposals_count=Coalesce(Subquery(proposals_count, output_field=IntegerField()), 0))
+
+    @staticmethod
+    def search_open_tenders(text: str = "", organization: str = "") -> QuerySet:
+        """Поиск открытых тендеров с релевантностью rank; organization — нечёткий фильтр по организатору"""
+        queryset = TenderRepository.get_open_tenders_for_list()
+        if text:
+            queryset = search_tenders(queryset, text)
+        else:
+            queryset = queryset.annotate(rank=Value(0.0, output_field=FloatField()))
+
+        if organization:
+            organizers = search_similar(Organization.objects.all(), organization, ['name'], ['registration_number'])
+            queryset = queryset.filter(organization__in=organizers.values('id'))
+        return queryset
+
     @staticmethod
     def get_tender_by_id(tender_id: int) -> Optional[Tender]:
         try:
@@ -35,4 +68,17 @@ class TenderRepository:
 
     @staticmethod
     def get_tenders_for_user_organization(org) -> QuerySet:
-        return Tender.objects.filter(organization=org) | Tender.objects.filter(status="Открыт")
\ No newline at end of file
+        return Tender.objects.filter(organization=org) | Tender.objects.filter(status="Открыт")
+
+    @staticmethod
+    def mark_scores_dirty(tender_ids) -> int:
+        return Tender.objects.filter(id__in=tender_ids).update(inputs_version=F("inputs_version") + 1)
+
+    @staticmethod
+    def mark_scores_dirty_for_criterion(criterion_id: int) -> int:
+        tender_ids = TenderCriterion.objects.filter(criterion_id=criterion_id).values("tender_id")
+        return Tender.objects.filter(id__in=tender_ids).update(inputs_version=F("inputs_version") + 1)
+
+    @staticmethod
+    def mark_scored(tender_id: int, version: int) -> int:
+        return Tender.objects.filter(id=tender_id, scored_version__lt=version).update(scored_version=version)
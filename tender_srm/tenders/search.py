@@ -0,0 +1,49 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.db import connection
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.functions import Cast, Greatest
+
+# Полнотекстовый поиск — PostgreSQL (tsvector + pg_trgm).
+# На SQLite (DB_ENGINE=sqlite, см. settings) — icontains с грубой релевантностью;
+# миграция 0011 там не создаёт ни расширение, ни GIN-индексы.
+SEARCH_CONFIG = 'russian'
+
+
+def full_text_enabled() -> bool:
+    return connection.vendor == 'postgresql'
+
+
+def search_tenders(queryset, text: str):
+    """Тендеры, подходящие под запрос, с аннотацией rank (больше — релевантнее)"""
+    if not full_text_enabled():
+        return queryset.filter(Q(title__icontains=text) | Q(description__icontains=text)).annotate(
+            rank=Case(When(title__icontains=text, then=Value(1.0)), default=Value(0.5), output_field=FloatField())
+        )
+
+    query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+    # ts_rank возвращает real: приводим к double, чтобы значение в курсоре совпадало точно
+    return queryset.filter(search_vector=query).annotate(
+        rank=Cast(SearchRank(F('search_vector'), query), FloatField())
+    )
+
+
+def search_similar(queryset, text: str, fields, exact_fields=()):
+    """
+    Нечёткий поиск по trigram-индексам с аннотацией similarity.
+    fields — сравнение по словам (<%), exact_fields — подстрока (LIKE, тоже через GIN).
+    """
+    if not full_text_enabled():
+        condition = Q()
+        for field in (*fields, *exact_fields):
+            condition |= Q(**{f'{field}__icontains': text})
+        return queryset.filter(condition).annotate(similarity=Value(1.0, output_field=FloatField()))
+
+    condition = Q()
+    for field in fields:
+        condition |= Q(**{f'{field}__trigram_word_similar': text})
+    for field in exact_fields:
+        condition |= Q(**{f'{field}__contains': text})
+
+    similarities = [TrigramWordSimilarity(text, field) for field in (*fields, *exact_fields)]
+    similarity = Greatest(*similarities) if len(similarities) > 1 else similarities[0]
+    return queryset.filter(condition).annotate(similarity=similarity)
@@ -0,0 +1,192 @@
+import hashlib
+import numpy as np
+from django.core.cache import cache
+from django.conf import settings
+from django.db import transaction
+from tenders.models import Tender
+from tenders.repositories.ahp_repository import AhpRepository
+from tenders.repositories.evaluation_repository import EvaluationRepository
+from tenders.repositories.proposal_repository import ProposalRepository
+from tenders.services.score_matrix_service import ScoreMatrixService
+from tenders.services.leaderboard_service import LeaderboardService
+from tenders.cache_tags import invalidate_tags, tender_tag
+
+
+class AhpService:
+    """AHP: веса критериев по матрице парных сравнений (собственный вектор)"""
+
+    # Индекс случайной согласованности Саати для n = 1..15
+    RANDOM_INDEX = (0.0, 0.0, 0.0, 0.58, 0.90, 1.12, 1.24, 1.32, 1.41, 1.45, 1.49, 1.51, 1.48, 1.56, 1.57, 1.59)
+    MAX_CONSISTENCY_RATIO = 0.1
+
+    @staticmethod
+    def _cache_key(ahp_matrix) -> str:
+        # Ревизия повторяется после отката транзакции или пересоздания матрицы,
+        # поэтому в ключе ещё и хеш содержимого
+        digest = hashlib.sha256(np.asarray(ahp_matrix.matrix, dtype=float).tobytes()).hexdigest()[:16]
+        return f"ahp_weights_{ahp_matrix.pk}_{ahp_matrix.revision}_{digest}"
+
+    @staticmethod
+    def compute_weights(matrix) -> dict:
+        """Главный собственный вектор и отношение согласованности"""
+        a = np.asarray(matrix, dtype=float)
+        n = a.shape[0]
+        eigenvalues, eigenvectors = np.linalg.eig(a)
+        k = int(np.argmax(eigenvalues.real))
+        lambda_max = float(eigenvalues[k].real)
+
+        weights = np.abs(eigenvectors[:, k].real)
+        weights = weights / weights.sum()
+
+        consistency_index = (lambda_max - n) / (n - 1) if n > 2 else 0.0
+        random_index = AhpService.RANDOM_INDEX[min(n, len(AhpService.RANDOM_INDEX) - 1)]
+        consistency_ratio = consistency_index / random_index if random_index else 0.0
+
+        return {
+            'weights': weights.tolist(),
+            'lambda_max': lambda_max,
+            'consistency_ratio': max(consistency_ratio, 0.0),
+        }
+
+    @staticmethod
+    def _is_number(value) -> bool:
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+    @staticmethod
+    def validate_matrix(matrix, size: int) -> None:
+        if not isinstance(matrix, list) or not all(
+            isinstance(row, list) and all(AhpService._is_number(value) for value in row) for row in matrix
+        ):
+            raise ValueError("Матрица должна быть списком строк из чисел")
+        try:
+            a = np.asarray(matrix, dtype=float)
+        except ValueError:
+            raise ValueError(f"Матрица должна быть размером {size}×{size} по числу критериев тендера")
+        if a.shape != (size, size):
+            raise ValueError(f"Матрица должна быть размером {size}×{size} по числу критериев тендера")
+        if np.any(a <= 0):
+            raise ValueError("Элементы матрицы должны быть положительными")
+        if not np.allclose(np.diag(a), 1.0):
+            raise ValueError("На диагонали матрицы должны стоять единицы")
+        # Допуск под округлённые значения вида 0.33 вместо 1/3
+        if not np.allclose(a * a.T, 1.0, rtol=0.02, atol=0.02):
+            raise ValueError("Матрица должна быть обратно-симметричной: a[j][i] = 1 / a[i][j]")
+
+    @staticmethod
+    def save_matrix(user, tender_id: int, matrix: list) -> dict:
+        try:
+            tender = Tender.objects.select_related('organization').get(id=tender_id)
+        except Tender.DoesNotExist:
+            raise ValueError("Тендер не найден")
+
+        is_owner = user.role == "Фирма" and getattr(user, "organization", None) == tender.organization
+        if not (is_owner or user.role == "Менеджер"):
+            raise PermissionError("Матрицу сравнений может задать только владелец тендера или менеджер")
+
+        AhpService.apply_matrix(tender, matrix)
+        return AhpService.get_weights(tender)
+
+    @staticmethod
+    def check_matrix(tender: Tender, matrix: list) -> dict:
+        """Проверки матрицы для тендера; возвращает веса и CR"""
+        if tender.method != 'AHP':
+            raise ValueError("Тендер оценивается не методом AHP")
+
+        AhpService.validate_matrix(matrix, len(ScoreMatrixService.criteria_ids(tender)))
+
+        result = AhpService.compute_weights(matrix)
+        if result['consistency_ratio'] > AhpService.MAX_CONSISTENCY_RATIO:
+            raise ValueError(
+                f"Матрица несогласована: CR = {result['consistency_ratio']:.3f} "
+                f"(допустимо не более {AhpService.MAX_CONSISTENCY_RATIO})"
+            )
+        return result
+
+    @staticmethod
+    @transaction.atomic
+    def apply_matrix(tender: Tender, matrix: list):
+        """Сохраняет матрицу (API и админка) и пересчитывает итоговые оценки и рейтинг"""
+        result = AhpService.check_matrix(tender, matrix)
+
+        ahp_matrix = AhpRepository.save_matrix(tender, ScoreMatrixService.criteria_ids(tender), matrix)
+        cache_key = AhpService._cache_key(ahp_matrix)
+        transaction.on_commit(lambda: cache.set(cache_key, result, settings.CACHE_TTL * 4))
+
+        AhpService.calculate_final_scores(tender)
+        LeaderboardService.refresh(tender)
+        # bulk_update не шлёт сигналов — кеш ответов по тендеру сбрасываем явно
+        invalidate_tags(tender_tag(tender.id))
+        return ahp_matrix
+
+    @staticmethod
+    def get_weights(tender: Tender) -> dict:
+        """
+        Веса в порядке столбцов ScoreMatrixService.
+        Разложение считается один раз на ревизию матрицы, дальше берётся из кеша.
+        Без матрицы (или если критерии тендера изменились) — нормированные TenderCriterion.weight.
+        """
+        criteria = EvaluationRepository.get_criteria_rows(tender)
+        criteria_order = [tc_id for tc_id, _, _, _ in criteria]
+        ahp_matrix = AhpRepository.get_for_tender(tender)
+
+        if ahp_matrix is not None and ahp_matrix.criteria_order == criteria_order:
+            cache_key = AhpService._cache_key(ahp_matrix)
+            result = cache.get(cache_key)
+            if result is None:
+                result = AhpService.compute_weights(ahp_matrix.matrix)
+                cache.set(cache_key, result, settings.CACHE_TTL * 4)
+            return {
+                'source': 'matrix',
+                'revision': ahp_matrix.revision,
+                'criteria': criteria_order,
+                **result,
+            }
+
+        weights = np.array([float(weight) for _, weight, _, _ in criteria])
+        total = weights.sum()
+        if weights.size:
+            weights = weights / total if total > 0 else np.full(weights.shape, 1.0 / weights.size)
+        return {
+            'source': 'tender_criteria',
+            'revision': None,
+            'criteria': criteria_order,
+            'weights': weights.tolist(),
+            'lambda_max': None,
+            'consistency_ratio': None,
+        }
+
+    @staticmethod
+    def weighted_sum(matrix: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        """Σ w_j · score_ij; weights — вектор (C,) или пакет наборов весов (K×C) → P×K"""
+        if not weights.size:
+            return np.zeros((matrix.shape[0],) + weights.shape[:-1])
+        return np.nan_to_num(matrix, nan=0.0) @ weights.T
+
+    @staticmethod
+    def calculate_final_scores(tender: Tender) -> dict:
+        """final_score = Σ w_j · score_ij, одним bulk_update"""
+        proposal_ids, matrix, _, _ = ScoreMatrixService.build(tender)
+        if not proposal_ids:
+            return {}
+
+        weights = np.asarray(AhpService.get_weights(tender)['weights'], dtype=float)
+        values = AhpService.weighted_sum(matrix, weights)
+
+        final_scores = ScoreMatrixService.to_final_scores(proposal_ids, values)
+        ProposalRepository.bulk_update_final_scores(final_scores)
+        return final_scores
+
+    @staticmethod
+    def calculate_proposal_score(tender: Tender, proposal):
+        """Итоговая оценка одной заявки: взвешенная сумма не зависит от остальных заявок"""
+        weights_info = AhpService.get_weights(tender)
+        scores = EvaluationRepository.get_proposal_scores(proposal)
+        row = np.array([[
+            float(scores[tc_id]) if scores.get(tc_id) is not None else np.nan
+            for tc_id in weights_info['criteria']
+        ]])
+        value = AhpService.weighted_sum(row, np.asarray(weights_info['weights'], dtype=float))
+        final_score = ScoreMatrixService.to_final_scores([proposal.id], value)[proposal.id]
+        ProposalRepository.bulk_update_final_scores({proposal.id: final_score})
+        proposal.final_score = final_score
+        return final_score
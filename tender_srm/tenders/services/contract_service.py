@@ -0,0 +1,140 @@
+from django.conf import settings
+from django.db import InterfaceError, OperationalError
+from django.core.files.base import ContentFile
+from django.db.models import Exists, F, OuterRef, Subquery
+from django.template.loader import get_template, render_to_string
+from django.utils import timezone
+from tenders.models import Tender, Proposal, Evaluation, Contract
+from tenders.services.evaluation_service import EvaluationService
+
+
+class ContractService:
+    """
+    Договоры с победителями тендеров: HTML-шаблон -> PDF через WeasyPrint.
+    Рендер идёт только в Celery (очередь CONTRACTS_QUEUE), шаблон и шрифты кешируются на процесс воркера.
+    """
+
+    TEMPLATE_NAME = 'contracts/contract.html'
+    STYLESHEET_NAME = 'contracts/contract.css'
+
+    # Временные сбои: соединение с БД или хранилищем. Ошибки шаблона и данных не повторяются
+    TRANSIENT_ERRORS = (OperationalError, InterfaceError, ConnectionError, TimeoutError)
+
+    # Кеш процесса воркера: разобранный шаблон, FontConfiguration и CSS
+    _template = None
+    _font_config = None
+    _stylesheet = None
+
+    @staticmethod
+    def is_transient(error: Exception) -> bool:
+        return isinstance(error, ContractService.TRANSIENT_ERRORS)
+
+    @staticmethod
+    def contract_number(proposal) -> str:
+        return f"Д-{proposal.tender_id}-{proposal.id}"
+
+    @staticmethod
+    def _closed_tenders(tender_ids=None):
+        tenders = Tender.objects.filter(status='Закрыт')
+        if tender_ids:
+            tenders = tenders.filter(id__in=tender_ids)
+        return tenders
+
+    @staticmethod
+    def winners_queryset(tender_ids=None):
+        """
+        Победители закрытых тендеров без договора: подтверждённая заявка с наибольшим final_score.
+        Тендеры с устаревшими оценками (inputs_version != scored_version) не участвуют —
+        победитель по ним может измениться после пересчёта.
+        """
+        best = Proposal.objects.filter(tender=OuterRef('pk'), status='Подтверждена') \
+            .order_by('-final_score', 'submitted_at', 'id') \
+            .values('id')[:1]
+
+        tenders = ContractService._closed_tenders(tender_ids).filter(scored_version=F('inputs_version'))
+        winner_ids = tenders.annotate(winner_id=Subquery(best)).exclude(winner_id=None).values('winner_id')
+
+        return Proposal.objects.filter(id__in=winner_ids) \
+            .exclude(Exists(Contract.objects.filter(proposal=OuterRef('pk')).exclude(pdf_file='')))
+
+    @staticmethod
+    def queue_winner_contracts(tender_ids=None) -> tuple:
+        """
+        Ставит рендер договоров победителей пачками по CONTRACT_BATCH_SIZE.
+        Для тендеров с устаревшими оценками ставит пересчёт вместо договора.
+        Возвращает (число договоров в очереди, id пропущенных тендеров).
+        """
+        from api.tasks import render_contracts_batch
+
+        stale = list(ContractService._closed_tenders(tender_ids).exclude(scored_version=F('inputs_version')))
+        for tender in stale:
+            EvaluationService.scores_current(tender)
+
+        proposal_ids = list(ContractService.winners_queryset(tender_ids).order_by('id').values_list('id', flat=True))
+        batch_size = settings.CONTRACT_BATCH_SIZE
+        for start in range(0, len(proposal_ids), batch_size):
+            render_contracts_batch.apply_async(
+                args=[proposal_ids[start:start + batch_size]], queue=settings.CONTRACTS_QUEUE
+            )
+        return len(proposal_ids), [tender.id for tender in stale]
+
+    @staticmethod
+    def _get_renderer():
+        # Импорт здесь: WeasyPrint тянет системные pango/cairo, веб-процессам они не нужны
+        from weasyprint import CSS
+        from weasyprint.text.fonts import FontConfiguration
+
+        if ContractService._stylesheet is None:
+            font_config = FontConfiguration()
+            ContractService._stylesheet = CSS(
+                string=render_to_string(ContractService.STYLESHEET_NAME), font_config=font_config
+            )
+            ContractService._font_config = font_config
+        return ContractService._stylesheet, ContractService._font_config
+
+    @staticmethod
+    def render_html(contract: Contract) -> str:
+        if ContractService._template is None:
+            ContractService._template = get_template(ContractService.TEMPLATE_NAME)
+
+        proposal = contract.proposal
+        evaluations = Evaluation.objects.filter(proposal=proposal) \
+            .select_related('tender_criterion__criterion') \
+            .order_by('tender_criterion_id')
+        return ContractService._template.render({
+            'contract': contract,
+            'proposal': proposal,
+            'tender': proposal.tender,
+            'supplier': proposal.supplier,
+            'evaluations': evaluations,
+        })
+
+    @staticmethod
+    def render_pdf(html: str) -> bytes:
+        from weasyprint import HTML
+
+        stylesheet, font_config = ContractService._get_renderer()
+        return HTML(string=html, base_url=str(settings.BASE_DIR)).write_pdf(
+            stylesheets=[stylesheet], font_config=font_config
+        )
+
+    @staticmethod
+    def render_contract(proposal_id: int) -> Contract:
+        """Создаёт договор (если его нет) и сохраняет PDF; вызывается только из задач Celery"""
+        proposal = Proposal.objects.select_related('tender__organization', 'supplier').get(id=proposal_id)
+        # Оценки могли устареть между постановкой в очередь и рендером
+        if proposal.tender.inputs_version != proposal.tender.scored_version:
+            raise ValueError(f"Оценки тендера {proposal.tender_id} устарели, договор не сформирован")
+        contract, _ = Contract.objects.get_or_create(
+            proposal=proposal,
+            defaults={
+                'contract_number': ContractService.contract_number(proposal),
+                'signed_date': timezone.localdate(),
+            },
+        )
+        if contract.pdf_file:
+            return contract
+
+        pdf = ContractService.render_pdf(ContractService.render_html(contract))
+        contract.pdf_file.save(f"{contract.contract_number}.pdf", ContentFile(pdf), save=True)
+        return contract
@@ -0,0 +1,113 @@
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+from tenders.models import PlatformCounter, Tender, Organization, Proposal, Criterion
+
+
+class PlatformCounterService:
+    """
+    Счётчики платформы: правятся дельтами из сервисов записи при смене статусов,
+    periodic-задача reconcile_platform_counters исправляет накопившийся дрейф
+    (каскадные удаления, правки через inline-формы админки, update() мимо сервиса).
+    """
+
+    # Имя счётчика -> (модель, поле статуса, значения; None — все строки)
+    COUNTERS = {
+        'open_tenders': (Tender, 'status', ('Открыт',)),
+        'verified_organizations': (Organization, 'verification_status', ('Подтверждено',)),
+        'pending_organizations': (Organization, 'verification_status', ('На проверке',)),
+        'proposals_total': (Proposal, 'status', None),
+        'pending_proposals': (Proposal, 'status', ('Подана', 'Проверяется')),
+        'criteria': (Criterion, None, None),
+    }
+
+    @staticmethod
+    def tracked_field(model):
+        for counter_model, field, _ in PlatformCounterService.COUNTERS.values():
+            if counter_model is model:
+                return field
+        return None
+
+    @staticmethod
+    def get_counters() -> dict:
+        """Все счётчики одним запросом по первичному ключу"""
+        values = dict(PlatformCounter.objects.values_list('name', 'value'))
+        return {name: values.get(name, 0) for name in PlatformCounterService.COUNTERS}
+
+    @staticmethod
+    def adjust(deltas: dict) -> None:
+        """Атомарное приращение; вызывается после коммита (см. status_changed)"""
+        for name, delta in deltas.items():
+            if delta:
+                PlatformCounter.objects.filter(name=name).update(
+                    value=F('value') + delta, updated_at=timezone.now()
+                )
+
+    @staticmethod
+    def transition_deltas(model, old_status, new_status, count: int = 1) -> dict:
+        """
+        Дельты для перехода old_status -> new_status.
+        old_status=None — строка создана, new_status=None — удалена.
+        """
+        deltas = {}
+        for name, (counter_model, _, values) in PlatformCounterService.COUNTERS.items():
+            if counter_model is not model:
+                continue
+            was = old_status is not None and (values is None or old_status in values)
+            now = new_status is not None and (values is None or new_status in values)
+            if was != now:
+                deltas[name] = count if now else -count
+        return deltas
+
+    @staticmethod
+    def status_changed(model, old_status, new_status, count: int = 1) -> None:
+        """
+        Вызывается сервисами записи. Дельта применяется после коммита: горячие строки
+        PlatformCounter не блокируются на время транзакции подачи заявки или проверки,
+        откат транзакции счётчики не трогает
+        """
+        deltas = PlatformCounterService.transition_deltas(model, old_status, new_status, count)
+        if deltas:
+            transaction.on_commit(lambda: PlatformCounterService.adjust(deltas))
+
+    @staticmethod
+    def deleted(queryset) -> None:
+        """Удаление набора строк (до delete()): по одной дельте на статус"""
+        model = queryset.model
+        field = PlatformCounterService.tracked_field(model)
+        if field is None:
+            PlatformCounterService.status_changed(model, '', None, queryset.count())
+            return
+        for group in queryset.order_by().values(field).annotate(rows=Count('pk')):
+            PlatformCounterService.status_changed(model, group[field], None, group['rows'])
+
+    @staticmethod
+    def update_status(queryset, new_status, **fields) -> int:
+        """
+        queryset.update() статуса с правкой счётчиков: update() сигналов не шлёт.
+        fields — прочие столбцы того же UPDATE (verified_at, verified_by и т.п.)
+        """
+        model = queryset.model
+        field = PlatformCounterService.tracked_field(model)
+        with transaction.atomic():
+            groups = list(queryset.order_by().values(field).annotate(rows=Count('pk')))
+            updated = queryset.update(**{field: new_status}, **fields)
+            for group in groups:
+                PlatformCounterService.status_changed(model, group[field], new_status, group['rows'])
+        return updated
+
+    @staticmethod
+    def reconcile() -> dict:
+        """Пересчёт всех счётчиков по таблицам; возвращает найденный дрейф"""
+        current = PlatformCounterService.get_counters()
+        drift = {}
+        for name, (model, field, values) in PlatformCounterService.COUNTERS.items():
+            queryset = model.objects.all()
+            if values is not None:
+                queryset = queryset.filter(**{f'{field}__in': values})
+            actual = queryset.count()
+
+            PlatformCounter.objects.update_or_create(name=name, defaults={'value': actual})
+            if actual != current[name]:
+                drift[name] = actual - current[name]
+        return drift
@@ -1,5 +1,6 @@
 from typing import List, Dict, Optional
 from tenders.repositories.criterion_repository import CriterionRepository
+from tenders.repositories.tender_repository import TenderRepository
 from tenders.models import Criterion
 
 
@@ -27,10 +28,14 @@ class CriterionService:
 
     @staticmethod
     def update_criterion(criterion: Criterion, validated_data: dict) -> Criterion:
-        return CriterionRepository.update(criterion, validated_data)
+        criterion = CriterionRepository.update(criterion, validated_data)
+        # Тип и направление критерия влияют на оценки тендеров, где он используется
+        TenderRepository.mark_scores_dirty_for_criterion(criterion.id)
+        return criterion
 
     @staticmethod
     def delete_criterion(criterion: Criterion) -> None:
+        TenderRepository.mark_scores_dirty_for_criterion(criterion.id)
         CriterionRepository.delete(criterion)
 
     @staticmethod
@@ -0,0 +1,112 @@
+import hashlib
+import os
+from django.core.files.storage import default_storage
+from typing import Optional
+from django.db import connection, transaction
+from django.db.models import F
+from tenders.models import Document, DocumentBlob
+
+
+class DocumentStorageService:
+    """
+    Контентно-адресуемое хранение документов.
+    Файл лежит по пути от SHA-256 содержимого; повторная загрузка того же файла
+    лишь увеличивает ref_count, на диск ничего не пишется.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+
+    @staticmethod
+    def file_digest(uploaded_file) -> str:
+        # Хеш обычно уже посчитан загрузчиком (tenders.uploads); иначе — один проход по чанкам
+        digest = getattr(uploaded_file, 'sha256', None)
+        if digest:
+            return digest
+        sha256 = hashlib.sha256()
+        for chunk in uploaded_file.chunks(DocumentStorageService.CHUNK_SIZE):
+            sha256.update(chunk)
+        uploaded_file.seek(0)
+        return sha256.hexdigest()
+
+    @staticmethod
+    def blob_path(digest: str, filename: str) -> str:
+        extension = os.path.splitext(filename or '')[1].lower()[:10]
+        return f"blobs/{digest[:2]}/{digest[2:4]}/{digest}{extension}"
+
+    @staticmethod
+    def _lock_digest(digest: str) -> None:
+        """
+        Блокировка по хешу до конца транзакции: создание blob и удаление файла-сироты
+        с тем же содержимым не перекрываются. На SQLite запись и так идёт по очереди.
+        """
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_xact_lock(%s)", [int(digest[:15], 16)])
+
+    @staticmethod
+    def _add_reference(digest: str) -> Optional[DocumentBlob]:
+        if DocumentBlob.objects.filter(sha256=digest).update(ref_count=F('ref_count') + 1):
+            return DocumentBlob.objects.get(sha256=digest)
+        return None
+
+    @staticmethod
+    def store(uploaded_file) -> DocumentBlob:
+        """Blob для содержимого файла с уже учтённой новой ссылкой"""
+        digest = DocumentStorageService.file_digest(uploaded_file)
+
+        blob = DocumentStorageService._add_reference(digest)
+        if blob is not None:
+            return blob
+
+        path = DocumentStorageService.blob_path(digest, uploaded_file.name)
+        with transaction.atomic():
+            DocumentStorageService._lock_digest(digest)
+            # Пока ждали блокировку, blob мог создать параллельный запрос
+            blob = DocumentStorageService._add_reference(digest)
+            if blob is not None:
+                return blob
+
+            # Файл мог остаться от прерванной загрузки или удалённого blob — содержимое то же самое.
+            # Сироты удаляются под той же блокировкой, поэтому до коммита файл не пропадёт
+            if not default_storage.exists(path):
+                path = default_storage.save(path, uploaded_file)
+            return DocumentBlob.objects.create(
+                sha256=digest, file=path, size=uploaded_file.size, ref_count=1
+            )
+
+    @staticmethod
+    def build_document(uploaded_file, **fields) -> Document:
+        """
+        Несохранённый Document поверх общего blob (для create/bulk_create).
+        Ссылка учитывается сразу, поэтому вызывать только внутри transaction.atomic()
+        вместе с сохранением документа: при откате не останется лишнего ref_count.
+        """
+        if not transaction.get_connection().in_atomic_block:
+            raise transaction.TransactionManagementError(
+                "build_document вызывается в одной транзакции с сохранением документа"
+            )
+        blob = DocumentStorageService.store(uploaded_file)
+        return Document(file=blob.file.name, blob=blob, **fields)
+
+    @staticmethod
+    def release(blob_id: str) -> None:
+        """Снимает ссылку; последний документ удаляет и файл"""
+        with transaction.atomic():
+            DocumentBlob.objects.filter(sha256=blob_id).update(ref_count=F('ref_count') - 1)
+            orphan = DocumentBlob.objects.select_for_update() \
+                .filter(sha256=blob_id, ref_count=0) \
+                .first()
+            if orphan is None:
+                return
+            path = orphan.file.name
+            orphan.delete()
+        transaction.on_commit(lambda: DocumentStorageService._delete_orphan_file(blob_id, path))
+
+    @staticmethod
+    def _delete_orphan_file(blob_id: str, path: str) -> None:
+        # Тот же файл могли загрузить заново, пока удалялась строка: проверка и удаление —
+        # под блокировкой хеша, параллельный store дождётся и запишет файл сам
+        with transaction.atomic():
+            DocumentStorageService._lock_digest(blob_id)
+            if not DocumentBlob.objects.filter(sha256=blob_id).exists():
+                default_storage.delete(path)
@@ -1,62 +1,207 @@
 from decimal import Decimal, ROUND_HALF_UP
 from django.db import transaction
+from django.conf import settings
 from tenders.models import Tender, Evaluation
 from tenders.repositories.evaluation_repository import EvaluationRepository
+from tenders.repositories.tender_repository import TenderRepository
+from tenders.cache_tags import invalidate_tags, tender_tag, shared_cache
+from tenders.services.topsis_service import TopsisService
+from tenders.services.ahp_service import AhpService
+from tenders.services.leaderboard_service import LeaderboardService
 
 
 class EvaluationService:
 
+    @staticmethod
+    def calculate_score(value: Decimal, min_val: Decimal, max_val: Decimal, direction: str) -> Decimal:
+        """Дискретная нормализация 1–10 с шагом (цена 800→10, 1200→1, 1000→~7)"""
+        if max_val == min_val:
+            return Decimal('10.0')
+
+        step = (max_val - min_val) / Decimal('9')
+
+        if direction == 'Максимизирующий':
+            distance = value - min_val
+        else:  # Минимизирующий
+            distance = max_val - value
+
+        raw_score = Decimal('1') + distance / step
+        score = raw_score.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+        if score < Decimal('1.0'):
+            score = Decimal('1.0')
+        if score > Decimal('10.0'):
+            score = Decimal('10.0')
+        return score
+
+    @staticmethod
+    def _rescore_criterion(tender: Tender, tc, min_val: Decimal, max_val: Decimal):
+        """Переписывает автооценки всех заявок по одному критерию"""
+        evals = list(EvaluationRepository.get_evaluations_for_tender_criterion(tc.id, tender.id))
+        for e in evals:
+            e.score = EvaluationService.calculate_score(e.proposed_value, min_val, max_val, tc.criterion.direction)
+            e.is_auto_calculated = True
+            e.evaluator = None
+        EvaluationRepository.bulk_update_evaluations(evals, ['score', 'is_auto_calculated', 'evaluator'])
+
     @staticmethod
     @transaction.atomic
     def recalculate_quantitative_scores(tender: Tender):
-        """Дискретная нормализация 1–10 с шагом (цена 800→10, 1200→1, 1000→~7)"""
+        """Полный пересчёт автооценок тендера с перестроением границ критериев"""
         quant_criteria = EvaluationRepository.get_quantitative_criteria_for_tender(tender)
 
         for tc in quant_criteria:
-            criterion = tc.criterion
+            min_val, max_val = EvaluationRepository.aggregate_bounds(tc.id)
+            if min_val is None:
+                continue
 
-            evals = Evaluation.objects.filter(
-                tender_criterion=tc,
-                proposal__tender=tender,
-                proposed_value__isnull=False
-            )
+            EvaluationRepository.save_bounds(tc.id, min_val, max_val)
+            EvaluationService._rescore_criterion(tender, tc, min_val, max_val)
 
-            if not evals.exists():
-                continue
+        EvaluationService.update_final_scores(tender)
 
-            values = [e.proposed_value for e in evals]
-            max_val = max(values)
-            min_val = min(values)
+    @staticmethod
+    def invalidate_scores(tender_ids) -> int:
+        """Входные данные оценки изменились — пересчёт при следующем обращении"""
+        return TenderRepository.mark_scores_dirty(tender_ids)
 
-            if max_val == min_val:
-                evals.update(score=Decimal('10.0'), is_auto_calculated=True, evaluator=None)
-                continue
+    @staticmethod
+    def ensure_scores_fresh(tender: Tender) -> bool:
+        """
+        Пересчёт, только если inputs_version ушла вперёд scored_version (задача rescore_tender).
+        Свежие оценки отдаются как есть, без транзакции на запись.
+        """
+        version = tender.inputs_version
+        if version == tender.scored_version:
+            return False
+
+        EvaluationService.recalculate_quantitative_scores(tender)
+        TenderRepository.mark_scored(tender.id, version)
+        tender.scored_version = version
+        return True
 
-            step = (max_val - min_val) / Decimal('9')
+    @staticmethod
+    def scores_current(tender: Tender) -> bool:
+        """
+        Для страниц чтения: пересчёт на запросе не выполняется. Устаревшие оценки отдаются
+        с is_current=False, а пересчёт ставится в очередь (если ещё не стоит)
+        """
+        if tender.inputs_version == tender.scored_version:
+            return True
+        EvaluationService._enqueue_rescore(tender.id)
+        return False
 
-            updated = []
-            for e in evals:
-                val = e.proposed_value
+    @staticmethod
+    def rescore_flag_key(tender_id: int) -> str:
+        return f"rescore_scheduled_{tender_id}"
 
-                if criterion.direction == 'Максимизирующий':
-                    distance = val - min_val
-                else:  # Минимизирующий
-                    distance = max_val - val
+    @staticmethod
+    def is_rescore_scheduled(tender_id: int) -> bool:
+        return bool(shared_cache.get(EvaluationService.rescore_flag_key(tender_id)))
 
-                raw_score = Decimal('1') + distance / step
-                score = raw_score.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+    @staticmethod
+    def schedule_rescore(tender_id: int):
+        """
+        Помечает тендер устаревшим и ставит пересчёт в Celery после коммита.
+        Все триггеры в пределах SCORING_COALESCE_SECONDS сливаются в один запуск rescore_tender.
+        """
+        TenderRepository.mark_scores_dirty([tender_id])
+        transaction.on_commit(lambda: EvaluationService._enqueue_rescore(tender_id))
 
-                if score < Decimal('1.0'):
-                    score = Decimal('1.0')
-                if score > Decimal('10.0'):
-                    score = Decimal('10.0')
+    @staticmethod
+    def _enqueue_rescore(tender_id: int):
+        from api.tasks import rescore_tender
+
+        window = settings.SCORING_COALESCE_SECONDS
+        # Флаг в общем кеше: его видят все веб-воркеры и снимает задача в Celery перед пересчётом.
+        # TTL — страховка на случай потерянной задачи
+        if shared_cache.add(EvaluationService.rescore_flag_key(tender_id), True, window * 10):
+            rescore_tender.apply_async(args=[tender_id], countdown=window)
+
+    @staticmethod
+    def rescore_after_write(tender: Tender, proposal=None):
+        """
+        Пересчёт после записи заявок.
+        Новая заявка внутри границ оценивается сразу и только она; остальное —
+        полный пересчёт фоном через Celery или сразу, если SCORING_ASYNC выключен.
+        """
+        if proposal is not None:
+            EvaluationService.score_new_proposal(proposal)
+        else:
+            EvaluationService._defer_full_pass(tender)
+
+    @staticmethod
+    def _defer_full_pass(tender: Tender):
+        if settings.SCORING_ASYNC:
+            EvaluationService.schedule_rescore(tender.id)
+        else:
+            EvaluationService.recalculate_quantitative_scores(tender)
+
+    @staticmethod
+    @transaction.atomic
+    def score_new_proposal(proposal):
+        """
+        Инкрементальный пересчёт после подачи заявки.
+        Если значения не выходят за min/max, считаются оценки и итог только этой заявки,
+        а в рейтинг она вставляется без перестроения. Сдвиг границ (или TOPSIS,
+        где итог зависит от всех заявок) — полный пересчёт через _defer_full_pass.
+        """
+        tender = proposal.tender
+        if tender.method != 'AHP' or tender.inputs_version != tender.scored_version:
+            EvaluationService._defer_full_pass(tender)
+            return
+
+        quant_criteria = list(EvaluationRepository.get_quantitative_criteria_for_tender(tender))
+        bounds = EvaluationRepository.lock_bounds([tc.id for tc in quant_criteria])
+        own_evaluations = {
+            e.tender_criterion_id: e
+            for e in proposal.evaluations.filter(
+                tender_criterion__in=quant_criteria,
+                proposed_value__isnull=False
+            )
+        }
+
+        updated = []
+        for tc in quant_criteria:
+            evaluation = own_evaluations.get(tc.id)
+            if evaluation is None:
+                continue
+
+            value = evaluation.proposed_value
+            current = bounds.get(tc.id)
+            if current is None or value < current.min_value or value > current.max_value:
+                # Границы сдвигаются — меняются оценки всех заявок по критерию
+                EvaluationService._defer_full_pass(tender)
+                return
 
-                e.score = score
-                e.is_auto_calculated = True
-                e.evaluator = None
-                updated.append(e)
+            evaluation.score = EvaluationService.calculate_score(
+                value, current.min_value, current.max_value, tc.criterion.direction
+            )
+            evaluation.is_auto_calculated = True
+            evaluation.evaluator = None
+            updated.append(evaluation)
+
+        if updated:
+            EvaluationRepository.bulk_update_evaluations(updated, ['score', 'is_auto_calculated', 'evaluator'])
 
-            Evaluation.objects.bulk_update(updated, ['score', 'is_auto_calculated', 'evaluator'])
+        AhpService.calculate_proposal_score(tender, proposal)
+        LeaderboardService.add_proposal(proposal)
+        invalidate_tags(tender_tag(tender.id))
+
+    @staticmethod
+    def update_final_scores(tender: Tender):
+        """Итоговые оценки заявок по методу тендера"""
+        if tender.method == 'TOPSIS':
+            result = TopsisService.calculate_final_scores(tender)
+        elif tender.method == 'AHP':
+            result = AhpService.calculate_final_scores(tender)
+        else:
+            return None
+
+        LeaderboardService.refresh(tender)
+        # bulk_update не шлёт сигналов — кеш ответов по тендеру сбрасываем явно
+        invalidate_tags(tender_tag(tender.id))
+        return result
 
     @staticmethod
     @transaction.atomic
@@ -68,4 +213,6 @@ class EvaluationService:
         evaluation.score = score
         evaluation.evaluator = manager
         evaluation.is_auto_calculated = False
-        evaluation.save(update_fields=['score', 'evaluator', 'is_auto_calculated'])
\ No newline at end of file
+        evaluation.save(update_fields=['score', 'evaluator', 'is_auto_calculated'])
+
+        EvaluationService.update_final_scores(evaluation.tender_criterion.tender)
\ No newline at end of file
@@ -0,0 +1,168 @@
+import csv
+import tempfile
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+from tenders.models import Tender, TenderCriterion, Proposal, TenderExport
+from tenders.services.evaluation_service import EvaluationService
+
+
+class _Echo:
+    """Псевдобуфер для csv.writer: writerow возвращает готовую строку"""
+
+    def write(self, value):
+        return value
+
+
+class ExportService:
+    """Выгрузка заявок тендера с оценками по критериям: потоком или фоновым файлом"""
+
+    CHUNK_SIZE = 2000
+    CSV_DELIMITER = ';'
+    # С этих символов Excel начинает формулу
+    FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+    @staticmethod
+    def safe_cell(value):
+        """Текст, который Excel принял бы за формулу, выводится с апострофом"""
+        if isinstance(value, str) and value.startswith(ExportService.FORMULA_PREFIXES):
+            return f"'{value}"
+        return value
+
+    @staticmethod
+    def get_tender_for_export(user, tender_id: int) -> Tender:
+        try:
+            tender = Tender.objects.only(
+                'id', 'title', 'organization_id', 'inputs_version', 'scored_version'
+            ).get(id=tender_id)
+        except Tender.DoesNotExist:
+            raise ValueError("Тендер не найден")
+
+        organization = getattr(user, "organization", None)
+        is_owner = user.role == "Фирма" and organization is not None and organization.id == tender.organization_id
+        if not (is_owner or user.role == "Менеджер"):
+            raise PermissionError("Выгрузка доступна только владельцу тендера и менеджерам")
+        return tender
+
+    @staticmethod
+    def needs_background(tender: Tender, file_format: str) -> bool:
+        """
+        XLSX собирается только в файл; CSV крупных тендеров тоже уходит в Celery.
+        При устаревших оценках — тоже фоном: задача сначала пересчитывает их.
+        """
+        if file_format not in dict(TenderExport.FORMAT_CHOICES):
+            raise ValueError("Формат выгрузки: csv или xlsx")
+        if file_format == 'xlsx' or not ExportService.has_current_scores(tender):
+            return True
+        return Proposal.objects.filter(tender=tender).count() > settings.EXPORT_STREAM_MAX_PROPOSALS
+
+    @staticmethod
+    def has_current_scores(tender: Tender) -> bool:
+        return tender.inputs_version == tender.scored_version
+
+    @staticmethod
+    def iter_rows(tender: Tender):
+        """
+        Заголовок, затем по строке на заявку.
+        Один LEFT JOIN заявок с оценками читается серверным курсором порциями CHUNK_SIZE.
+        """
+        criteria = list(
+            TenderCriterion.objects.filter(tender=tender).select_related('criterion').order_by('id')
+        )
+        columns = {tc.id: index * 2 for index, tc in enumerate(criteria)}
+
+        header = ['Заявка', 'Поставщик', 'УНП', 'Статус', 'Подана', 'Итоговый балл']
+        for tc in criteria:
+            header += [f'{tc.criterion.name}: значение', f'{tc.criterion.name}: оценка']
+        yield [ExportService.safe_cell(title) for title in header]
+
+        rows = Proposal.objects.filter(tender=tender) \
+            .order_by('id', 'evaluations__tender_criterion_id') \
+            .values_list(
+                'id', 'supplier__name', 'supplier__registration_number', 'status', 'submitted_at', 'final_score',
+                'evaluations__tender_criterion_id', 'evaluations__proposed_value', 'evaluations__score',
+            ) \
+            .iterator(chunk_size=ExportService.CHUNK_SIZE)
+
+        current, values = None, None
+        for proposal_id, supplier, registration_number, status, submitted_at, final_score, tc_id, proposed, score in rows:
+            if current is None or current[0] != proposal_id:
+                if current is not None:
+                    yield current + values
+                current = [
+                    proposal_id, ExportService.safe_cell(supplier), ExportService.safe_cell(registration_number), status,
+                    timezone.localtime(submitted_at).strftime('%d.%m.%Y %H:%M'), final_score,
+                ]
+                values = [''] * (2 * len(criteria))
+            if tc_id in columns:
+                values[columns[tc_id]] = '' if proposed is None else proposed
+                values[columns[tc_id] + 1] = score
+        if current is not None:
+            yield current + values
+
+    @staticmethod
+    def stream_csv(tender: Tender):
+        """Генератор строк CSV для StreamingHttpResponse; BOM — чтобы Excel понял UTF-8"""
+        writer = csv.writer(_Echo(), delimiter=ExportService.CSV_DELIMITER)
+        yield '\ufeff'
+        for row in ExportService.iter_rows(tender):
+            yield writer.writerow(row)
+
+    @staticmethod
+    def write_csv(tender: Tender, fileobj) -> None:
+        writer = csv.writer(fileobj, delimiter=ExportService.CSV_DELIMITER)
+        for row in ExportService.iter_rows(tender):
+            writer.writerow(row)
+
+    @staticmethod
+    def write_xlsx(tender: Tender, fileobj) -> None:
+        # write_only: строки сбрасываются во временный XML, а не копятся в памяти
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet('Результаты')
+        for row in ExportService.iter_rows(tender):
+            sheet.append(row)
+        workbook.save(fileobj)
+
+    @staticmethod
+    def start_export(user, tender: Tender, file_format: str) -> TenderExport:
+        from api.tasks import export_tender_results
+
+        export = TenderExport.objects.create(tender=tender, requested_by=user, file_format=file_format)
+        transaction.on_commit(lambda: export_tender_results.delay(export.id))
+        return export
+
+    @staticmethod
+    def run_export(export_id: int) -> TenderExport:
+        """Тело Celery-задачи: пишет файл во временный каталог и сохраняет в хранилище"""
+        export = TenderExport.objects.select_related('tender').get(id=export_id)
+        try:
+            # Выгрузка не должна уйти с оценками до правки критериев
+            EvaluationService.ensure_scores_fresh(export.tender)
+            with tempfile.TemporaryFile() as tmp:
+                if export.file_format == 'xlsx':
+                    ExportService.write_xlsx(export.tender, tmp)
+                else:
+                    with open(tmp.fileno(), 'w', encoding='utf-8-sig', newline='', closefd=False) as text:
+                        ExportService.write_csv(export.tender, text)
+                tmp.seek(0)
+                export.file.save(f'tender_{export.tender_id}_{export.id}.{export.file_format}', File(tmp), save=False)
+            export.status = 'Готов'
+        except Exception as e:
+            export.status = 'Ошибка'
+            export.error = str(e)
+        export.finished_at = timezone.now()
+        export.save()
+        return export
+
+    @staticmethod
+    def get_export(user, export_id: int) -> TenderExport:
+        try:
+            export = TenderExport.objects.get(id=export_id)
+        except TenderExport.DoesNotExist:
+            raise ValueError("Выгрузка не найдена")
+        if export.requested_by_id != user.id and user.role != "Менеджер":
+            raise PermissionError("Нет доступа к выгрузке")
+        return export
@@ -0,0 +1,124 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header
+from tenders.models import Document
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class FileDeliveryService:
+    """
+    Отдача файлов из MEDIA после проверки прав.
+    Передачу байтов по возможности берёт на себя прокси (X-Accel-Redirect / X-Sendfile),
+    иначе — поток фиксированными буферами с поддержкой одного диапазона Range.
+    """
+
+    @staticmethod
+    def get_document_for_user(user, document_id: int) -> Document:
+        try:
+            document = Document.objects.select_related('proposal__tender').get(id=document_id)
+        except Document.DoesNotExist:
+            raise ValueError("Документ не найден")
+
+        if user.role == "Менеджер":
+            return document
+
+        organization = getattr(user, "organization", None)
+        if organization is not None:
+            if document.organization_id == organization.id:
+                return document
+            proposal = document.proposal
+            if proposal is not None and organization.id in (proposal.supplier_id, proposal.tender.organization_id):
+                return document
+        raise PermissionError("Нет доступа к документу")
+
+    @staticmethod
+    def download_name(document: Document) -> str:
+        extension = os.path.splitext(document.file.name)[1]
+        name = document.name or os.path.basename(document.file.name)
+        return name if name.lower().endswith(extension.lower()) else f"{name}{extension}"
+
+    @staticmethod
+    def parse_range(header: str, size: int):
+        """(start, end) включительно; None — отдать целиком; ValueError — диапазон вне файла"""
+        match = RANGE_RE.match(header or '')
+        if not match or match.groups() == ('', ''):
+            return None
+        start, end = match.groups()
+        if start == '':
+            # bytes=-N — последние N байт
+            length = int(end)
+            if length == 0:
+                raise ValueError("Пустой диапазон")
+            return max(size - length, 0), size - 1
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+        if start >= size or start > end:
+            raise ValueError("Диапазон вне файла")
+        return start, end
+
+    @staticmethod
+    def _iter_file(field_file, start: int, length: int):
+        buffer_size = settings.PROTECTED_MEDIA_BUFFER_SIZE
+        with field_file.open('rb') as f:
+            f.seek(start)
+            while length > 0:
+                chunk = f.read(min(buffer_size, length))
+                if not chunk:
+                    break
+                length -= len(chunk)
+                yield chunk
+
+    @staticmethod
+    def serve(request, field_file, filename: str, as_attachment: bool = True, etag: str = None):
+        content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        backend = settings.PROTECTED_MEDIA_BACKEND
+
+        if backend in ('nginx', 'apache'):
+            response = HttpResponse(content_type=content_type)
+            if backend == 'nginx':
+                response['X-Accel-Redirect'] = quote(f"{settings.PROTECTED_MEDIA_PREFIX}{field_file.name}")
+            else:
+                response['X-Sendfile'] = field_file.path
+        else:
+            response = FileDeliveryService._stream(request, field_file, content_type)
+
+        response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+        if etag:
+            response['ETag'] = f'"{etag}"'
+        return response
+
+    @staticmethod
+    def _stream(request, field_file, content_type):
+        size = field_file.size
+        try:
+            byte_range = FileDeliveryService.parse_range(request.META.get('HTTP_RANGE'), size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+        start, end = byte_range if byte_range else (0, size - 1)
+        length = end - start + 1 if size else 0
+        response = StreamingHttpResponse(
+            FileDeliveryService._iter_file(field_file, start, length),
+            status=206 if byte_range else 200,
+            content_type=content_type,
+        )
+        response['Content-Length'] = str(length)
+        response['Accept-Ranges'] = 'bytes'
+        if byte_range:
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        return response
+
+    @staticmethod
+    def serve_document(request, document: Document):
+        # Для blob-документов содержимое неизменно: sha256 — готовый ETag
+        return FileDeliveryService.serve(
+            request, document.file, FileDeliveryService.download_name(document),
+            as_attachment=request.GET.get('inline') != '1', etag=document.blob_id,
+        )
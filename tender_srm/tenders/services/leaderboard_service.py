@@ -0,0 +1,76 @@
+from django.db.models import QuerySet
+from tenders.models import Tender
+from tenders.repositories.leaderboard_repository import LeaderboardRepository
+
+
+class LeaderboardService:
+    """Таблица лидеров тендера: читается из ProposalRank, перестраивается после пересчёта оценок"""
+
+    @staticmethod
+    def refresh(tender: Tender) -> None:
+        LeaderboardRepository.rebuild(tender.id)
+
+    @staticmethod
+    def changes_membership(old_status: str, new_status: str) -> bool:
+        """Заявка отклонена или возвращена из отклонённых — меняется состав рейтинга"""
+        excluded = LeaderboardRepository.EXCLUDED_STATUS
+        return (old_status == excluded) != (new_status == excluded)
+
+    @staticmethod
+    def status_changed(proposal, old_status: str) -> None:
+        if LeaderboardService.changes_membership(old_status, proposal.status):
+            LeaderboardRepository.rebuild(proposal.tender_id)
+
+    @staticmethod
+    def status_changed_bulk(rows, new_status: str) -> None:
+        """rows — [(tender_id, old_status)]; все затронутые тендеры перестраиваются одним запросом"""
+        tender_ids = {
+            tender_id for tender_id, old_status in rows
+            if LeaderboardService.changes_membership(old_status, new_status)
+        }
+        if tender_ids:
+            LeaderboardRepository.rebuild_many(tender_ids)
+
+    @staticmethod
+    def add_proposal(proposal) -> None:
+        """Новая заявка с уже посчитанной итоговой оценкой — без перестроения рейтинга"""
+        LeaderboardRepository.insert(proposal)
+
+    @staticmethod
+    def _get_tender(tender_id: int) -> Tender:
+        try:
+            return Tender.objects.only('id', 'organization_id', 'inputs_version', 'scored_version').get(id=tender_id)
+        except Tender.DoesNotExist:
+            raise ValueError("Тендер не найден")
+
+    @staticmethod
+    def get_leaderboard(user, tender_id: int):
+        """(тендер, рейтинг заявок) — для владельца тендера и менеджера"""
+        tender = LeaderboardService._get_tender(tender_id)
+        organization = getattr(user, "organization", None)
+        is_owner = user.role == "Фирма" and organization is not None and organization.id == tender.organization_id
+        if not (is_owner or user.role == "Менеджер"):
+            raise PermissionError("Рейтинг заявок доступен владельцу тендера и менеджеру")
+        return tender, LeaderboardRepository.get_for_tender(tender.id)
+
+    @staticmethod
+    def get_position(user, tender_id: int) -> dict:
+        """Место заявки поставщика в тендере: {'tender', 'entry', 'participants'}"""
+        tender = LeaderboardService._get_tender(tender_id)
+        organization = getattr(user, "organization", None)
+        if user.role != "Поставщик" or organization is None:
+            raise PermissionError("Своё место в рейтинге видит только поставщик")
+
+        entry = LeaderboardRepository.get_for_supplier(tender.id, organization.id)
+        if entry is None:
+            raise ValueError("Ваша заявка ещё не участвует в рейтинге")
+        return {
+            'tender': tender,
+            'entry': entry,
+            'participants': LeaderboardRepository.count_for_tender(tender.id),
+        }
+
+    @staticmethod
+    def is_current(tender: Tender) -> bool:
+        """Рейтинг построен по актуальным оценкам"""
+        return tender.inputs_version == tender.scored_version
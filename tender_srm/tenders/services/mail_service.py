@@ -0,0 +1,168 @@
+import smtplib
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from tenders.models import Organization
+from tenders.cache_tags import invalidate_tags, organization_tag, shared_cache, ORGANIZATIONS_TAG
+
+
+class MailService:
+    """
+    Пакетная отправка уведомлений.
+    Очередь писем об одобрении — сами организации: подтверждена, но approval_email_sent=False.
+    Пачка захватывается короткой транзакцией, уходит через одно SMTP-соединение вне её,
+    затем отправленные и окончательно недоставленные помечаются.
+    """
+
+    FLUSH_FLAG_KEY = "approval_emails_flush_scheduled"
+
+    # Временные сбои: повторяем с задержкой. Прочие ошибки (5xx, неверный адрес) — нет
+    TRANSIENT_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError)
+
+    @staticmethod
+    def is_transient(error: Exception) -> bool:
+        if isinstance(error, MailService.TRANSIENT_ERRORS):
+            return True
+        return isinstance(error, smtplib.SMTPResponseException) and 400 <= error.smtp_code < 500
+
+    @staticmethod
+    def build_approval_message(organization: Organization) -> EmailMessage:
+        user = organization.user
+        body = f"""
+        Здравствуйте!
+
+        Ваша регистрация на платформе Tender SRM успешно одобрена менеджером!
+
+        Данные организации:
+        - Название: {organization.name}
+        - ID: {organization.id}
+        - Статус: Активна 
+
+        Теперь вы можете:
+        • Просматривать тендеры
+        • Отправлять предложения
+        • Управлять профилем
+
+        Логин: {user.username}
+        Перейдите в личный кабинет: http://127.0.0.1:8000/profile/
+
+        С уважением,
+        Команда Tender SRM
+        """
+        return EmailMessage(
+            subject=f"Регистрация {organization.name} одобрена!",
+            body=body,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[user.email],
+        )
+
+    @staticmethod
+    def pending_approvals():
+        return Organization.objects.filter(
+            verification_status='Подтверждено', approval_email_sent=False, approval_email_failed=False
+        )
+
+    @staticmethod
+    def schedule_approval_emails() -> None:
+        """После коммита ставит одну задачу на пачку; одобрения в пределах окна копятся в неё"""
+        transaction.on_commit(MailService._enqueue_flush)
+
+    @staticmethod
+    def _enqueue_flush() -> None:
+        from api.tasks import send_pending_approval_emails
+
+        delay = settings.MAIL_BATCH_DELAY_SECONDS
+        # Флаг в общем кеше: его снимает задача в Celery, а ставят веб-воркеры
+        if shared_cache.add(MailService.FLUSH_FLAG_KEY, True, delay * 10):
+            send_pending_approval_emails.apply_async(countdown=delay)
+
+    @staticmethod
+    def claim_batch(organization_ids=None) -> list:
+        """
+        До MAIL_BATCH_SIZE неотправленных писем: строки отмечаются захваченными и транзакция
+        сразу закрывается — параллельная задача их не возьмёт, а блокировки не держатся на время SMTP
+        """
+        now = timezone.now()
+        expired = now - timedelta(seconds=settings.MAIL_CLAIM_TIMEOUT_SECONDS)
+        with transaction.atomic():
+            pending = MailService.pending_approvals().filter(
+                Q(approval_email_claimed_at__isnull=True) | Q(approval_email_claimed_at__lt=expired)
+            )
+            if organization_ids is not None:
+                pending = pending.filter(id__in=organization_ids)
+            organizations = list(
+                pending.select_related('user')
+                .select_for_update(skip_locked=True, of=('self',))
+                .order_by('id')[:settings.MAIL_BATCH_SIZE]
+            )
+            if organizations:
+                Organization.objects.filter(id__in=[org.id for org in organizations]) \
+                    .update(approval_email_claimed_at=now)
+        return organizations
+
+    @staticmethod
+    def finish_batch(claimed_ids, sent_ids, failed_ids, retry_ids) -> None:
+        """
+        Снимает захват и помечает итог: отправленные — approval_email_sent,
+        постоянные отказы и исчерпавшие MAIL_MAX_ATTEMPTS — approval_email_failed (из очереди уходят)
+        """
+        with transaction.atomic():
+            Organization.objects.filter(id__in=claimed_ids).update(approval_email_claimed_at=None)
+            if sent_ids:
+                Organization.objects.filter(id__in=sent_ids).update(approval_email_sent=True)
+            if failed_ids:
+                Organization.objects.filter(id__in=failed_ids).update(
+                    approval_email_failed=True, approval_email_attempts=F('approval_email_attempts') + 1
+                )
+            if retry_ids:
+                Organization.objects.filter(id__in=retry_ids).update(
+                    approval_email_attempts=F('approval_email_attempts') + 1
+                )
+                Organization.objects.filter(
+                    id__in=retry_ids, approval_email_attempts__gte=settings.MAIL_MAX_ATTEMPTS
+                ).update(approval_email_failed=True)
+
+        if sent_ids:
+            invalidate_tags(ORGANIZATIONS_TAG, *[organization_tag(org_id) for org_id in sent_ids])
+
+    @staticmethod
+    def send_approval_batch(organization_ids=None) -> dict:
+        """
+        Отправляет до MAIL_BATCH_SIZE писем одним соединением вне транзакции.
+        Первая временная ошибка прерывает пачку и пробрасывается (задача повторит с задержкой);
+        постоянная ошибка по адресу помечает письмо недоставленным, пачка продолжается.
+        """
+        organizations = MailService.claim_batch(organization_ids)
+        sent_ids, failed_ids, retry_ids = [], [], []
+        if not organizations:
+            return {'sent': sent_ids, 'failed': failed_ids}
+
+        error = None
+        try:
+            connection = get_connection(fail_silently=False)
+            with connection:
+                for organization in organizations:
+                    message = MailService.build_approval_message(organization)
+                    message.connection = connection
+                    try:
+                        message.send()
+                        sent_ids.append(organization.id)
+                    except Exception as e:
+                        if MailService.is_transient(e):
+                            error = e
+                            retry_ids.append(organization.id)
+                            break
+                        failed_ids.append(organization.id)
+        except Exception as e:
+            # Не удалось открыть/закрыть соединение
+            error = error or e
+        finally:
+            # Отправленные помечаем в любом случае — повтор их не продублирует
+            MailService.finish_batch([org.id for org in organizations], sent_ids, failed_ids, retry_ids)
+
+        if error is not None:
+            raise error
+        return {'sent': sent_ids, 'failed': failed_ids}
@@ -1,5 +1,7 @@
 from tenders.repositories.organization_repository import OrganizationRepository
-from tenders.models import Manager
+from tenders.services.user_context_service import UserContextService
+from tenders.services.mail_service import MailService
+from tenders.cache_tags import invalidate_tags, organization_tag, user_tag, ORGANIZATIONS_TAG
 
 
 class OrganizationService:
@@ -7,6 +9,11 @@ class OrganizationService:
     def get_pending_organizations():
         return OrganizationRepository.get_pending_for_verification()
 
+    @staticmethod
+    def register_organization(**fields):
+        """Организация нового пользователя (регистрация на сайте и через API)"""
+        return OrganizationRepository.create(**fields)
+
     @staticmethod
     def verify_organization(manager_user, org_id: int, status: str):
 
@@ -17,13 +24,52 @@ class OrganizationService:
         if status not in allowed_statuses:
             raise ValueError(f"Статус должен быть одним из: {allowed_statuses}")
 
-        manager_profile, _ = Manager.objects.get_or_create(
-            user=manager_user,
-            defaults={'fio': manager_user.get_full_name() or manager_user.username}
-        )
+        manager_profile = UserContextService.get_manager_profile(manager_user)
 
-        return OrganizationRepository.update_verification_status(
+        organization = OrganizationRepository.update_verification_status(
             org_id=org_id,
             status=status,
             manager=manager_profile
-        )
\ No newline at end of file
+        )
+        if status == "Подтверждено" and not organization.approval_email_sent:
+            MailService.schedule_approval_emails()
+        return organization
+
+    @staticmethod
+    def bulk_verify_organizations(manager_user, org_ids: list, status: str) -> dict:
+        """
+        Проверка пачки организаций (после кампании регистрации): несколько UPDATE на всю пачку
+        и одна задача на письма. Возвращает {'updated': [...], 'not_found': [...]}.
+        """
+        if manager_user.role != "Менеджер":
+            raise PermissionError("Только менеджеры могут проверять организации")
+
+        allowed_statuses = ["Подтверждено", "Отклонено"]
+        if status not in allowed_statuses:
+            raise ValueError(f"Статус должен быть одним из: {allowed_statuses}")
+
+        manager_profile = UserContextService.get_manager_profile(manager_user)
+        return OrganizationService.apply_bulk_verification(org_ids, status, manager_profile)
+
+    @staticmethod
+    def apply_bulk_verification(org_ids: list, status: str, manager=None) -> dict:
+        """Без проверки роли — для действий админки"""
+        rows = OrganizationRepository.bulk_update_verification_status(org_ids, status, manager)
+
+        updated = [org_id for org_id, _ in rows]
+        if updated:
+            # update() сигналов не шлёт — теги кеша сдвигаем сами
+            invalidate_tags(
+                ORGANIZATIONS_TAG,
+                *(organization_tag(org_id) for org_id in updated),
+                *(user_tag(user_id) for _, user_id in rows),
+            )
+            if status == "Подтверждено":
+                # Письма не отправлявшимся — пачками одной задачей после коммита
+                MailService.schedule_approval_emails()
+
+        found = set(updated)
+        return {
+            'updated': updated,
+            'not_found': sorted({org_id for org_id in org_ids if org_id not in found}),
+        }
@@ -1,10 +1,15 @@
 from decimal import Decimal, InvalidOperation
 from django.db import transaction
 from django.core.exceptions import PermissionDenied, ValidationError
-from tenders.models import Tender, Document
+from tenders.models import Tender, Proposal, Evaluation
 from tenders.repositories.proposal_repository import ProposalRepository
 from tenders.repositories.evaluation_repository import EvaluationRepository
+from tenders.repositories.organization_repository import OrganizationRepository
 from tenders.services.evaluation_service import EvaluationService
+from tenders.services.leaderboard_service import LeaderboardService
+from tenders.services.counter_service import PlatformCounterService
+from tenders.services.user_context_service import UserContextService
+from tenders.cache_tags import invalidate_tags, tender_tag, organization_tag, TENDERS_TAG, PROPOSALS_TAG
 
 
 class ProposalService:
@@ -15,6 +20,8 @@ class ProposalService:
         """
         Подача заявки с значениями по критериям.
         ВАЖНО: пересчёт автооценок происходит ПОСЛЕ создания всех Evaluation!
+        Заявка внутри границ оценивается сразу, иначе пересчёт идёт фоном (rescore_tender),
+        см. EvaluationService.rescore_after_write.
         """
         if files is None:
             files = []
@@ -36,35 +43,175 @@ class ProposalService:
         if ProposalRepository.exists_for_tender_and_supplier(tender, supplier):
             raise ValidationError("Вы уже подали заявку на этот тендер ранее.")
 
+        # Все значения проверяются до первой записи в БД
+        evaluations_data = ProposalService.parse_criteria_values(tender, criteria_values)
+
         proposal = ProposalRepository.create_proposal(
             tender=tender,
             supplier=supplier,
             files=files
         )
+        EvaluationRepository.bulk_create_evaluations(
+            ProposalService.build_evaluations(proposal, evaluations_data)
+        )
+
+        EvaluationService.rescore_after_write(tender, proposal)
+
+        return proposal
+
+    @staticmethod
+    def parse_criteria_values(tender: Tender, criteria_values: dict) -> list:
+        """
+        Проверяет значения по всем критериям тендера разом.
+        Возвращает [(tender_criterion, proposed_value)], при ошибках — ValidationError со списком.
+        """
+        errors = []
+        parsed = []
 
         for tender_criterion in tender.criteria.all():
             criterion = tender_criterion.criterion
-            raw_value = criteria_values.get(str(criterion.id), "").strip()
+            raw_value = str(criteria_values.get(str(criterion.id), "") or "").strip()
 
             proposed_value = None
             if criterion.criterion_type == 'Количественный':
                 if not raw_value:
-                    raise ValidationError(f"Укажите значение для критерия: {criterion.name}")
+                    errors.append(f"Укажите значение для критерия: {criterion.name}")
+                    continue
                 try:
                     proposed_value = Decimal(raw_value)
-                    if proposed_value < 0:
-                        raise ValidationError(f"Значение не может быть отрицательным: {criterion.name}")
                 except (InvalidOperation, ValueError):
-                    raise ValidationError(f"Некорректное число в поле '{criterion.name}'")
+                    errors.append(f"Некорректное число в поле '{criterion.name}'")
+                    continue
+                if not proposed_value.is_finite():
+                    errors.append(f"Некорректное число в поле '{criterion.name}'")
+                    continue
+                if proposed_value < 0:
+                    errors.append(f"Значение не может быть отрицательным: {criterion.name}")
+                    continue
+
+            parsed.append((tender_criterion, proposed_value))
+
+        if errors:
+            raise ValidationError(errors)
+        return parsed
 
-            EvaluationRepository.create_evaluation(
+    @staticmethod
+    def build_evaluations(proposal, evaluations_data: list) -> list:
+        return [
+            Evaluation(
                 proposal=proposal,
                 tender_criterion=tender_criterion,
                 proposed_value=proposed_value,
                 score=Decimal('0.0'),
-                is_auto_calculated=(criterion.criterion_type == 'Количественный')
+                is_auto_calculated=(tender_criterion.criterion.criterion_type == 'Количественный')
             )
+            for tender_criterion, proposed_value in evaluations_data
+        ]
+
+    @staticmethod
+    @transaction.atomic
+    def import_proposals(user, tender_id: int, items: list) -> list:
+        """
+        Массовый импорт заявок в тендер (миграция архива, крупные поставщики).
+        items: [{'supplier': id, 'criteria': {criterion_id: value}, 'description': {...}}].
+        Всё проверяется заранее, затем заявки и оценки пишутся через bulk_create,
+        а автооценки пересчитываются один раз на весь тендер.
+        """
+        if user.role != 'Менеджер':
+            raise PermissionDenied("Импорт заявок доступен только менеджерам.")
 
-        EvaluationService.recalculate_quantitative_scores(tender)
+        try:
+            tender = Tender.objects.select_related('organization').prefetch_related(
+                'criteria__criterion'
+            ).get(id=tender_id)
+        except Tender.DoesNotExist:
+            raise ValidationError("Тендер не найден.")
+
+        supplier_ids = [item['supplier'] for item in items]
+        suppliers = OrganizationRepository.get_by_ids(supplier_ids)
+        existing = ProposalRepository.get_supplier_ids_for_tender(tender, supplier_ids)
+
+        errors = []
+        seen = set()
+        prepared = []
+        for index, item in enumerate(items):
+            supplier = suppliers.get(item['supplier'])
+            if supplier is None:
+                errors.append(f"#{index}: организация {item['supplier']} не найдена")
+                continue
+            if supplier.id == tender.organization_id:
+                errors.append(f"#{index}: нельзя подавать заявку на свой тендер")
+                continue
+            if supplier.id in existing or supplier.id in seen:
+                errors.append(f"#{index}: заявка от {supplier.name} уже есть")
+                continue
+            seen.add(supplier.id)
+
+            try:
+                evaluations_data = ProposalService.parse_criteria_values(tender, item.get('criteria', {}))
+            except ValidationError as e:
+                errors.extend(f"#{index}: {message}" for message in e.messages)
+                continue
+
+            proposal = Proposal(
+                tender=tender,
+                supplier=supplier,
+                description=item.get('description') or {},
+                status='Подана'
+            )
+            prepared.append((proposal, evaluations_data))
+
+        if errors:
+            raise ValidationError(errors)
+
+        proposals = ProposalRepository.bulk_create_proposals([proposal for proposal, _ in prepared])
+        evaluations = []
+        for proposal, evaluations_data in prepared:
+            evaluations.extend(ProposalService.build_evaluations(proposal, evaluations_data))
+        EvaluationRepository.bulk_create_evaluations(evaluations)
+        # bulk_create не шлёт post_save — число заявок в списке тендеров сбрасываем явно
+        invalidate_tags(TENDERS_TAG, PROPOSALS_TAG, tender_tag(tender.id))
+        PlatformCounterService.status_changed(Proposal, None, 'Подана', count=len(proposals))
+
+        EvaluationService.rescore_after_write(tender)
+
+        return proposals
+
+    @staticmethod
+    @transaction.atomic
+    def set_status(proposal, status: str):
+        """Решение менеджера по одной заявке; рейтинг тендера следует за статусом"""
+        old_status = proposal.status
+        ProposalRepository.update_status(proposal, status)
+        LeaderboardService.status_changed(proposal, old_status)
+        return proposal
+
+    @staticmethod
+    def bulk_verify_proposals(manager_user, proposal_ids: list, status: str) -> dict:
+        """Проверка пачки заявок двумя UPDATE; возвращает {'updated': [...], 'not_found': [...]}"""
+        if manager_user.role != 'Менеджер':
+            raise PermissionError("Только менеджеры могут проверять заявки")
+
+        allowed_statuses = ['Подтверждена', 'Отклонена']
+        if status not in allowed_statuses:
+            raise ValueError(f"Статус должен быть одним из: {allowed_statuses}")
+
+        manager_profile = UserContextService.get_manager_profile(manager_user)
+        rows = ProposalRepository.bulk_update_status(proposal_ids, status, manager_profile)
+
+        updated = [proposal_id for proposal_id, _, _, _ in rows]
+        if updated:
+            LeaderboardService.status_changed_bulk(
+                [(tender_id, old_status) for _, tender_id, _, old_status in rows], status
+            )
+            invalidate_tags(
+                TENDERS_TAG, PROPOSALS_TAG,
+                *(tender_tag(tender_id) for tender_id in {tender_id for _, tender_id, _, _ in rows}),
+                *(organization_tag(supplier_id) for supplier_id in {supplier_id for _, _, supplier_id, _ in rows}),
+            )
 
-        return proposal
\ No newline at end of file
+        found = set(updated)
+        return {
+            'updated': updated,
+            'not_found': sorted({proposal_id for proposal_id in proposal_ids if proposal_id not in found}),
+        }
@@ -0,0 +1,54 @@
+from decimal import Decimal, ROUND_HALF_UP
+import numpy as np
+from tenders.models import Tender
+from tenders.repositories.evaluation_repository import EvaluationRepository
+from tenders.repositories.proposal_repository import ProposalRepository
+
+
+class ScoreMatrixService:
+    """Матрица заявка×критерий для методов многокритериальной оценки"""
+
+    @staticmethod
+    def build(tender: Tender, raw_values: bool = False):
+        """
+        Матрица одним запросом к оценкам тендера.
+        raw_values=True: для количественных критериев берётся proposed_value (TOPSIS),
+        иначе везде нормализованная оценка score 1–10 (AHP).
+        Возвращает (proposal_ids, matrix, weights, is_benefit); пропуски — NaN.
+        """
+        criteria = EvaluationRepository.get_criteria_rows(tender)
+        proposal_ids = ProposalRepository.get_ids_for_tender(tender)
+
+        matrix = np.full((len(proposal_ids), len(criteria)), np.nan)
+        weights = np.array([float(weight) for _, weight, _, _ in criteria])
+        is_benefit = np.array([direction == 'Максимизирующий' for _, _, direction, _ in criteria], dtype=bool)
+        if not proposal_ids or not criteria:
+            return proposal_ids, matrix, weights, is_benefit
+
+        row_index = {pid: i for i, pid in enumerate(proposal_ids)}
+        col_index = {tc_id: j for j, (tc_id, _, _, _) in enumerate(criteria)}
+        use_raw = [raw_values and c_type == 'Количественный' for _, _, _, c_type in criteria]
+
+        for proposal_id, tc_id, proposed_value, score in EvaluationRepository.get_matrix_rows(tender):
+            i = row_index.get(proposal_id)
+            j = col_index.get(tc_id)
+            if i is None or j is None:
+                continue
+            value = proposed_value if use_raw[j] else score
+            if value is not None:
+                matrix[i, j] = float(value)
+
+        return proposal_ids, matrix, weights, is_benefit
+
+    @staticmethod
+    def criteria_ids(tender: Tender) -> list:
+        """Порядок столбцов матрицы"""
+        return [tc_id for tc_id, _, _, _ in EvaluationRepository.get_criteria_rows(tender)]
+
+    @staticmethod
+    def to_final_scores(proposal_ids: list, values: np.ndarray) -> dict:
+        """{proposal_id: Decimal} с точностью поля final_score"""
+        return {
+            pid: Decimal(repr(float(value))).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+            for pid, value in zip(proposal_ids, values)
+        }
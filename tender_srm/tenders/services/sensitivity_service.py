@@ -0,0 +1,156 @@
+import numpy as np
+from django.conf import settings
+from tenders.models import Tender
+from tenders.services.ahp_service import AhpService
+from tenders.services.topsis_service import TopsisService
+from tenders.services.evaluation_service import EvaluationService
+from tenders.services.score_matrix_service import ScoreMatrixService
+
+
+class SensitivityService:
+    """
+    Устойчивость победителя к сдвигам весов критериев (Монте-Карло).
+    Веса возмущаются мультипликативным логнормальным шумом и нормируются;
+    оценки всех выборок пакета считаются матричными произведениями без цикла по выборкам.
+    """
+
+    # Выборок в одном пакете и предел P×пакет для матрицы оценок в памяти
+    SAMPLE_BATCH = 2000
+    BATCH_CELLS = 4_000_000
+    # Меньше выборок вероятности уже не оценить
+    MIN_SAMPLES = 100
+
+    @staticmethod
+    def sample_weights(base_weights: np.ndarray, count: int, spread: float, rng) -> np.ndarray:
+        """count наборов весов (count×C): w·exp(spread·Z), нормированные к сумме 1"""
+        samples = base_weights * np.exp(spread * rng.standard_normal((count, base_weights.size)))
+        totals = samples.sum(axis=1, keepdims=True)
+        return np.divide(samples, totals, out=np.full(samples.shape, 1.0 / base_weights.size), where=totals > 0)
+
+    @staticmethod
+    def scores(method: str, matrix: np.ndarray, weight_samples: np.ndarray, is_benefit: np.ndarray) -> np.ndarray:
+        """Итоговые оценки P×K тем же методом, что и у тендера"""
+        if method == 'TOPSIS':
+            return TopsisService.closeness_batch(matrix, weight_samples, is_benefit)
+        return AhpService.weighted_sum(matrix, weight_samples)
+
+    @staticmethod
+    def effective_samples(samples: int, proposals: int) -> int:
+        """Число выборок в пределах SENSITIVITY_MAX_CELLS для тендера с proposals заявками"""
+        limit = settings.SENSITIVITY_MAX_CELLS // max(proposals, 1)
+        return min(samples, max(limit, SensitivityService.MIN_SAMPLES))
+
+    @staticmethod
+    def simulate(method: str, matrix: np.ndarray, base_weights: np.ndarray, is_benefit: np.ndarray,
+                 samples: int, spread: float, seed: int, top_ranks: int = None) -> dict:
+        """
+        Возвращает {'wins', 'rank_counts', 'rank_sum', 'best_ranks', 'worst_ranks', 'base_ranks'}:
+        сколько раз заявка победила, сколько раз заняла каждое из первых top_ranks мест
+        (P×T, 0 — первое место; без top_ranks — все места), сумма, лучшее и худшее место
+        """
+        n = matrix.shape[0]
+        top = n if top_ranks is None else min(top_ranks, n)
+        rng = np.random.default_rng(seed)
+        wins = np.zeros(n, dtype=np.int64)
+        rank_counts = np.zeros((n, top), dtype=np.int64)
+        rank_sum = np.zeros(n, dtype=np.int64)
+        best_ranks = np.full(n, n - 1, dtype=np.int64)
+        worst_ranks = np.zeros(n, dtype=np.int64)
+        offsets = (np.arange(n) * top)[:, None]
+        batch = max(1, min(SensitivityService.SAMPLE_BATCH, SensitivityService.BATCH_CELLS // max(n, 1)))
+
+        for start in range(0, samples, batch):
+            count = min(batch, samples - start)
+            weight_samples = SensitivityService.sample_weights(base_weights, count, spread, rng)
+            batch_scores = SensitivityService.scores(method, matrix, weight_samples, is_benefit)
+
+            # Одна сортировка на пакет: order[r, k] — заявка на месте r в выборке k
+            order = np.argsort(-batch_scores, axis=0, kind='stable')
+            ranks = np.empty_like(order)
+            np.put_along_axis(ranks, order, np.arange(n)[:, None], axis=0)
+
+            wins += np.bincount(order[0], minlength=n)
+            rank_sum += ranks.sum(axis=1)
+            np.minimum(best_ranks, ranks.min(axis=1), out=best_ranks)
+            np.maximum(worst_ranks, ranks.max(axis=1), out=worst_ranks)
+            in_top = ranks < top
+            rank_counts += np.bincount(
+                np.broadcast_to(offsets, ranks.shape)[in_top] + ranks[in_top], minlength=n * top
+            ).reshape(n, top)
+
+        base_scores = SensitivityService.scores(method, matrix, base_weights[None, :], is_benefit)[:, 0]
+        base_ranks = np.empty(n, dtype=np.int64)
+        base_ranks[np.argsort(-base_scores, kind='stable')] = np.arange(n)
+        return {
+            'wins': wins, 'rank_counts': rank_counts, 'rank_sum': rank_sum,
+            'best_ranks': best_ranks, 'worst_ranks': worst_ranks, 'base_ranks': base_ranks,
+        }
+
+    @staticmethod
+    def _base_weights(tender: Tender, raw_weights: np.ndarray) -> np.ndarray:
+        if tender.method == 'AHP':
+            return np.asarray(AhpService.get_weights(tender)['weights'], dtype=float)
+        total = raw_weights.sum()
+        if total > 0:
+            return raw_weights / total
+        return np.full(raw_weights.shape, 1.0 / raw_weights.size)
+
+    @staticmethod
+    def analyze(user, tender_id: int, samples: int, spread: float, seed: int) -> dict:
+        try:
+            tender = Tender.objects.select_related('organization').get(id=tender_id)
+        except Tender.DoesNotExist:
+            raise ValueError("Тендер не найден")
+
+        is_owner = user.role == "Фирма" and getattr(user, "organization", None) == tender.organization
+        if not (is_owner or user.role == "Менеджер"):
+            raise PermissionError("Анализ чувствительности доступен владельцу тендера и менеджеру")
+
+        # Пересчёт на чтении не выполняется: анализ по устаревшим оценкам помечается is_current=False
+        is_current = EvaluationService.scores_current(tender)
+        proposal_ids, matrix, raw_weights, is_benefit = ScoreMatrixService.build(
+            tender, raw_values=tender.method == 'TOPSIS'
+        )
+        if not proposal_ids or not raw_weights.size:
+            raise ValueError("Нет заявок или критериев для анализа")
+
+        base_weights = SensitivityService._base_weights(tender, raw_weights)
+        requested_samples = samples
+        samples = SensitivityService.effective_samples(samples, len(proposal_ids))
+        result = SensitivityService.simulate(
+            tender.method, matrix, base_weights, is_benefit, samples, spread, seed,
+            top_ranks=settings.SENSITIVITY_TOP_RANKS,
+        )
+
+        proposals = []
+        for i, proposal_id in enumerate(proposal_ids):
+            counts = result['rank_counts'][i]
+            proposals.append({
+                'proposal_id': proposal_id,
+                'base_rank': int(result['base_ranks'][i]) + 1,
+                'win_probability': round(float(result['wins'][i]) / samples, 4),
+                'expected_rank': round(float(result['rank_sum'][i]) / samples + 1, 2),
+                'best_rank': int(result['best_ranks'][i]) + 1,
+                'worst_rank': int(result['worst_ranks'][i]) + 1,
+                # Только первые SENSITIVITY_TOP_RANKS мест: ответ растёт линейно по числу заявок
+                'rank_distribution': {
+                    str(rank + 1): round(float(counts[rank]) / samples, 4) for rank in np.nonzero(counts)[0]
+                },
+            })
+        proposals.sort(key=lambda item: item['base_rank'])
+
+        return {
+            'tender_id': tender.id,
+            'method': tender.method,
+            'samples': samples,
+            'requested_samples': requested_samples,
+            'top_ranks': min(settings.SENSITIVITY_TOP_RANKS, len(proposal_ids)),
+            'spread': spread,
+            'seed': seed,
+            'is_current': is_current,
+            'criteria': ScoreMatrixService.criteria_ids(tender),
+            'base_weights': [round(float(w), 4) for w in base_weights],
+            'base_winner': proposals[0]['proposal_id'],
+            'winner_stability': proposals[0]['win_probability'],
+            'proposals': proposals,
+        }
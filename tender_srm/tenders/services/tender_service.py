@@ -1,16 +1,22 @@
-from django.core.cache import cache
-from django.conf import settings
+from tenders.models import Tender
 from tenders.repositories.tender_repository import TenderRepository
+from tenders.services.counter_service import PlatformCounterService
+from tenders.cache_tags import get_tag_versions, invalidate_tags, CRITERIA_TAG
 
 class TenderService:
+    # Каталог критериев в памяти процесса: (версия, список). Версия — тег CRITERIA_TAG в общем кеше
+    _criteria_catalog = (None, [])
+
     @staticmethod
     def create_tender(user, validated_data):
         if user.role != "Фирма" or not hasattr(user, "organization"):
             raise PermissionError("Только подтверждённые фирмы могут создавать тендеры")
         if user.organization.verification_status != "Подтверждено":
             raise PermissionError("Организация не подтверждена")
-        
-        return TenderRepository.create(user.organization, validated_data)
+
+        tender = TenderRepository.create(user.organization, validated_data)
+        PlatformCounterService.status_changed(Tender, None, tender.status)
+        return tender
 
     @staticmethod
     def get_list_for_user(user):
@@ -22,20 +28,31 @@ class TenderService:
     def get_detail(tender_id):
         return TenderRepository.get_tender_by_id(tender_id)
 
+    @staticmethod
+    def _criteria_version():
+        return get_tag_versions([CRITERIA_TAG])[CRITERIA_TAG]
+
     @staticmethod
     def get_criteria_list():
-        
-        cache_key = "criteria_list"
-        criteria = cache.get(cache_key)
-        
-        if criteria is None:
+        """
+        Каталог критериев: список объектов в памяти процесса + номер версии в общем кеше.
+        Тёплое чтение — только сверка версии, без запроса к Criterion и без распаковки pickle.
+        """
+        version = TenderService._criteria_version()
+        cached_version, criteria = TenderService._criteria_catalog
+
+        if cached_version != version:
             from tenders.models import Criterion
-            criteria = list(Criterion.objects.all())
-            cache.set(cache_key, criteria, settings.CACHE_TTL * 4)
-        
-        return criteria
+            criteria = list(Criterion.objects.order_by("name"))
+            TenderService._criteria_catalog = (version, criteria)
+
+        return list(criteria)
     
     @staticmethod
     def clear_criteria_cache():
-        """Очистка кеша критериев"""
-        cache.delete("criteria_list")
\ No newline at end of file
+        """
+        Очистка кеша критериев во всех воркерах: сдвиг общей версии.
+        Внутри транзакции версия сдвигается ещё раз после коммита (invalidate_tags) —
+        иначе другой воркер мог бы перечитать старый каталог под новой версией
+        """
+        invalidate_tags(CRITERIA_TAG)
@@ -0,0 +1,97 @@
+import numpy as np
+from tenders.models import Tender
+from tenders.repositories.proposal_repository import ProposalRepository
+from tenders.services.score_matrix_service import ScoreMatrixService
+
+
+class TopsisService:
+    """TOPSIS: ранжирование заявок по близости к идеальному решению"""
+
+    # Коэффициент близости 0–1 переводим в шкалу оценок 0–10
+    SCORE_SCALE = 10
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray, is_benefit: np.ndarray):
+        """
+        Пустые столбцы не участвуют, пропуски — худшее значение по критерию, векторная нормализация.
+        Возвращает (нормированная матрица, маска оставшихся столбцов)
+        """
+        present = ~np.all(np.isnan(matrix), axis=0)
+        matrix = matrix[:, present]
+        is_benefit = is_benefit[present]
+        if matrix.shape[1] == 0:
+            return matrix, present
+
+        worst = np.where(is_benefit, np.nanmin(matrix, axis=0), np.nanmax(matrix, axis=0))
+        matrix = np.where(np.isnan(matrix), worst, matrix)
+
+        norms = np.sqrt((matrix ** 2).sum(axis=0))
+        norms[norms == 0] = 1.0
+        return matrix / norms, present
+
+    @staticmethod
+    def closeness(matrix: np.ndarray, weights: np.ndarray, is_benefit: np.ndarray) -> np.ndarray:
+        """Коэффициенты близости за один векторизованный проход"""
+        if matrix.size == 0:
+            return np.zeros(matrix.shape[0])
+
+        normalized, present = TopsisService._normalize(matrix, is_benefit)
+        weights = weights[present]
+        is_benefit = is_benefit[present]
+        if normalized.shape[1] == 0:
+            return np.zeros(matrix.shape[0])
+
+        total = weights.sum()
+        weights = weights / total if total > 0 else np.full(weights.shape, 1.0 / weights.size)
+        weighted = normalized * weights
+
+        ideal = np.where(is_benefit, weighted.max(axis=0), weighted.min(axis=0))
+        anti_ideal = np.where(is_benefit, weighted.min(axis=0), weighted.max(axis=0))
+
+        d_plus = np.sqrt(((weighted - ideal) ** 2).sum(axis=1))
+        d_minus = np.sqrt(((weighted - anti_ideal) ** 2).sum(axis=1))
+        denominator = d_plus + d_minus
+
+        # Все заявки совпадают — каждая одновременно идеальная
+        return np.divide(d_minus, denominator, out=np.ones_like(d_minus), where=denominator > 0)
+
+    @staticmethod
+    def closeness_batch(matrix: np.ndarray, weight_samples: np.ndarray, is_benefit: np.ndarray) -> np.ndarray:
+        """
+        Коэффициенты близости сразу для K наборов весов (K×C) — матрица P×K.
+        При w ≥ 0 идеал взвешенного столбца равен w·идеал нормированного, поэтому
+        d² = (N − идеал)² @ (w²)ᵀ: два матричных произведения на весь пакет.
+        """
+        closeness = np.ones((matrix.shape[0], weight_samples.shape[0]))
+        if matrix.size == 0:
+            return np.zeros_like(closeness)
+
+        normalized, present = TopsisService._normalize(matrix, is_benefit)
+        is_benefit = is_benefit[present]
+        if normalized.shape[1] == 0:
+            return np.zeros_like(closeness)
+
+        weights = weight_samples[:, present]
+        totals = weights.sum(axis=1, keepdims=True)
+        weights = np.divide(weights, totals, out=np.full(weights.shape, 1.0 / weights.shape[1]), where=totals > 0)
+        squared = (weights ** 2).T
+
+        best = np.where(is_benefit, normalized.max(axis=0), normalized.min(axis=0))
+        worst = np.where(is_benefit, normalized.min(axis=0), normalized.max(axis=0))
+        d_plus = np.sqrt(((normalized - best) ** 2) @ squared)
+        d_minus = np.sqrt(((normalized - worst) ** 2) @ squared)
+        denominator = d_plus + d_minus
+
+        return np.divide(d_minus, denominator, out=closeness, where=denominator > 0)
+
+    @staticmethod
+    def calculate_final_scores(tender: Tender) -> dict:
+        """Пересчитывает final_score всех заявок тендера одним bulk_update"""
+        proposal_ids, matrix, weights, is_benefit = ScoreMatrixService.build(tender, raw_values=True)
+        if not proposal_ids:
+            return {}
+
+        scores = TopsisService.closeness(matrix, weights, is_benefit) * TopsisService.SCORE_SCALE
+        final_scores = ScoreMatrixService.to_final_scores(proposal_ids, scores)
+        ProposalRepository.bulk_update_final_scores(final_scores)
+        return final_scores
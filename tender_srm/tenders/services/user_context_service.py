@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from tenders.models import Manager
+from tenders.cache_tags import aget_tag_versions, get_tag_versions, invalidate_tags, user_tag, shared_cache
+
+
+class UserContextService:
+    """
+    Пользователь вместе с organization и manager_profile — одним JOIN.
+    Кешируется на USER_CONTEXT_TTL по (id, версия тега пользователя); сигналы User/Organization/Manager
+    сдвигают версию. В пределах запроса объект запоминают Django (request._cached_user) и DRF (request.user).
+    """
+
+    @staticmethod
+    def queryset():
+        return get_user_model()._default_manager.select_related('organization', 'manager_profile')
+
+    @staticmethod
+    def _cache_key(user_id, version) -> str:
+        return f"user_context_{user_id}_{version}"
+
+    @staticmethod
+    def get_user(user_id):
+        tag = user_tag(user_id)
+        cache_key = UserContextService._cache_key(user_id, get_tag_versions([tag])[tag])
+
+        user = shared_cache.get(cache_key)
+        if user is None:
+            user = UserContextService.queryset().filter(pk=user_id).first()
+            if user is None:
+                return None
+            shared_cache.set(cache_key, user, settings.USER_CONTEXT_TTL)
+        return user
+
+    @staticmethod
+    async def aget_user(user_id):
+        """get_user для async-представлений"""
+        tag = user_tag(user_id)
+        versions = await aget_tag_versions([tag])
+        cache_key = UserContextService._cache_key(user_id, versions[tag])
+
+        user = await shared_cache.aget(cache_key)
+        if user is None:
+            user = await UserContextService.queryset().filter(pk=user_id).afirst()
+            if user is None:
+                return None
+            await shared_cache.aset(cache_key, user, settings.USER_CONTEXT_TTL)
+        return user
+
+    @staticmethod
+    def invalidate(user_id) -> None:
+        invalidate_tags(user_tag(user_id))
+
+    @staticmethod
+    def get_manager_profile(user) -> Manager:
+        """Профиль менеджера из загруженного контекста; создаётся только при первом обращении"""
+        try:
+            return user.manager_profile
+        except Manager.DoesNotExist:
+            manager, _ = Manager.objects.get_or_create(
+                user=user,
+                defaults={'fio': user.get_full_name() or user.username}
+            )
+            user.manager_profile = manager
+            return manager
@@ -0,0 +1,84 @@
+from django.db.models.signals import post_save, post_delete
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from tenders.models import User, Manager, Tender, TenderCriterion, Criterion, Proposal, Organization, Document
+from tenders.services.tender_service import TenderService
+from tenders.services.document_storage_service import DocumentStorageService
+from tenders.profiling import instrument_connection
+from tenders.cache_tags import (
+    invalidate_tags, tender_tag, organization_tag, user_tag,
+    TENDERS_TAG, ORGANIZATIONS_TAG, PROPOSALS_TAG,
+)
+
+# Инвалидация кеша ответов API при изменении моделей.
+# bulk_create/bulk_update/update() сигналов не шлют — такие места инвалидируют теги сами.
+
+
+@receiver([post_save, post_delete], sender=Tender)
+def tender_changed(sender, instance, **kwargs):
+    invalidate_tags(TENDERS_TAG, tender_tag(instance.id), organization_tag(instance.organization_id))
+
+
+@receiver([post_save, post_delete], sender=TenderCriterion)
+def tender_criterion_changed(sender, instance, **kwargs):
+    invalidate_tags(tender_tag(instance.tender_id))
+
+
+@receiver([post_save, post_delete], sender=Criterion)
+def criterion_changed(sender, instance, **kwargs):
+    # Та же версия CRITERIA_TAG сбрасывает и ответы API, и каталог в памяти воркеров
+    TenderService.clear_criteria_cache()
+
+
+@receiver([post_save, post_delete], sender=Proposal)
+def proposal_changed(sender, instance, **kwargs):
+    invalidate_tags(
+        TENDERS_TAG, PROPOSALS_TAG,
+        tender_tag(instance.tender_id), organization_tag(instance.supplier_id)
+    )
+
+
+@receiver([post_save, post_delete], sender=Organization)
+def organization_changed(sender, instance, **kwargs):
+    # user_tag — контекст пользователя (UserContextService) хранит организацию внутри;
+    # списки и карточки тендеров показывают название организатора
+    tender_ids = Tender.objects.filter(organization_id=instance.id).values_list('id', flat=True)
+    invalidate_tags(
+        TENDERS_TAG, ORGANIZATIONS_TAG, organization_tag(instance.id), user_tag(instance.user_id),
+        *[tender_tag(tender_id) for tender_id in tender_ids]
+    )
+
+
+@receiver([post_save, post_delete], sender=User)
+def user_changed(sender, instance, update_fields=None, **kwargs):
+    tags = [user_tag(instance.id)]
+    # Карточка организации содержит пользователя; last_login в неё не входит
+    if update_fields is None or set(update_fields) != {'last_login'}:
+        org_ids = Organization.objects.filter(user_id=instance.id).values_list('id', flat=True)
+        tags += [organization_tag(org_id) for org_id in org_ids]
+    invalidate_tags(*tags)
+
+
+@receiver([post_save, post_delete], sender=Manager)
+def manager_changed(sender, instance, **kwargs):
+    invalidate_tags(user_tag(instance.user_id))
+
+
+@receiver([post_save, post_delete], sender=Document)
+def document_changed(sender, instance, **kwargs):
+    # Документы верификации входят в карточку организации
+    if instance.organization_id:
+        invalidate_tags(organization_tag(instance.organization_id))
+
+
+@receiver(post_delete, sender=Document)
+def release_document_blob(sender, instance, **kwargs):
+    # Каскадное удаление заявки/организации тоже снимает ссылки на blob
+    if instance.blob_id:
+        DocumentStorageService.release(instance.blob_id)
+
+
+@receiver(connection_created)
+def connection_opened(sender, connection, **kwargs):
+    # Счётчик SQL-запросов RequestProfilingMiddleware
+    instrument_connection(connection)
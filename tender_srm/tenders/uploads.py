@@ -0,0 +1,29 @@
+import hashlib
+from django.core.files.uploadhandler import MemoryFileUploadHandler, TemporaryFileUploadHandler
+
+# Загрузчики считают SHA-256 по мере прихода чанков: хеш готов к моменту,
+# когда DocumentStorageService решает, писать ли файл на диск.
+
+
+class HashingMixin:
+    def new_file(self, *args, **kwargs):
+        self.sha256 = hashlib.sha256()
+        return super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        self.sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        uploaded_file = super().file_complete(file_size)
+        if uploaded_file is not None:
+            uploaded_file.sha256 = self.sha256.hexdigest()
+        return uploaded_file
+
+
+class HashingMemoryFileUploadHandler(HashingMixin, MemoryFileUploadHandler):
+    pass
+
+
+class HashingTemporaryFileUploadHandler(HashingMixin, TemporaryFileUploadHandler):
+    pass
@@ -23,4 +23,7 @@ urlpatterns = [
     path('tenders/<int:tender_id>/', views.tender_detail, name='tender_detail'),
     path('tenders/create/', views.create_tender, name='create_tender'),
     path('tenders/<int:tender_id>/proposal/', views.create_proposal, name='create_proposal'),
+
+    # Документы
+    path('documents/<int:document_id>/download/', views.document_download, name='document_download'),
 ]
\ No newline at end of file
@@ -4,10 +4,13 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.utils import timezone
 from django.db import transaction
+from django.core.exceptions import ValidationError, PermissionDenied
+from django.http import Http404
 from django import forms
 from django.forms import formset_factory
 
-from django.core.paginator import Paginator
+from tenders.pagination import KeysetPaginator
+from tenders.search import search_tenders
 from .forms import CustomUserCreationForm
 from .models import User, Organization, Tender, Proposal, Document, Manager, Criterion
 
@@ -18,6 +21,10 @@ from tenders.services.organization_service import OrganizationService
 from tenders.services.criterion_service import CriterionService
 from django.db.models import Count, Q
 from tenders.services.evaluation_service import EvaluationService
+from tenders.services.counter_service import PlatformCounterService
+from tenders.services.document_storage_service import DocumentStorageService
+from tenders.services.file_delivery_service import FileDeliveryService
+from tenders.services.user_context_service import UserContextService
 
 
 class TenderForm(forms.Form):
@@ -75,10 +82,11 @@ def home(request):
     if request.user.is_authenticated:
         return redirect('dashboard')
 
+    counters = PlatformCounterService.get_counters()
     stats = {
-        'tenders_count': Tender.objects.filter(status='Открыт').count(),
-        'organizations_count': Organization.objects.filter(verification_status='Подтверждено').count(),
-        'proposals_count': Proposal.objects.count(),
+        'tenders_count': counters['open_tenders'],
+        'organizations_count': counters['verified_organizations'],
+        'proposals_count': counters['proposals_total'],
     }
     return render(request, 'home.html', {'stats': stats})
 
@@ -90,38 +98,40 @@ def register(request):
     if request.method == 'POST':
         form = CustomUserCreationForm(request.POST, request.FILES)
         if form.is_valid():
-            user = form.save(commit=False)
-            user.email = form.cleaned_data['email']
-            user.is_active = False  
-            user.save()
-
-            if user.role in ['Фирма', 'Поставщик']:
-                organization = Organization.objects.create(
-                    user=user,
-                    name=form.cleaned_data['name'],
-                    fio=form.cleaned_data['fio'],
-                    registration_number=form.cleaned_data['registration_number'],
-                    org_type=form.cleaned_data['org_type'],
-                    address=form.cleaned_data.get('address', ''),
-                    phone=form.cleaned_data.get('phone', ''),
-                    verification_status='На проверке'
-                )
-
-                docs = [
-                    ('charter', 'Устав'),
-                    ('inn', 'ИНН'),
-                    ('ogrn', 'ОГРН')
-                ]
-                for field, name in docs:
-                    file = request.FILES.get(field)
-                    if file:
-                        Document.objects.create(
-                            organization=organization,
-                            document_type='verification',
-                            name=name,
-                            file=file,
-                            verification_status='На проверке'
-                        )
+            # Пользователь, организация и ссылки на blob документов — одной транзакцией
+            with transaction.atomic():
+                user = form.save(commit=False)
+                user.email = form.cleaned_data['email']
+                user.is_active = False  
+                user.save()
+
+                if user.role in ['Фирма', 'Поставщик']:
+                    organization = OrganizationService.register_organization(
+                        user=user,
+                        name=form.cleaned_data['name'],
+                        fio=form.cleaned_data['fio'],
+                        registration_number=form.cleaned_data['registration_number'],
+                        org_type=form.cleaned_data['org_type'],
+                        address=form.cleaned_data.get('address', ''),
+                        phone=form.cleaned_data.get('phone', ''),
+                        verification_status='На проверке'
+                    )
+
+                    docs = [
+                        ('charter', 'Устав'),
+                        ('inn', 'ИНН'),
+                        ('ogrn', 'ОГРН')
+                    ]
+                    for field, name in docs:
+                        file = request.FILES.get(field)
+                        if file:
+                            DocumentStorageService.build_document(
+                                file,
+                                organization=organization,
+                                document_type='verification',
+                                name=name,
+                                verification_status='На проверке'
+                            ).save()
 
             messages.success(request, 'Регистрация успешна! Ожидайте проверки документов.')
             return redirect('login')
@@ -169,11 +179,12 @@ def dashboard(request):
 
     # ========== МЕНЕДЖЕР ==========
     if user.role == 'Менеджер':
+        counters = PlatformCounterService.get_counters()
         context.update({
-            'pending_organizations_count': Organization.objects.filter(verification_status='На проверке').count(),
-            'pending_proposals_count': Proposal.objects.filter(status__in=['Подана', 'Проверяется']).count(),
-            'active_tenders_count': Tender.objects.filter(status='Открыт').count(),
-            'criteria_count': Criterion.objects.count(),  # ← ЭТО ОБЯЗАТЕЛЬНО!
+            'pending_organizations_count': counters['pending_organizations'],
+            'pending_proposals_count': counters['pending_proposals'],
+            'active_tenders_count': counters['open_tenders'],
+            'criteria_count': counters['criteria'],
         })
 
     # ========== ФИРМА ==========
@@ -283,15 +294,14 @@ def manager_proposal_evaluate(request, proposal_id):
         status='Подана'
     )
 
-    # Обновляем автооценки при открытии страницы
-    EvaluationService.recalculate_quantitative_scores(proposal.tender)
+    # Автооценки пересчитывает фоновая задача; здесь только отметка об их актуальности
+    scores_current = EvaluationService.scores_current(proposal.tender)
 
     if request.method == 'POST':
         action = request.POST.get('action')
 
         if action == 'reject':
-            proposal.status = 'Отклонена'
-            proposal.save()
+            ProposalService.set_status(proposal, 'Отклонена')
             messages.success(request, f'Заявка #{proposal.id} отклонена')
             return redirect('manager_requests')
 
@@ -305,8 +315,7 @@ def manager_proposal_evaluate(request, proposal_id):
             if unevaluated:
                 messages.error(request, 'Оцените все качественные критерии перед подтверждением!')
             else:
-                proposal.status = 'Подтверждена'
-                proposal.save()
+                ProposalService.set_status(proposal, 'Подтверждена')
                 messages.success(request, f'Заявка #{proposal.id} успешно подтверждена!')
                 return redirect('manager_requests')
 
@@ -332,7 +341,7 @@ def manager_proposal_evaluate(request, proposal_id):
             tender_criterion__criterion__criterion_type='Качественный'
         )
 
-        manager = Manager.objects.get_or_create(user=request.user)[0]
+        manager = UserContextService.get_manager_profile(request.user)
         EvaluationService.set_manual_score(evaluation, score, manager)
 
         return JsonResponse({'success': True, 'score': float(score)})
@@ -340,35 +349,53 @@ def manager_proposal_evaluate(request, proposal_id):
     return render(request, 'manager/proposal_evaluate.html', {
         'proposal': proposal,
         'tender': proposal.tender,
+        'scores_current': scores_current,
     })
     
 # ===================== ТЕНДЕРЫ =====================
 
+# Допустимые сортировки списка тендеров; id в конце делает ключ уникальным для keyset-пагинации
+TENDER_LIST_ORDERINGS = {
+    '-created_at': ('-created_at', '-id'),
+    'created_at': ('created_at', 'id'),
+    'budget': ('budget', 'id'),
+    '-budget': ('-budget', '-id'),
+    'end_date': ('end_date', 'id'),
+    # Только вместе с поиском
+    'rank': ('-rank', '-id'),
+}
+
 @login_required
 def tender_list(request):
     tenders = Tender.objects.filter(status='Открыт').select_related('organization')
 
     # Фильтры
-    search = request.GET.get('search')
+    search = request.GET.get('search', '').strip()
     method = request.GET.get('method')
-    ordering = request.GET.get('ordering', '-created_at')
+    # С поисковым запросом по умолчанию сортируем по релевантности
+    ordering = request.GET.get('ordering') or ('rank' if search else '-created_at')
+    if ordering not in TENDER_LIST_ORDERINGS or (ordering == 'rank' and not search):
+        ordering = '-created_at'
 
     if search:
-        tenders = tenders.filter(title__icontains=search)
+        tenders = search_tenders(tenders, search)
     if method:
         tenders = tenders.filter(method=method)
 
-    tenders = tenders.order_by(ordering)
-
-    # Пагинация
-
-    paginator = Paginator(tenders, 9)  # 9 тендеров на страницу
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Keyset-пагинация: 9 тендеров на страницу, без OFFSET
+    paginator = KeysetPaginator(tenders, TENDER_LIST_ORDERINGS[ordering], 9)
+    cursor = request.GET.get('cursor')
+    try:
+        page, next_cursor = paginator.get_page(cursor)
+    except ValueError:
+        cursor = None
+        page, next_cursor = paginator.get_page()
 
     context = {
-        'page_obj': page_obj,
-        'paginator': paginator,
+        'page_obj': page,
+        'next_cursor': next_cursor,
+        'is_first_page': not cursor,
+        'ordering': ordering,
     }
 
     if request.user.role == 'Фирма' and hasattr(request.user, 'organization'):
@@ -598,7 +625,22 @@ def create_proposal(request, tender_id):
             )
             messages.success(request, 'Заявка успешно подана!')
             return redirect('tender_detail', tender_id)
+        except ValidationError as e:
+            for message in e.messages:
+                messages.error(request, message)
         except Exception as e:
             messages.error(request, str(e))
 
-    return render(request, 'tenders/create_proposal.html', {'tender': tender})
\ No newline at end of file
+    return render(request, 'tenders/create_proposal.html', {'tender': tender})
+
+
+@login_required
+def document_download(request, document_id):
+    """Документ после проверки прав; байты отдаёт прокси или поток с поддержкой Range"""
+    try:
+        document = FileDeliveryService.get_document_for_user(request.user, document_id)
+    except ValueError:
+        raise Http404("Документ не найден")
+    except PermissionError as e:
+        raise PermissionDenied(str(e))
+    return FileDeliveryService.serve_document(request, document)